@@ -0,0 +1,205 @@
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from disk_cache import file_digest
+from memory_cache import clear_cache
+from funding_insights import FUNDING_INPUTS, load_funding_data, filter_call_years, yearly_funding, top_by
+from gender_diversity import GENDER_INPUTS, load_gender_data, filter_gender, gender_summary
+from researcher_explorer import RESEARCHER_INPUTS, load_data as load_researcher_data, researcher_profile
+from collaboration_by_country import COUNTRY_INPUTS, load_collab_country_data, load_country_matrix, country_collaborations
+from preprocess_country_matrix import MATRIX_PATH
+
+CACHE_ENTRIES = 1024
+DIMENSIONS = {
+    "discipline": "MainDiscipline",
+    "institution": "ResearchInstitution",
+    "instrument": "FundingInstrumentLevel1",
+}
+
+
+def records(df):
+    return json.loads(df.to_json(orient="records"))
+
+
+def year_range(params, df, column):
+    return (int(params.get("from", [df[column].min()])[0]), int(params.get("to", [df[column].max()])[0]))
+
+
+def funding_by_year(params):
+    df = load_funding_data()
+    return records(yearly_funding(filter_call_years(df, year_range(params, df, "CallDecisionYear"))))
+
+
+def funding_by_dimension(dimension, params):
+    df = load_funding_data()
+    df = filter_call_years(df, year_range(params, df, "CallDecisionYear"))
+    top_funding, top_counts, avg_grant = top_by(df, DIMENSIONS[dimension], int(params.get("top", [10])[0]))
+    return {"total_funding": records(top_funding), "grant_count": records(top_counts), "avg_grant": records(avg_grant)}
+
+
+def gender_shares(params):
+    df = load_gender_data()
+    df = filter_gender(df, year_range(params, df, "start_year"), params.get("discipline"))
+    return records(gender_summary(df))
+
+
+def researcher(params):
+    if "name" not in params:
+        raise ValueError("missing 'name' parameter")
+    df = load_researcher_data()
+    researcher_df = df[df["FullName"] == params["name"][0]]
+    if researcher_df.empty:
+        raise LookupError(f"no researcher named {params['name'][0]!r}")
+    profile = researcher_profile(researcher_df)
+    profile["funding_by_year"] = records(profile["funding_by_year"])
+    return profile
+
+
+def countries(params):
+    matrix = load_country_matrix()
+    years = year_range(params, matrix, "Year") if matrix is not None else None
+    totals = country_collaborations(load_collab_country_data(), matrix, years)
+    totals = totals.head(int(params.get("top", [len(totals)])[0]))
+    return records(totals.rename_axis("Country").reset_index(name="Collaborations"))
+
+
+ROUTES = {
+    "/funding/years": funding_by_year,
+    "/funding/discipline": lambda params: funding_by_dimension("discipline", params),
+    "/funding/institution": lambda params: funding_by_dimension("institution", params),
+    "/funding/instrument": lambda params: funding_by_dimension("instrument", params),
+    "/gender/shares": gender_shares,
+    "/researchers/profile": researcher,
+    "/countries": countries,
+}
+
+# Files each endpoint reads: their digests key the cached responses and their ETags
+ROUTE_INPUTS = {
+    "/funding/years": FUNDING_INPUTS,
+    "/funding/discipline": FUNDING_INPUTS,
+    "/funding/institution": FUNDING_INPUTS,
+    "/funding/instrument": FUNDING_INPUTS,
+    "/gender/shares": GENDER_INPUTS,
+    "/researchers/profile": RESEARCHER_INPUTS,
+    "/countries": COUNTRY_INPUTS + [MATRIX_PATH],
+}
+
+
+class ResultCache:
+    """Thread-safe LRU of rendered responses: (etag, body, gzipped body) per path and query."""
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+results = ResultCache()
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def input_version(route):
+    """Digest of the route's input files. When it changes, the in-process loader caches still hold
+    frames read from the old files, so they are dropped once before anything is recomputed."""
+    version = "-".join(file_digest(path)[:12] for path in ROUTE_INPUTS[route])
+    with _versions_lock:
+        if _versions.setdefault(route, version) != version:
+            _versions[route] = version
+            clear_cache()
+    return version
+
+
+def render(route, params):
+    """Cached (etag, body, gzipped body); a changed input file gives new keys, so stale responses
+    are never served and age out of the LRU."""
+    version = input_version(route)
+    key = (route, version, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+    cached = results.get(key)
+    if cached is None:
+        body = json.dumps(ROUTES[route](params), default=str).encode("utf-8")
+        etag = hashlib.sha1(version.encode() + b"|" + body).hexdigest()
+        cached = (f'"{etag}"', body, gzip.compress(body, compresslevel=5))
+        results.put(key, cached)
+    return cached
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self.send_json(200, b'{"status": "ok"}')
+        if url.path not in ROUTES:
+            return self.send_json(404, json.dumps({"error": f"unknown endpoint {url.path}", "endpoints": list(ROUTES)}).encode())
+
+        try:
+            etag, body, gzipped = render(url.path, parse_qs(url.query))
+        except LookupError as e:
+            return self.send_json(404, json.dumps({"error": str(e)}).encode())
+        except (ValueError, KeyError) as e:
+            return self.send_json(400, json.dumps({"error": str(e)}).encode())
+
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        self.send_json(200, gzipped if use_gzip else body, etag=etag, encoding="gzip" if use_gzip else None)
+
+    def send_json(self, status, body, etag=None, encoding=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "max-age=60")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the dashboard's aggregates as JSON.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    # load once up front so the first requests don't race to fill the caches
+    for loader in (load_funding_data, load_gender_data, load_researcher_data, load_collab_country_data, load_country_matrix):
+        loader()
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    print(f"🚀 Serving {', '.join(ROUTES)} on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
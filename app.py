@@ -1,9 +1,12 @@
 import streamlit as st
 from funding_insights import show_funding_insights
 from collaboration_network import show_collaboration_network
+from collaboration_by_country import show_collaboration_by_country
 from gender_diversity import show_gender_diversity
 from keyword_analysis import show_keyword_insights
 from researcher_explorer import show_researcher_explorer
+from research_outputs import show_research_outputs
+from grant_search import grant_search_box
 
 # Set layout and page title
 st.set_page_config(page_title="SNSF Research Dashboard", layout="wide")
@@ -15,11 +18,14 @@ with st.sidebar:
     selection = st.radio("Go to section:", [
         "Funding Insights",
         "Collaboration Network",
+        "Collaboration by Country",
         "Gender Diversity",
         "Keyword Analysis",
         "Researcher Explorer",
+        "Research Outputs",
         "Credits"
     ])
+    grant_search_box()
 
 # === Section Routing ===
 if selection == "Funding Insights":
@@ -28,6 +34,9 @@ if selection == "Funding Insights":
 elif selection == "Collaboration Network":
     show_collaboration_network()
 
+elif selection == "Collaboration by Country":
+    show_collaboration_by_country()
+
 elif selection == "Gender Diversity":
     show_gender_diversity()
 
@@ -37,6 +46,9 @@ elif selection == "Keyword Analysis":
 elif selection == "Researcher Explorer":
     show_researcher_explorer()
 
+elif selection == "Research Outputs":
+    show_research_outputs()
+
 elif selection == "Credits":
     # Use columns to align logo and header side by side
     col1, col2 = st.columns([1, 4])
@@ -2,45 +2,79 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 import plotly.express as px
-import pycountry
+import os
+from disk_cache import disk_cache
+from data_io import PERSON_TYPES, LINK_TYPES, INSTITUTE_TYPES, read_tables
+from memory_cache import memory_cache
+from country_codes import country_iso_codes
+from preprocess_country_matrix import MATRIX_PATH
 
-@st.cache_data
+COUNTRY_INPUTS = ["data/GrantToPerson.csv", "data/Person.csv", "data/Institute.csv"]
+
+@memory_cache()
+@disk_cache(inputs=COUNTRY_INPUTS)
 def load_collab_country_data():
-    g2p = pd.read_csv("data/GrantToPerson.csv")
-    people = pd.read_csv("data/Person.csv")
-    inst = pd.read_csv("data/Institute.csv")
-    grants = pd.read_csv("data/Grant.csv")
+    tables = read_tables({
+        "links": ("data/GrantToPerson.csv", None, LINK_TYPES),
+        "people": ("data/Person.csv", ["PersonNumber", "InstituteNumber"], PERSON_TYPES),
+        "institutes": ("data/Institute.csv", ["InstituteNumber", "InstituteCountry"], INSTITUTE_TYPES),
+    })
+    g2p, people, inst = tables["links"], tables["people"], tables["institutes"]
 
     # Basic merging for country
     merged = g2p.merge(people[['PersonNumber', 'InstituteNumber']], on='PersonNumber', how='left')
     merged = merged.merge(inst[['InstituteNumber', 'InstituteCountry']], on='InstituteNumber', how='left')
-    merged = merged.merge(grants[['GrantNumber']], on='GrantNumber', how='left')
 
     merged = merged.dropna(subset=['InstituteCountry'])
-
-    # Add dummy year so chart works
-    merged['Year'] = 2020
-
     return merged
 
-def get_country_iso(name):
-    try:
-        return pycountry.countries.lookup(name).alpha_3
-    except:
+@memory_cache()
+def load_country_matrix():
+    if not os.path.exists(MATRIX_PATH):
         return None
+    return pd.read_csv(MATRIX_PATH)
+
+def slice_country_matrix(matrix, year_range):
+    sliced = matrix[matrix["Year"].between(year_range[0], year_range[1])]
+    return sliced.groupby(["CountryA", "CountryB"], as_index=False)["Grants"].sum()
+
+def international_totals(pairs):
+    international = pairs[pairs["CountryA"] != pairs["CountryB"]]
+    totals = pd.concat([
+        international[["CountryA", "Grants"]].rename(columns={"CountryA": "Country"}),
+        international[["CountryB", "Grants"]].rename(columns={"CountryB": "Country"})
+    ])
+    return totals.groupby("Country")["Grants"].sum().sort_values(ascending=False)
+
+def country_collaborations(df, matrix, year_range):
+    """International shared grants per country, or plain participations when no matrix is built."""
+    if matrix is None:
+        return df['InstituteCountry'].value_counts()
+    return international_totals(slice_country_matrix(matrix, year_range))
 
 def show_collaboration_by_country():
     st.title("🌍 Collaboration by Country")
 
     df = load_collab_country_data()
+    matrix = load_country_matrix()
 
     with st.sidebar:
         st.markdown("### 🔧 Options")
         top_n = st.slider("Top Countries", 5, 20, 10)
+        if matrix is not None:
+            min_year, max_year = int(matrix["Year"].min()), int(matrix["Year"].max())
+            year_range = st.slider("Grant Start Year", min_year, max_year, (min_year, max_year))
+
+    if matrix is not None:
+        pairs = slice_country_matrix(matrix, year_range)
+        country_totals = international_totals(pairs)
+    else:
+        st.info("📜 Showing participations only. Run `python preprocess_country_matrix.py` for year-resolved collaborations.")
+        country_totals = df['InstituteCountry'].value_counts()
 
     # === Top Countries Chart ===
     st.markdown("#### 🏆 Top Collaborating Countries")
-    top_countries = df['InstituteCountry'].value_counts().head(top_n).reset_index()
+    top_countries = country_totals.head(top_n).reset_index()
     top_countries.columns = ['Country', 'Collaborations']
 
     bar = alt.Chart(top_countries).mark_bar().encode(
@@ -51,8 +85,11 @@ def show_collaboration_by_country():
 
     # === Choropleth Map ===
     st.markdown("#### 🗺️ Global Collaboration Map")
-    df['ISO'] = df['InstituteCountry'].apply(get_country_iso)
-    map_data = df.groupby("ISO").size().reset_index(name="Collaborations")
+    map_data = pd.DataFrame({
+        "ISO": country_iso_codes(country_totals.index.to_series()).values,
+        "Collaborations": country_totals.values
+    })
+    map_data = map_data.dropna(subset=["ISO"]).groupby("ISO", observed=True)["Collaborations"].sum().reset_index()
 
     fig = px.choropleth(
         map_data,
@@ -63,6 +100,22 @@ def show_collaboration_by_country():
     )
     st.plotly_chart(fig, use_container_width=True)
 
+    # === Partnership Matrix ===
+    if matrix is not None:
+        st.markdown("#### 🔗 International Partnership Matrix")
+        top = country_totals.head(top_n).index
+        top_pairs = pairs[pairs["CountryA"].isin(top) & pairs["CountryB"].isin(top) & (pairs["CountryA"] != pairs["CountryB"])]
+        both_ways = pd.concat([
+            top_pairs,
+            top_pairs.rename(columns={"CountryA": "CountryB", "CountryB": "CountryA"})
+        ])
+        grid = both_ways.pivot_table(index="CountryA", columns="CountryB", values="Grants", aggfunc="sum")
+        grid = grid.reindex(index=top, columns=top).fillna(0)
+
+        fig_matrix = px.imshow(grid, color_continuous_scale="Blues", labels=dict(x="", y="", color="Shared Grants"),
+                               title=f"Shared Grants {year_range[0]}–{year_range[1]}")
+        st.plotly_chart(fig_matrix, use_container_width=True)
+
     # === Download CSV ===
     with st.expander("📥 Download Data"):
         st.dataframe(df[["InstituteCountry", "GrantNumber"]].head(300))
@@ -5,11 +5,57 @@ import altair as alt
 from pyvis.network import Network
 import streamlit.components.v1 as components
 import plotly.express as px
-import pycountry
+import numpy as np
+import os
+from disk_cache import disk_cache
+from memory_cache import memory_cache
+from preprocess_graph_analytics import METRICS_PATH, EDGES_PATH, ALL_YEARS
+from graph_layout import load_institute_groups, collapse_graph, compute_layout, static_network
+from country_codes import institute_countries
+from grant_search import GRANT_IDS_PATH, with_grant_docs, filter_grants
+
+COLLAB_PATH = "data/collaboration_data.csv"
+EDGE_COLUMNS = ["Institute_x", "Institute_y"]
+
+@memory_cache()
+def load_graph_metrics():
+    if not os.path.exists(METRICS_PATH):
+        return None
+    return pd.read_csv(METRICS_PATH)
+
+@memory_cache()
+@disk_cache(inputs=[EDGES_PATH, COLLAB_PATH, GRANT_IDS_PATH, "data/Institute.csv"])
+def load_network_data():
+    """Edges and collaboration rows with every institution column coded against one sorted vocabulary.
+
+    The vocabulary holds each distinct name once with its precomputed flags, so
+    searches and filters run over a few thousand names instead of every row.
+    """
+    edges = pd.read_csv(EDGES_PATH)
+    collab = with_grant_docs(pd.read_csv(COLLAB_PATH))
+    columns = [(edges, c) for c in EDGE_COLUMNS if c in edges.columns] + [(collab, c) for c in ["InstituteName"] if c in collab.columns]
+
+    names = pd.Index(pd.unique(pd.concat([df[c] for df, c in columns]).dropna().astype(str))).sort_values()
+    for df, column in columns:
+        df[column] = pd.Categorical(df[column], categories=names)
+
+    vocab = pd.DataFrame({"Name": names})
+    vocab["Lower"] = vocab["Name"].str.lower()
+    vocab["Unknown"] = vocab["Lower"].str.contains("unknown", regex=False)
+    vocab["Initiator"] = np.isin(np.arange(len(names)), edges["Institute_x"].cat.codes)
+    vocab["Country"] = vocab["Name"].map(institute_countries())
+    return edges, collab, vocab
+
+def rows_where(column, name_mask, missing=False):
+    """Row mask from a mask over the vocabulary; rows without a name (code -1) get ``missing``."""
+    return np.append(np.asarray(name_mask, dtype=bool), missing)[column.cat.codes.to_numpy()]
+
+def row_values(column, values):
+    return pd.Series(np.append(np.asarray(values, dtype=object), None)[column.cat.codes.to_numpy()], index=column.index)
 
 def show_collaboration_network():
-    edges_df = pd.read_csv("data/institution_collaboration_edges.csv")
-    collab_df = pd.read_csv("data/collaboration_data.csv")
+    edges_df, collab_df, vocab = load_network_data()
+    collab_df = filter_grants(collab_df)
 
     st.title("🤝 Collaboration Network Dashboard")
 
@@ -19,27 +65,36 @@ def show_collaboration_network():
 
     include_unknowns = st.sidebar.checkbox("Include Unknown Institutions", value=True)
     role_filter = st.sidebar.radio("🔄 Role", ["All", "Initiated"])
-    top_n = st.sidebar.slider("Top N Links", 10, 50, 30)
+    large_graph = st.sidebar.checkbox("Large Graph Mode", value=False,
+                                      help="Compute the layout on the server and draw a static graph.")
+    if large_graph:
+        top_n = st.sidebar.slider("Top N Links", 100, 5000, 1000, step=100)
+        group_by = st.sidebar.radio("Collapse Institutes Into", ["Research Institution", "Community", "None"])
+    else:
+        top_n = st.sidebar.slider("Top N Links", 10, 50, 30)
     min_collab = st.sidebar.slider("Min Collab Count", 1, int(edges_df["collaboration_count"].max()), 5)
 
+    known = ~vocab["Unknown"].to_numpy()
     if not include_unknowns:
-        edges_df = edges_df[~edges_df['Institute_x'].astype(str).str.contains("unknown", case=False, na=False)]
-        if "Institute" in collab_df.columns:
-            collab_df = collab_df[~collab_df["Institute"].astype(str).str.contains("unknown", case=False, na=False)]
+        edges_df = edges_df[rows_where(edges_df["Institute_x"], known, missing=True)]
+        if "InstituteName" in collab_df.columns:
+            collab_df = collab_df[rows_where(collab_df["InstituteName"], known, missing=True)]
 
-    all_insts = pd.unique(edges_df['Institute_x']).tolist()
-    inst_search = st.sidebar.selectbox("Highlight Institution", [""] + sorted(all_insts))
-    selected_insts = st.sidebar.multiselect("Focus Institutions", sorted(all_insts))
+    # vocabulary is sorted, so the options need no per-rerun unique/sort over the edges
+    all_insts = vocab.loc[vocab["Initiator"] & (known | include_unknowns), "Name"].tolist()
+    inst_search = st.sidebar.selectbox("Highlight Institution", [""] + all_insts)
+    selected_insts = st.sidebar.multiselect("Focus Institutions", all_insts)
 
-    filtered_edges = edges_df[edges_df["collaboration_count"] >= min_collab]
+    keep = np.ones(len(vocab), dtype=bool)
     if selected_insts:
-        filtered_edges = filtered_edges[filtered_edges["Institute_x"].isin(selected_insts)]
-    if role_filter == "Initiated":
-        filtered_edges = filtered_edges[filtered_edges["Institute_x"].str.contains(inst_search, na=False, case=False)]
-    elif inst_search:
-        filtered_edges = filtered_edges[filtered_edges["Institute_x"].str.contains(inst_search, na=False, case=False)]
+        keep &= vocab["Name"].isin(selected_insts).to_numpy()
+    if role_filter == "Initiated" or inst_search:
+        keep &= vocab["Lower"].str.contains(inst_search.lower(), regex=False).to_numpy()
+    filtered_edges = edges_df[(edges_df["collaboration_count"] >= min_collab).to_numpy() & rows_where(edges_df["Institute_x"], keep)]
 
     top_edges = filtered_edges.sort_values(by="collaboration_count", ascending=False).head(top_n)
+    top_countries = row_values(top_edges["Institute_x"], vocab["Country"])
+    top_edges = top_edges.astype({c: object for c in EDGE_COLUMNS if c in top_edges.columns})
 
     G = nx.Graph()
     unique_nodes = top_edges['Institute_x'].unique()
@@ -88,36 +143,53 @@ def show_collaboration_network():
 
     with tab2:
         st.markdown("#### 🔸 Interactive Network")
-        st.write(f"🧠 Nodes: {len(G.nodes)} | Edges: {len(G.edges)}")
-        net = Network(height="600px", width="100%", bgcolor="#FFFFFF", font_color="black")
-        net.from_nx(G)
-        for node in G.nodes:
-            size = freq.get(node, 5)
-            net_node = net.get_node(node)
-            if net_node:
-                net_node["size"] = int(size)
-                net_node["label"] = node
-                net_node["title"] = f"{node} – {int(size)} links"
-                if inst_search and inst_search.lower() in node.lower():
-                    net_node["color"] = "#FF5733"
-        net.force_atlas_2based(gravity=-50)
-        net.save_graph("network.html")
-        components.html(open("network.html", "r", encoding="utf-8").read(), height=600)
+        if large_graph and "Institute_y" in top_edges.columns:
+            lod_edges = top_edges.rename(columns={
+                "Institute_x": "source", "Institute_y": "target", "collaboration_count": "weight"
+            })
+            metrics_df = load_graph_metrics()
+            if group_by == "Research Institution":
+                group_of = load_institute_groups()
+            elif group_by == "Community" and metrics_df is not None:
+                all_years = metrics_df[metrics_df["Window"] == ALL_YEARS]
+                group_of = "Community " + all_years.set_index("Institution")["Community"].astype(str)
+            else:
+                group_of = pd.Series(dtype=str)
+
+            graph_nodes = pd.unique(lod_edges[["source", "target"]].values.ravel())
+            groups = sorted(group_of.reindex(graph_nodes).dropna().unique())
+            expanded = st.multiselect("Expand Groups", groups)
+            node_df, lod_edges = collapse_graph(lod_edges, group_of, expanded)
+
+            edge_records = tuple(lod_edges.itertuples(index=False, name=None))
+            positions = compute_layout(edge_records)
+            st.write(f"🧠 Nodes: {len(positions)} | Edges: {len(lod_edges)}")
+            net = static_network(node_df, lod_edges, positions, highlight=inst_search)
+            net.save_graph("network.html")
+            components.html(open("network.html", "r", encoding="utf-8").read(), height=600)
+        else:
+            if large_graph:
+                st.info("Large Graph Mode needs an 'Institute_y' column in the edge list.")
+            st.write(f"🧠 Nodes: {len(G.nodes)} | Edges: {len(G.edges)}")
+            net = Network(height="600px", width="100%", bgcolor="#FFFFFF", font_color="black")
+            net.from_nx(G)
+            for node in G.nodes:
+                size = freq.get(node, 5)
+                net_node = net.get_node(node)
+                if net_node:
+                    net_node["size"] = int(size)
+                    net_node["label"] = node
+                    net_node["title"] = f"{node} – {int(size)} links"
+                    if inst_search and inst_search.lower() in node.lower():
+                        net_node["color"] = "#FF5733"
+            net.force_atlas_2based(gravity=-50)
+            net.save_graph("network.html")
+            components.html(open("network.html", "r", encoding="utf-8").read(), height=600)
 
         st.markdown("#### 🌍 Geographic Distribution Map")
 
-        def get_country_code(institute):
-            if "switzerland" in institute.lower():
-                return "CHE"
-            if "lausanne" in institute.lower():
-                return "CHE"
-            if "zurich" in institute.lower():
-                return "CHE"
-            return None
-
-        map_df = pd.DataFrame(top_edges['Institute_x'])
-        map_df['Country'] = map_df['Institute_x'].apply(get_country_code)
-        country_counts = map_df['Country'].value_counts().reset_index()
+        country_counts = top_countries.value_counts()
+        country_counts = country_counts[country_counts > 0].reset_index()
         country_counts.columns = ['ISO', 'Collaborations']
 
         if not country_counts.empty:
@@ -134,24 +206,54 @@ def show_collaboration_network():
 
     with tab3:
         st.markdown("#### 🏫 Institutional Clustering")
-        node_counts = node_list.value_counts().reset_index()
-        node_counts.columns = ['Institution', 'Links']
-        high_density = node_counts[node_counts['Links'] > 10]
-        low_density = node_counts[node_counts['Links'] <= 10]
-        donut_data = pd.DataFrame({
-            'Type': ['Dense (>10)', 'Low (≤10)'],
-            'Count': [len(high_density), len(low_density)]
-        })
-        col1, col2 = st.columns(2)
-        with col1:
-            st.altair_chart(
-                alt.Chart(donut_data).mark_arc(innerRadius=50).encode(theta="Count", color="Type"),
-                use_container_width=True
-            )
-        with col2:
-            st.altair_chart(
-                alt.Chart(high_density.head(10)).mark_bar().encode(y=alt.Y("Institution", sort='-x'), x="Links"),
-                use_container_width=True
+        metrics_df = load_graph_metrics()
+        if metrics_df is None:
+            st.info("📜 No graph analytics found. Run `python preprocess_graph_analytics.py` to build them.")
+        else:
+            windows = metrics_df["Window"].unique().tolist()
+            window = st.selectbox("Year Window", windows, index=windows.index(ALL_YEARS) if ALL_YEARS in windows else 0)
+            window_df = metrics_df[metrics_df["Window"] == window]
+
+            communities = window_df.groupby("Community").agg(
+                Institutions=("Institution", "size"),
+                Strength=("Strength", "sum")
+            ).reset_index()
+            hubs = window_df.sort_values("PageRank", ascending=False).drop_duplicates("Community")
+            communities["Hub"] = communities["Community"].map(hubs.set_index("Community")["Institution"])
+            communities = communities.sort_values("Institutions", ascending=False)
+
+            donut_data = communities.head(8)[["Hub", "Institutions"]].copy()
+            donut_data["Cluster"] = "Cluster around " + donut_data["Hub"].str.slice(0, 40)
+            others = communities["Institutions"].iloc[8:].sum()
+            if others:
+                donut_data = pd.concat([donut_data, pd.DataFrame({"Cluster": ["Other clusters"], "Institutions": [others]})])
+
+            ranking = window_df.sort_values("PageRank", ascending=False).head(10)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.altair_chart(
+                    alt.Chart(donut_data).mark_arc(innerRadius=50).encode(theta="Institutions", color="Cluster"),
+                    use_container_width=True
+                )
+            with col2:
+                st.altair_chart(
+                    alt.Chart(ranking).mark_bar().encode(y=alt.Y("Institution", sort='-x'), x="PageRank"),
+                    use_container_width=True
+                )
+
+            if inst_search:
+                match = window_df[window_df["Institution"].str.contains(inst_search, case=False, na=False, regex=False)]
+                if not match.empty:
+                    community = match.iloc[0]["Community"]
+                    st.markdown(f"**Cluster of {match.iloc[0]['Institution']}**")
+                    window_df = window_df[window_df["Community"] == community]
+
+            st.dataframe(
+                window_df.sort_values("PageRank", ascending=False)[
+                    ["Institution", "Community", "Degree", "Strength", "PageRank", "Betweenness"]
+                ].head(300),
+                height=300
             )
 
     with tab4:
@@ -0,0 +1,65 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pycountry
+
+COUNTRY_CACHE_PATH = "data/country_iso_cache.csv"
+
+_resolved = None
+_lock = threading.Lock()  # sessions share the cache dict and its file
+
+
+def lookup_iso(name):
+    try:
+        return pycountry.countries.lookup(name).alpha_3
+    except LookupError:
+        return None
+
+
+def _load_cache():
+    global _resolved
+    if _resolved is None:
+        if os.path.exists(COUNTRY_CACHE_PATH):
+            cache = pd.read_csv(COUNTRY_CACHE_PATH, keep_default_na=False)
+            _resolved = dict(zip(cache["Name"], cache["ISO"].replace("", None)))
+        else:
+            _resolved = {}
+    return _resolved
+
+
+def _save_cache(resolved):
+    os.makedirs(os.path.dirname(COUNTRY_CACHE_PATH), exist_ok=True)
+    tmp_path = f"{COUNTRY_CACHE_PATH}.{os.getpid()}.tmp"
+    pd.DataFrame({"Name": list(resolved), "ISO": list(resolved.values())}).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, COUNTRY_CACHE_PATH)
+
+
+def resolve_countries(names):
+    """ISO alpha-3 for each distinct name; names seen for the first time are looked up once and persisted."""
+    with _lock:
+        resolved = _load_cache()
+        missing = [name for name in pd.unique(pd.Series(names).dropna()) if name not in resolved]
+        if missing:
+            for name in missing:
+                resolved[name] = lookup_iso(name)
+            _save_cache(resolved)
+        return dict(resolved)
+
+
+def country_iso_codes(series):
+    """Categorical ISO codes for a column of country names, resolving each distinct name only once."""
+    names = pd.Categorical(series)
+    if len(names.categories) == 0:
+        return pd.Series(pd.Categorical([None] * len(series)), index=series.index)
+    resolved = resolve_countries(names.categories)
+    iso = pd.Categorical(pd.Index(names.categories).map(resolved))
+    codes = np.where(names.codes >= 0, iso.codes[names.codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, iso.categories), index=series.index)
+
+
+def institute_countries():
+    """Institute name → ISO code, taken from the Institute.csv join rather than guessed from the name."""
+    inst = pd.read_csv("data/Institute.csv", usecols=["Institute", "InstituteCountry"])
+    inst = inst.dropna(subset=["Institute"]).drop_duplicates(subset="Institute")
+    return pd.Series(country_iso_codes(inst["InstituteCountry"]).values, index=inst["Institute"].values)
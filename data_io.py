@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+READ_THREADS = int(os.environ.get("SNSF_READ_THREADS", 4))
+
+# Explicit types for the columns the pages use. Year columns are left to inference on purpose:
+# they come out int64 when complete and float64 when some are missing, exactly as with pandas.
+GRANT_TYPES = {
+    "GrantNumber": pa.string(), "Title": pa.string(), "StartDate": pa.string(), "EndDate": pa.string(),
+    "AmountGrantedAllSets": pa.float64(), "AmountGranted": pa.float64(),
+    "MainDiscipline": pa.string(), "ResearchInstitution": pa.string(), "Institute": pa.string(),
+    "InstituteCountry": pa.string(), "FundingInstrumentLevel1": pa.string(),
+}
+PERSON_TYPES = {
+    "PersonNumber": pa.string(), "FirstName": pa.string(), "Surname": pa.string(),
+    "Gender": pa.string(), "InstituteNumber": pa.string(),
+}
+LINK_TYPES = {"GrantNumber": pa.string(), "PersonNumber": pa.string(), "Type": pa.string()}
+INSTITUTE_TYPES = {
+    "InstituteNumber": pa.string(), "Institute": pa.string(),
+    "InstituteCountry": pa.string(), "ResearchInstitution": pa.string(),
+}
+
+# Identifiers are codes ("G20000", "P10", "I1"), read as strings in every path: pandas readers pass
+# ID_DTYPES so their merges and isin() line up with the frames read_table returns.
+ID_DTYPES = {"GrantNumber": str, "PersonNumber": str, "InstituteNumber": str, "DisciplineNumber": str}
+
+_timings = deque(maxlen=200)  # the most recent reads; a long-lived server keeps reading on cache misses
+_lock = threading.Lock()
+
+
+def read_table(path, columns=None, types=None):
+    """Read one CSV with the multithreaded pyarrow parser, keeping only ``columns`` that exist in the file.
+
+    Falls back to the pandas parser (strings typed, numbers inferred) if Arrow rejects a value.
+    """
+    started = time.perf_counter()
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [c for c in header if columns is None or c in columns]
+    types = {c: t for c, t in (types or {}).items() if c in columns}
+    try:
+        table = pv.read_csv(
+            path,
+            read_options=pv.ReadOptions(use_threads=True),
+            parse_options=pv.ParseOptions(newlines_in_values=True),
+            convert_options=pv.ConvertOptions(include_columns=columns, column_types=types, strings_can_be_null=True),
+        )
+        df, engine = table.to_pandas(), "pyarrow"
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        print(f"⚠️ pyarrow could not parse {path}, using the pandas parser: {e}")
+        strings = {**ID_DTYPES, **{c: str for c, t in types.items() if t == pa.string()}}
+        df, engine = pd.read_csv(path, usecols=columns, dtype=strings, low_memory=False), "pandas"
+    with _lock:
+        _timings.append({"Path": path, "Engine": engine, "Rows": len(df), "Columns": len(df.columns),
+                         "Seconds": time.perf_counter() - started})
+    return df
+
+
+def read_tables(tables):
+    """Read independent tables concurrently: {name: (path, columns, types)} -> {name: DataFrame}.
+
+    Arrow releases the GIL while parsing, so a cold load takes as long as its largest file.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(READ_THREADS, len(tables)))) as pool:
+        futures = {name: pool.submit(read_table, *spec) for name, spec in tables.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def read_timings():
+    """Per-file read timings recorded in this process, slowest first."""
+    with _lock:
+        timings = pd.DataFrame(_timings, columns=["Path", "Engine", "Rows", "Columns", "Seconds"])
+    return timings.sort_values("Seconds", ascending=False).reset_index(drop=True)
+
+
+def print_read_timings():
+    for row in read_timings().itertuples(index=False):
+        print(f"📂 {row.Path:<40} {row.Rows:>10,} rows  {row.Columns:>3} cols  {row.Seconds:6.2f}s  ({row.Engine})")
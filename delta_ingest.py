@@ -0,0 +1,318 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from data_io import ID_DTYPES
+from preprocess_collaboration_broad import build_collaboration_rows
+from preprocess_disciplines import (ASSIGNMENTS_PATH, FUNDING_ROLLUP_PATH, GENDER_ROLLUP_PATH, TREE_PATH,
+                                    grant_assignments, leaf_totals, rollup)
+from preprocess_grant_sketches import SKETCHES_PATH, build_grant_sketches
+from preprocess_graph_analytics import COLLAB_PATH, PAIR_COUNTS_PATH, build_pair_counts
+from preprocess_institute_map import GRID_PATH, build_institute_grid
+from preprocess_keyword_trends import (COUNTS_PATH, KEYWORDS_CSV_PATH, KEYWORDS_PARQUET_PATH, VOCAB_PATH,
+                                       keyword_mentions, typed_counts)
+from preprocess_outputs import OUTPUT_TABLES, SUMMARY_PATH, count_outputs, normalize_grant_numbers, output_rows
+
+STORE_DIR = "data"
+
+# stored table -> columns identifying a row across releases
+TABLE_KEYS = {
+    "grant_final.csv": ["GrantNumber"],
+    "Grant.csv": ["GrantNumber"],
+    "person_final.csv": ["PersonNumber"],
+    "Person.csv": ["PersonNumber"],
+    "Institute.csv": ["InstituteNumber"],
+    "GrantToPerson.csv": ["GrantNumber", "PersonNumber"],
+    "GrantToDiscipline.csv": ["GrantNumber", "DisciplineNumber"],
+    **{os.path.basename(path): ["OutputId"] for path, _ in OUTPUT_TABLES.values()},
+}
+
+
+class Store:
+    """The tables of one release, read on first use; release files override the stored ones."""
+
+    def __init__(self, directory, overrides=None):
+        self.directory = directory
+        self.tables = dict(overrides or {})
+        self._grant_keys = {}
+
+    def __contains__(self, name):
+        return name in self.tables or os.path.exists(os.path.join(self.directory, name))
+
+    def __getitem__(self, name):
+        if name not in self.tables:
+            self.tables[name] = pd.read_csv(os.path.join(self.directory, name), dtype=ID_DTYPES, low_memory=False)
+        return self.tables[name]
+
+    def of_grants(self, name, grants):
+        """Rows of a table belonging to the given (normalised) grant numbers."""
+        if name not in self._grant_keys:
+            self._grant_keys[name] = normalize_grant_numbers(self[name]["GrantNumber"])
+        return self[name][self._grant_keys[name].isin(grants).to_numpy()]
+
+
+# === Diffing ===
+
+def row_keys(df, keys):
+    # the occurrence number keeps rows apart when a release repeats a key (e.g. one person in two roles)
+    frame = df[keys].astype(str)
+    frame["Occurrence"] = frame.groupby(keys).cumcount()
+    return pd.MultiIndex.from_frame(frame)
+
+
+def comparable(old, new, columns):
+    """Both sides with one dtype per column, so a column read as int in one release and as float
+    in the other (one NaN is enough) hashes alike."""
+    old, new = old[columns].copy(), new[columns].copy()
+    for column in columns:
+        if is_numeric_dtype(old[column]) and is_numeric_dtype(new[column]):
+            old[column], new[column] = old[column].astype("float64"), new[column].astype("float64")
+        elif old[column].dtype != new[column].dtype:
+            old[column], new[column] = old[column].astype(str), new[column].astype(str)
+    return old, new
+
+
+def diff_rows(old, new, keys):
+    """Rows to take out of the store (deleted, old side of updates) and to put in (inserted, new side of updates)."""
+    old_keys, new_keys = row_keys(old, keys), row_keys(new, keys)
+    old_values, new_values = comparable(old, new, [c for c in new.columns if c in old.columns])
+    old_hash = pd.Series(pd.util.hash_pandas_object(old_values, index=False).to_numpy(), index=old_keys)
+    new_hash = pd.Series(pd.util.hash_pandas_object(new_values, index=False).to_numpy(), index=new_keys)
+    common = old_keys.intersection(new_keys)
+    changed = common[old_hash.loc[common].to_numpy() != new_hash.loc[common].to_numpy()]
+
+    removed = ~old_keys.isin(new_keys) | old_keys.isin(changed)
+    added = ~new_keys.isin(old_keys) | new_keys.isin(changed)
+    counts = {"inserted": int(added.sum()) - len(changed), "updated": len(changed), "deleted": int(removed.sum()) - len(changed)}
+    return old[removed], new[added], counts
+
+
+def apply_rows(df, removed, added):
+    return pd.concat([df.drop(index=removed.index), added], ignore_index=True)
+
+
+def affected_grants(removed, added, old, new):
+    """Grants whose derived rows depend on the changed rows of one table."""
+    rows = pd.concat([removed, added])
+    if "GrantNumber" in rows.columns:
+        return set(normalize_grant_numbers(rows["GrantNumber"].dropna()))
+
+    people = set(rows["PersonNumber"]) if "PersonNumber" in rows.columns else set()
+    if "InstituteNumber" in rows.columns:
+        for store in (old, new):
+            for name in ("Person.csv", "person_final.csv"):
+                if name in store and "InstituteNumber" in store[name].columns:
+                    person = store[name]
+                    people |= set(person.loc[person["InstituteNumber"].isin(rows["InstituteNumber"]), "PersonNumber"])
+
+    grants = set()
+    for store in (old, new):
+        if "GrantToPerson.csv" in store:
+            links = store["GrantToPerson.csv"]
+            grants |= set(normalize_grant_numbers(links.loc[links["PersonNumber"].isin(people), "GrantNumber"]))
+    return grants
+
+
+# === Derived aggregates: each grant's contribution, computed for the changed grants only ===
+
+def patch_totals(totals, old_part, new_part, keys, values, count):
+    """Subtract the changed grants' old contribution, add their new one; groups left with no rows are dropped.
+
+    A negative total means the stored file was not built the way its parts are computed (other keys,
+    other counting): that raises rather than being kept, rerun the file's preprocessing script.
+    """
+    negated = old_part.assign(**{value: -old_part[value] for value in values})
+    patched = pd.concat([totals, negated, new_part], ignore_index=True)
+    patched = patched.groupby(keys, observed=True, dropna=False)[values].sum().reset_index()
+    negative = patched[patched[count] < -1e-3]
+    if len(negative):
+        raise ValueError(f"{len(negative)} totals fall below zero after patching, e.g. "
+                         f"{negative[keys].head(3).to_dict('records')}: the stored aggregate does not match its parts")
+    return patched[patched[count].abs() > 1e-3].reset_index(drop=True)
+
+
+def replace_grant_rows(df, new_rows, grants):
+    keep = ~normalize_grant_numbers(df["GrantNumber"]).isin(grants).to_numpy()
+    return pd.concat([df[keep], new_rows], ignore_index=True)
+
+
+def grant_rows(store, grants):
+    grants_df = store.of_grants("grant_final.csv", grants).copy()
+    grants_df["AmountGrantedAllSets"] = pd.to_numeric(grants_df["AmountGrantedAllSets"], errors="coerce")
+    return grants_df
+
+
+def participations(store, grants, grants_df):
+    people = store["person_final.csv"][["PersonNumber", "Gender"]]
+    links = store.of_grants("GrantToPerson.csv", grants)[["GrantNumber", "PersonNumber"]]
+    rows = links.merge(people, on="PersonNumber").merge(grants_df, on="GrantNumber")
+    rows["Gender"] = rows["Gender"].str.strip().str.lower()
+    return rows
+
+
+def discipline_parts(store, grants, tree):
+    assignments = grant_assignments(store.of_grants("GrantToDiscipline.csv", grants), tree)
+    grants_df = grant_rows(store, grants)
+    funding = rollup(leaf_totals(grants_df, assignments, ["CallDecisionYear"]), tree, ["CallDecisionYear"])
+    people = participations(store, grants, grants_df)
+    gender = rollup(leaf_totals(people, assignments, ["start_year", "Gender"]), tree, ["start_year", "Gender"])
+    return assignments, funding, gender
+
+
+def sketch_part(store, grants):
+    grants_df = grant_rows(store, grants)
+    people = participations(store, grants, grants_df)
+    return build_grant_sketches(grants_df.dropna(subset=["CallDecisionYear"]), people.dropna(subset=["start_year", "Gender"]))
+
+
+def output_part(store, grants):
+    frames = [output_rows(output_type, store.of_grants(os.path.basename(path), grants), year_column)
+              for output_type, (path, year_column) in OUTPUT_TABLES.items() if os.path.basename(path) in store]
+    return count_outputs(pd.concat(frames, ignore_index=True))
+
+
+def keyword_counts_part(rows, keyword_ids):
+    mentions = keyword_mentions(rows)
+    mentions["KeywordId"] = mentions["Keyword"].map(keyword_ids)
+    return mentions.groupby(["Method", "Language", "MainDiscipline", "Year", "KeywordId"]).size().reset_index(name="Count")
+
+
+def update_derived(old, new, grants, changed_tables, persist=True):
+    """Patched derived files keyed by path, touching only the rows of the affected grants."""
+    updates = {}
+
+    grant_tables = all(name in new for name in ("grant_final.csv", "person_final.csv", "GrantToPerson.csv"))
+    if grant_tables and os.path.exists(TREE_PATH) and "GrantToDiscipline.csv" in new:
+        tree = pd.read_csv(TREE_PATH)
+        _, old_funding, old_gender = discipline_parts(old, grants, tree)
+        assignments, new_funding, new_gender = discipline_parts(new, grants, tree)
+        if os.path.exists(ASSIGNMENTS_PATH):
+            updates[ASSIGNMENTS_PATH] = replace_grant_rows(pd.read_parquet(ASSIGNMENTS_PATH), assignments, grants)
+        if os.path.exists(FUNDING_ROLLUP_PATH):
+            updates[FUNDING_ROLLUP_PATH] = patch_totals(pd.read_csv(FUNDING_ROLLUP_PATH), old_funding, new_funding,
+                                                        ["CallDecisionYear", "Code"], ["Rows", "Funding"], "Rows")
+        if os.path.exists(GENDER_ROLLUP_PATH):
+            updates[GENDER_ROLLUP_PATH] = patch_totals(pd.read_csv(GENDER_ROLLUP_PATH), old_gender, new_gender,
+                                                       ["start_year", "Gender", "Code"], ["Rows", "Funding"], "Rows")
+
+    if grant_tables and os.path.exists(SKETCHES_PATH):
+        keys = ["Dimension", "Year", "Group", "Bucket"]
+        sketches = patch_totals(pd.read_parquet(SKETCHES_PATH), sketch_part(old, grants), sketch_part(new, grants), keys, ["Count"], "Count")
+        sketches["Year"] = sketches["Year"].astype("int16")
+        sketches["Bucket"] = sketches["Bucket"].astype("int16")
+        for column in ["Dimension", "Group"]:
+            sketches[column] = sketches[column].astype("category")
+        updates[SKETCHES_PATH] = sketches
+
+    if os.path.exists(COLLAB_PATH) and all(name in new for name in ("GrantToPerson.csv", "Person.csv", "Institute.csv", "Grant.csv")):
+        collab = pd.read_csv(COLLAB_PATH)
+        old_rows = collab[normalize_grant_numbers(collab["GrantNumber"]).isin(grants).to_numpy()]
+        new_rows = build_collaboration_rows(new.of_grants("GrantToPerson.csv", grants), new["Person.csv"],
+                                            new["Institute.csv"], new.of_grants("Grant.csv", grants))
+        updates[COLLAB_PATH] = replace_grant_rows(collab, new_rows, grants)
+        if os.path.exists(PAIR_COUNTS_PATH):
+            updates[PAIR_COUNTS_PATH] = patch_totals(pd.read_csv(PAIR_COUNTS_PATH), build_pair_counts(old_rows), build_pair_counts(new_rows),
+                                               ["Institute_x", "Institute_y"], ["collaboration_count"], "collaboration_count")
+
+    # geocodes are cached per name, so the map grid is rebuilt whole: only new institute names are matched
+    if os.path.exists(GRID_PATH) and changed_tables & {"Institute.csv", "grant_final.csv"} \
+            and all(name in new for name in ("Institute.csv", "grant_final.csv")):
+        updates[GRID_PATH] = build_institute_grid(new["Institute.csv"], new["grant_final.csv"], persist=persist)
+
+    if os.path.exists(SUMMARY_PATH) and changed_tables & {os.path.basename(path) for path, _ in OUTPUT_TABLES.values()}:
+        summary = pd.read_csv(SUMMARY_PATH, dtype={"GrantNumber": str})
+        summary["Year"] = summary["Year"].astype("Int64")
+        updates[SUMMARY_PATH] = patch_totals(summary, output_part(old, grants), output_part(new, grants),
+                                             ["GrantNumber", "OutputType", "Year"], ["Count"], "Count")
+
+    keywords_path = KEYWORDS_PARQUET_PATH if os.path.exists(KEYWORDS_PARQUET_PATH) else KEYWORDS_CSV_PATH
+    if os.path.exists(keywords_path) and "grant_final.csv" in changed_tables:
+        keywords = pd.read_parquet(keywords_path) if keywords_path.endswith(".parquet") else pd.read_csv(keywords_path)
+        old_rows = keywords[normalize_grant_numbers(keywords["GrantNumber"]).isin(grants).to_numpy()]
+        # keywords stay as extracted; only the grant metadata they are counted under is refreshed
+        meta = grant_rows(new, grants)[["GrantNumber", "StartDate", "MainDiscipline"]].astype(str)
+        meta["GrantNumber"] = normalize_grant_numbers(meta["GrantNumber"])
+        new_rows = old_rows.drop(columns=["StartDate", "MainDiscipline"]).assign(
+            GrantNumber=normalize_grant_numbers(old_rows["GrantNumber"])).merge(meta, on="GrantNumber")[keywords.columns]
+        updates[keywords_path] = replace_grant_rows(keywords, new_rows, grants)
+
+        if os.path.exists(VOCAB_PATH) and os.path.exists(COUNTS_PATH):
+            vocab = pd.read_parquet(VOCAB_PATH)
+            unseen = keyword_mentions(new_rows)["Keyword"]
+            unseen = pd.Index(unseen[~unseen.isin(vocab["Keyword"])].unique())
+            vocab = pd.concat([vocab, pd.DataFrame({"KeywordId": range(len(vocab), len(vocab) + len(unseen)), "Keyword": unseen})],
+                              ignore_index=True)
+            keyword_ids = pd.Series(vocab["KeywordId"].to_numpy(), index=vocab["Keyword"])
+            counts = patch_totals(pd.read_parquet(COUNTS_PATH), keyword_counts_part(old_rows, keyword_ids),
+                                  keyword_counts_part(new_rows, keyword_ids),
+                                  ["Method", "Language", "MainDiscipline", "Year", "KeywordId"], ["Count"], "Count")
+            updates[VOCAB_PATH] = vocab
+            updates[COUNTS_PATH] = typed_counts(counts)
+    return updates
+
+
+def write_atomic(df, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply a new SNSF release as inserts, updates and deletes, patching derived aggregates for the changed grants only."
+    )
+    parser.add_argument("release", help="directory holding the new release's CSVs, named like the stored tables")
+    parser.add_argument("--dry-run", action="store_true", help="report the delta without writing anything")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    old = Store(STORE_DIR)
+    releases = {name: pd.read_csv(os.path.join(args.release, name), dtype=ID_DTYPES, low_memory=False)
+                for name in TABLE_KEYS if os.path.exists(os.path.join(args.release, name))}
+    if not releases:
+        print(f"❌ No known tables in {args.release}: expected some of {', '.join(TABLE_KEYS)}")
+        return 1
+    new = Store(STORE_DIR, releases)
+
+    grants, tables, changed_tables = set(), {}, set()
+    for name, release in releases.items():
+        if name not in old:
+            print(f"🆕 {name}: {len(release):,} rows, not in the store yet")
+            tables[name] = release
+            continue
+        removed, added, counts = diff_rows(old[name], release, TABLE_KEYS[name])
+        print(f"🔁 {name}: +{counts['inserted']:,} ~{counts['updated']:,} -{counts['deleted']:,}")
+        if len(removed) or len(added):
+            changed_tables.add(name)
+            tables[name] = apply_rows(old[name], removed, added)
+            grants |= affected_grants(removed, added, old, new)
+    print(f"🎯 {len(grants):,} grants affected")
+
+    updates = update_derived(old, new, grants, changed_tables, persist=not args.dry_run) if grants else {}
+    for path, df in updates.items():
+        print(f"🧮 {os.path.basename(path)}: {len(df):,} rows")
+
+    if "grant_final.csv" in changed_tables:
+        print("⚠️ Grant texts or the grant set changed: rerun preprocess_keywords.py for new keywords, "
+              "preprocess_grant_index.py for search and preprocess_graph_analytics.py for clustering when convenient.")
+
+    if args.dry_run:
+        print(f"🧪 Dry run, nothing written ({time.perf_counter() - started:.1f}s)")
+        return 0
+    for path, df in updates.items():
+        write_atomic(df, path)
+    for name, df in tables.items():
+        write_atomic(df, os.path.join(STORE_DIR, name))
+    print(f"✅ Applied {len(tables)} tables and {len(updates)} derived files in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import os
+import streamlit as st
+import pandas as pd
+from memory_cache import memory_cache
+from preprocess_disciplines import TREE_PATH, ASSIGNMENTS_PATH, leaf_totals, rollup
+
+@memory_cache()
+def load_discipline_tree():
+    if not (os.path.exists(TREE_PATH) and os.path.exists(ASSIGNMENTS_PATH)):
+        return None, None
+    return pd.read_csv(TREE_PATH), pd.read_parquet(ASSIGNMENTS_PATH)
+
+@memory_cache()
+def load_rollup(path):
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, dtype={"Gender": "category"})
+
+def live_rollup(rows, keys):
+    """Same rollup as the preprocessed one, for a frame narrowed by filters the rollup can't know about."""
+    tree, assignments = load_discipline_tree()
+    return rollup(leaf_totals(rows, assignments, keys), tree, keys)
+
+def child_totals(totals, parent_code, year_column, year_range, by=()):
+    """Totals of the direct children of a node (roots for -1) over a year range, read from a rollup."""
+    tree, _ = load_discipline_tree()
+    children = tree[tree["ParentCode"] == parent_code][["Code", "Discipline"]]
+    rows = totals[totals["Code"].isin(children["Code"]) & totals[year_column].between(*year_range)]
+    rows = rows.groupby(["Code", *by], observed=True)[["Rows", "Funding"]].sum().reset_index()
+    return rows.merge(children, on="Code").sort_values("Funding", ascending=False)
+
+def drilldown_path(key):
+    """Level 1 → Level 2 selectors; returns the code whose children should be shown and its label."""
+    tree, _ = load_discipline_tree()
+    node, label = -1, "All Disciplines"
+    col1, col2 = st.columns(2)
+    for column, level in ((col1, 1), (col2, 2)):
+        options = tree[tree["ParentCode"] == node].sort_values("Discipline")
+        if options.empty:
+            break
+        choice = column.selectbox(f"Level {level}", ["(All)"] + options["Discipline"].tolist(), key=f"{key}_level{level}")
+        if choice == "(All)":
+            break
+        node, label = int(options.loc[options["Discipline"] == choice, "Code"].iloc[0]), choice
+    return node, label
@@ -0,0 +1,137 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction runs unlocked, writes are still atomic
+    fcntl = None
+
+CACHE_DIR = os.environ.get("SNSF_CACHE_DIR", ".cache/snsf")
+MAX_BYTES = int(os.environ.get("SNSF_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+_file_digests = {}
+
+
+def file_digest(path):
+    """Content hash of an input file, recomputed only when its size or mtime changes."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    marker = (stat.st_size, stat.st_mtime_ns)
+    cached = _file_digests.get(path)
+    if cached and cached[0] == marker:
+        return cached[1]
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    _file_digests[path] = (marker, sha.hexdigest())
+    return sha.hexdigest()
+
+
+def _hash_arg(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return hashlib.sha256(pd.util.hash_pandas_object(value).values.tobytes()).hexdigest()
+    return repr(value)
+
+
+def _function_identity(func):
+    """Name plus a digest of the file defining it, so editing a helper in the same module
+    (``_graph_stats``, ``filter_call_years``) invalidates its callers too."""
+    try:
+        module_digest = file_digest(inspect.getsourcefile(func))
+    except TypeError:  # built-ins have no source file
+        module_digest = ""
+    return f"{func.__module__}.{func.__qualname__}:{module_digest}"
+
+
+def cache_key(func, inputs, args, kwargs):
+    parts = [_function_identity(func)]
+    parts += [f"{path}={file_digest(path)}" for path in inputs]
+    parts += [_hash_arg(a) for a in args]
+    parts += [f"{k}={_hash_arg(v)}" for k, v in sorted(kwargs.items())]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _read(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _write(base, result):
+    """Atomically write a result: DataFrames as Parquet, anything else pickled."""
+    tmp = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if isinstance(result, pd.DataFrame):
+        try:
+            result.to_parquet(tmp)
+            os.replace(tmp, f"{base}.parquet")
+            return
+        except (pa.ArrowException, ValueError, TypeError):
+            pass  # mixed-type object columns don't round-trip through Arrow
+    with open(tmp, "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, f"{base}.pkl")
+
+
+def evict(max_bytes=MAX_BYTES, cache_dir=CACHE_DIR):
+    """Delete least recently used entries until the cache fits the byte budget."""
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, ".lock"), "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith((".parquet", ".pkl")):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def disk_cache(inputs=(), max_bytes=None):
+    """Persist a function's results across restarts and workers.
+
+    Entries are keyed by the function's identity and the source of its module,
+    the content of the ``inputs`` files and the call arguments. Helpers imported
+    from other modules aren't covered: after editing one, clear ``CACHE_DIR``. The entry's mtime is its LRU
+    clock, so any process can evict and any process can reuse a result.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            base = os.path.join(CACHE_DIR, cache_key(func, inputs, args, kwargs))
+            for path in (f"{base}.parquet", f"{base}.pkl"):
+                try:
+                    result = _read(path)
+                    os.utime(path)
+                    return result
+                except (FileNotFoundError, EOFError, pickle.UnpicklingError, pa.ArrowException):
+                    continue  # not cached, or evicted/replaced by another worker while reading
+
+            result = func(*args, **kwargs)
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write(base, result)
+            evict(max_bytes or MAX_BYTES)
+            return result
+        return wrapper
+    return decorator
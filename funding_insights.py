@@ -1,35 +1,113 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-
-@st.cache_data
+import plotly.graph_objects as go
+from disk_cache import disk_cache
+from data_io import GRANT_TYPES, read_table
+from memory_cache import memory_cache
+from shared_store import shared_table
+from utils import styled_plot, cached_chart
+from grant_search import GRANT_IDS_PATH, with_grant_docs, filter_grants, active_query
+from discipline_tree import load_discipline_tree, load_rollup, live_rollup, child_totals, drilldown_path
+from preprocess_disciplines import FUNDING_ROLLUP_PATH
+from preprocess_grant_sketches import SKETCHES_PATH, ALL, dimension_sketches
+from quantile_sketch import sketch_quantiles
+
+FUNDING_COLUMNS = ["GrantNumber", "CallDecisionYear", "start_year", "AmountGrantedAllSets", "MainDiscipline",
+                   "ResearchInstitution", "FundingInstrumentLevel1", "StartDate", "EndDate"]
+FUNDING_INPUTS = ["data/grant_final.csv", GRANT_IDS_PATH]
+COMPACT_LAYOUT = dict(margin=dict(t=25, b=20, l=10, r=10), font=dict(color="#2B2B2B", size=11))
+
+@shared_table("funding", inputs=FUNDING_INPUTS)
+@memory_cache()
+@disk_cache(inputs=FUNDING_INPUTS)
 def load_funding_data():
-    df = pd.read_csv("data/grant_final.csv")
+    df = read_table("data/grant_final.csv", FUNDING_COLUMNS, GRANT_TYPES)
     df = df[df['AmountGrantedAllSets'].notna()]
     df['AmountGrantedAllSets'] = pd.to_numeric(df['AmountGrantedAllSets'], errors='coerce')
     df['CallDecisionYear'] = pd.to_numeric(df['CallDecisionYear'], errors='coerce')
-    return df
-
-def styled_plot(fig):
-    fig.update_layout(
-        margin=dict(t=25, b=20, l=10, r=10),
-        plot_bgcolor="#E4E1DC",
-        paper_bgcolor="#E4E1DC",
-        font=dict(color="#2B2B2B", size=11),
-        xaxis=dict(color="#2B2B2B"),
-        yaxis=dict(color="#2B2B2B"),
-        legend=dict(font=dict(color="#2B2B2B"))
-    )
+    return with_grant_docs(df)
+
+def filter_call_years(df, year_range):
+    return df[(df['CallDecisionYear'] >= year_range[0]) & (df['CallDecisionYear'] <= year_range[1])]
+
+def yearly_funding(df):
+    yearly = df.groupby("CallDecisionYear")["AmountGrantedAllSets"].agg(["sum", "size", "mean"]).reset_index()
+    yearly.columns = ["CallDecisionYear", "AmountGrantedAllSets", "GrantCount", "AvgGrant"]
+    yearly["YoY_Growth"] = yearly["AmountGrantedAllSets"].pct_change() * 100
+    return yearly
+
+def top_by(df, column, top_n):
+    """Top-N values of a dimension by total funding, by grant count and by average grant size."""
+    top_funding = df.groupby(column)["AmountGrantedAllSets"].sum().reset_index()
+    top_funding = top_funding.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
+
+    top_counts = df[column].value_counts().head(top_n).reset_index()
+    top_counts.columns = [column, "GrantCount"]
+
+    avg_grant = df.groupby(column)["AmountGrantedAllSets"].mean().reset_index()
+    avg_grant = avg_grant.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
+    return top_funding, top_counts, avg_grant
+
+@memory_cache()
+def load_grant_sketches():
+    if not os.path.exists(SKETCHES_PATH):
+        return None
+    return pd.read_parquet(SKETCHES_PATH)
+
+def grant_size_quantiles(df, dimension, year_range, year_column="CallDecisionYear", by_year=False, live=False):
+    """Grant-size p10…p90 per group, merged from the precomputed per-year sketches.
+
+    With ``live`` (filters the sketches don't cover), while a grant search is
+    active, or before the sketches are built, they are built from ``df`` instead.
+    """
+    sketches = load_grant_sketches()
+    if sketches is None or live or active_query():
+        sketches = dimension_sketches(df, dimension, year_column)
+    else:
+        sketches = sketches[sketches["Dimension"] == dimension]
+    sketches = sketches[sketches["Year"].between(*year_range)]
+    return sketch_quantiles(sketches, ["Year", "Group"] if by_year else ["Group"])
+
+def size_band_figure(quantiles, title, color="#7A5B9D"):
+    fig = go.Figure([
+        go.Scatter(x=quantiles["Year"], y=quantiles["p90"], line=dict(width=0), showlegend=False, hoverinfo="skip"),
+        go.Scatter(x=quantiles["Year"], y=quantiles["p10"], line=dict(width=0), fill="tonexty",
+                   fillcolor="rgba(122, 91, 157, 0.2)", showlegend=False, hoverinfo="skip"),
+        go.Scatter(x=quantiles["Year"], y=quantiles["p50"], line=dict(color=color), name="Median",
+                   customdata=quantiles[["p10", "p90"]],
+                   hovertemplate="%{x}: %{y:,.0f} (p10 %{customdata[0]:,.0f}, p90 %{customdata[1]:,.0f})<extra></extra>"),
+    ])
+    fig.update_layout(title=title, showlegend=False)
     return fig
 
+def show_chart(column, chart_id, data, height, build):
+    fig = cached_chart(f"funding/{chart_id}/{height}", data,
+                       lambda d: styled_plot(build(d), height=height, **COMPACT_LAYOUT))
+    column.plotly_chart(fig, use_container_width=True)
+
+def show_top_charts(columns, dimension, top_funding, top_counts, grant_sizes, height=190):
+    col1, col2, col3 = columns
+    show_chart(col1, f"{dimension}/total", top_funding, height,
+               lambda d: px.bar(d, x="AmountGrantedAllSets", y=dimension, orientation="h",
+                                title="Total Funding", color_discrete_sequence=["#3B4C59"]))
+    show_chart(col2, f"{dimension}/count", top_counts, height,
+               lambda d: px.bar(d, x="GrantCount", y=dimension, orientation="h",
+                                title="Grant Count", color_discrete_sequence=["#9A5A41"]))
+    show_chart(col3, f"{dimension}/median", grant_sizes, height,
+               lambda d: px.bar(d, x="p50", y="Group", orientation="h", error_x=d["p90"] - d["p50"],
+                                error_x_minus=d["p50"] - d["p10"], labels={"p50": "Median", "Group": dimension},
+                                title="Median Grant Size (p10–p90)", color_discrete_sequence=["#7A5B9D"]))
+
 def show_funding_insights():
     st.markdown("<h5 style='color:#3B4C59; margin-bottom:0.3rem;'>Funding Insights Dashboard</h5>", unsafe_allow_html=True)
-    df = load_funding_data()
+    df = filter_grants(load_funding_data())
 
     with st.sidebar:
         min_year, max_year = int(df['CallDecisionYear'].min()), int(df['CallDecisionYear'].max())
         year_range = st.slider("Call Decision Year", min_year, max_year, (min_year, max_year))
-        df = df[(df['CallDecisionYear'] >= year_range[0]) & (df['CallDecisionYear'] <= year_range[1])]
+        df = filter_call_years(df, year_range)
         top_n = st.selectbox("Show Top N Items", options=[5, 10, 15, 20, 30, 40, 50], index=0)
 
     tabs = st.tabs(["Overview", "By Discipline", "By Institution", "By Funding Type", "By Duration"])
@@ -42,60 +120,28 @@ def show_funding_insights():
         col3.metric("Avg Grant Size", f"CHF {df['AmountGrantedAllSets'].mean():,.0f}")
         col4, col5, col6, col7 = st.columns(4)
 
-        yearly_total = df.groupby("CallDecisionYear")["AmountGrantedAllSets"].sum().reset_index()
-        fig1 = px.area(yearly_total, x="CallDecisionYear", y="AmountGrantedAllSets", title="Total Funding",
-                       color_discrete_sequence=["#3B4C59"])
-        fig1.update_layout(height=230)
-        col4.plotly_chart(styled_plot(fig1), use_container_width=True)
-
-        yearly_count = df.groupby("CallDecisionYear").size().reset_index(name="GrantCount")
-        fig2 = px.bar(yearly_count, x="CallDecisionYear", y="GrantCount", title="Grant Count",
-                      color_discrete_sequence=["#9A5A41"])
-        fig2.update_layout(height=230)
-        col5.plotly_chart(styled_plot(fig2), use_container_width=True)
-
-        yearly_avg = df.groupby("CallDecisionYear")["AmountGrantedAllSets"].mean().reset_index()
-        fig3 = px.line(yearly_avg, x="CallDecisionYear", y="AmountGrantedAllSets", title="Avg Grant Size",
-                       color_discrete_sequence=["#7A5B9D"])
-        fig3.update_layout(height=230)
-        col6.plotly_chart(styled_plot(fig3), use_container_width=True)
-
-        yearly_total["YoY_Growth"] = yearly_total["AmountGrantedAllSets"].pct_change() * 100
-        fig4 = px.bar(yearly_total, x="CallDecisionYear", y="YoY_Growth", title="YoY Growth (%)",
-                      color_discrete_sequence=["#3B4C59"])
-        fig4.update_layout(height=230)
-        col7.plotly_chart(styled_plot(fig4), use_container_width=True)
+        yearly_total = yearly_funding(df)
+        show_chart(col4, "overview/total", yearly_total, 230,
+                   lambda d: px.area(d, x="CallDecisionYear", y="AmountGrantedAllSets", title="Total Funding", color_discrete_sequence=["#3B4C59"]))
+
+        show_chart(col5, "overview/count", yearly_total, 230,
+                   lambda d: px.bar(d, x="CallDecisionYear", y="GrantCount", title="Grant Count", color_discrete_sequence=["#9A5A41"]))
+
+        show_chart(col6, "overview/median", grant_size_quantiles(df, ALL, year_range, by_year=True), 230,
+                   lambda d: size_band_figure(d, "Median Grant Size (p10–p90)"))
+
+        show_chart(col7, "overview/growth", yearly_total, 230,
+                   lambda d: px.bar(d, x="CallDecisionYear", y="YoY_Growth", title="YoY Growth (%)", color_discrete_sequence=["#3B4C59"]))
     # === BY DISCIPLINE ===
     with tabs[1]:
         st.markdown("<h6 style='margin-bottom: 0.2rem;'>Top Disciplines by Funding, Count, Avg & Trend</h6>", unsafe_allow_html=True)
 
         # Prepare data
-        top_funding = df.groupby("MainDiscipline")["AmountGrantedAllSets"].sum().reset_index()
-        top_funding = top_funding.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
-
-        top_counts = df["MainDiscipline"].value_counts().head(top_n).reset_index()
-        top_counts.columns = ["MainDiscipline", "GrantCount"]
-
-        avg_grant = df.groupby("MainDiscipline")["AmountGrantedAllSets"].mean().reset_index()
-        avg_grant = avg_grant.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
+        top_funding, top_counts, _ = top_by(df, "MainDiscipline", top_n)
 
         # Row 1: 3 side-by-side charts
-        col1, col2, col3 = st.columns(3)
-
-        fig1 = px.bar(top_funding, x="AmountGrantedAllSets", y="MainDiscipline",
-                      orientation="h", title="Total Funding", color_discrete_sequence=["#3B4C59"])
-        fig1.update_layout(height=190)
-        col1.plotly_chart(styled_plot(fig1), use_container_width=True)
-
-        fig2 = px.bar(top_counts, x="GrantCount", y="MainDiscipline",
-                      orientation="h", title="Grant Count", color_discrete_sequence=["#9A5A41"])
-        fig2.update_layout(height=190)
-        col2.plotly_chart(styled_plot(fig2), use_container_width=True)
-
-        fig3 = px.bar(avg_grant, x="AmountGrantedAllSets", y="MainDiscipline",
-                      orientation="h", title="Avg Grant Size", color_discrete_sequence=["#7A5B9D"])
-        fig3.update_layout(height=190)
-        col3.plotly_chart(styled_plot(fig3), use_container_width=True)
+        show_top_charts(st.columns(3), "MainDiscipline", top_funding, top_counts,
+                        grant_size_quantiles(df, "MainDiscipline", year_range).nlargest(top_n, "p50"))
 
         # Row 2: Dropdown (right) + Trend (left)
         col_left, col_right = st.columns([8, 2])
@@ -116,44 +162,34 @@ def show_funding_insights():
         trend_grouped = trend_df.groupby("CallDecisionYear")["AmountGrantedAllSets"].sum().reset_index()
 
         if not trend_grouped.empty:
-            fig4 = px.line(trend_grouped, x="CallDecisionYear", y="AmountGrantedAllSets",
-                           title=f"Funding Trend – {selected_discipline}",
-                           color_discrete_sequence=["#3B4C59"])
-            fig4.update_layout(height=140)
-            col_left.plotly_chart(styled_plot(fig4), use_container_width=True)
+            show_chart(col_left, f"discipline-trend/{selected_discipline}", trend_grouped, 140,
+                       lambda d: px.line(d, x="CallDecisionYear", y="AmountGrantedAllSets", title=f"Funding Trend – {selected_discipline}", color_discrete_sequence=["#3B4C59"]))
         else:
             col_left.info("No funding data available for this discipline.")
+
+        # Row 3: Hierarchy drill-down over precomputed subtree totals
+        tree, _ = load_discipline_tree()
+        totals = live_rollup(df, ["CallDecisionYear"]) if tree is not None and active_query() else load_rollup(FUNDING_ROLLUP_PATH)
+        if tree is not None and totals is not None:
+            st.markdown("<h6 style='margin-bottom: 0.2rem;'>Discipline Hierarchy</h6>", unsafe_allow_html=True)
+            node, label = drilldown_path("funding_hierarchy")
+            children = child_totals(totals, node, "CallDecisionYear", year_range).rename(columns={"Rows": "Grants"})
+            if children.empty:
+                st.info(f"No sub-disciplines under {label}.")
+            else:
+                show_chart(st, f"hierarchy/{node}", children, 60 + 24 * len(children),
+                           lambda d: px.bar(d, x="Funding", y="Discipline", orientation="h", hover_data={"Grants": ":.1f"},
+                                            title=f"Funding within {label}", color_discrete_sequence=["#3B4C59"]))
     # === BY INSTITUTION ===
     with tabs[2]:
         st.markdown("<h6 style='margin-bottom: 0.2rem;'>Top Institutions by Funding, Count, Avg & Trend</h6>", unsafe_allow_html=True)
 
         # Prepare data
-        top_funding = df.groupby("ResearchInstitution")["AmountGrantedAllSets"].sum().reset_index()
-        top_funding = top_funding.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
-
-        top_counts = df["ResearchInstitution"].value_counts().head(top_n).reset_index()
-        top_counts.columns = ["ResearchInstitution", "GrantCount"]
-
-        avg_grant = df.groupby("ResearchInstitution")["AmountGrantedAllSets"].mean().reset_index()
-        avg_grant = avg_grant.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
+        top_funding, top_counts, _ = top_by(df, "ResearchInstitution", top_n)
 
         # Row 1: 3 compact bar charts
-        col1, col2, col3 = st.columns(3)
-
-        fig1 = px.bar(top_funding, x="AmountGrantedAllSets", y="ResearchInstitution",
-                      orientation="h", title="Total Funding", color_discrete_sequence=["#3B4C59"])
-        fig1.update_layout(height=190)
-        col1.plotly_chart(styled_plot(fig1), use_container_width=True)
-
-        fig2 = px.bar(top_counts, x="GrantCount", y="ResearchInstitution",
-                      orientation="h", title="Grant Count", color_discrete_sequence=["#9A5A41"])
-        fig2.update_layout(height=190)
-        col2.plotly_chart(styled_plot(fig2), use_container_width=True)
-
-        fig3 = px.bar(avg_grant, x="AmountGrantedAllSets", y="ResearchInstitution",
-                      orientation="h", title="Avg Grant Size", color_discrete_sequence=["#7A5B9D"])
-        fig3.update_layout(height=190)
-        col3.plotly_chart(styled_plot(fig3), use_container_width=True)
+        show_top_charts(st.columns(3), "ResearchInstitution", top_funding, top_counts,
+                        grant_size_quantiles(df, "ResearchInstitution", year_range).nlargest(top_n, "p50"))
 
         # Row 2: Dropdown (right) + Trend chart (left)
         col_left, col_right = st.columns([8, 2])
@@ -174,11 +210,8 @@ def show_funding_insights():
         trend_grouped = trend_df.groupby("CallDecisionYear")["AmountGrantedAllSets"].sum().reset_index()
 
         if not trend_grouped.empty:
-            fig4 = px.line(trend_grouped, x="CallDecisionYear", y="AmountGrantedAllSets",
-                           title=f"Funding Trend – {selected_inst}",
-                           color_discrete_sequence=["#3B4C59"])
-            fig4.update_layout(height=160)
-            col_left.plotly_chart(styled_plot(fig4), use_container_width=True)
+            show_chart(col_left, f"institution-trend/{selected_inst}", trend_grouped, 160,
+                       lambda d: px.line(d, x="CallDecisionYear", y="AmountGrantedAllSets", title=f"Funding Trend – {selected_inst}", color_discrete_sequence=["#3B4C59"]))
         else:
             col_left.info("No funding data available for this institution.")
     # === BY FUNDING TYPE ===
@@ -187,51 +220,26 @@ def show_funding_insights():
 
         if "FundingInstrumentLevel1" in df.columns:
 
-            top_funding = df.groupby("FundingInstrumentLevel1")["AmountGrantedAllSets"].sum().reset_index()
-            top_funding = top_funding.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
-
-            top_counts = df["FundingInstrumentLevel1"].value_counts().head(top_n).reset_index()
-            top_counts.columns = ["FundingInstrumentLevel1", "GrantCount"]
+            top_funding, top_counts, _ = top_by(df, "FundingInstrumentLevel1", top_n)
 
-            avg_grant = df.groupby("FundingInstrumentLevel1")["AmountGrantedAllSets"].mean().reset_index()
-            avg_grant = avg_grant.sort_values("AmountGrantedAllSets", ascending=False).head(top_n)
-
-            col1, col2, col3 = st.columns(3)
-
-            fig1 = px.bar(top_funding, x="AmountGrantedAllSets", y="FundingInstrumentLevel1",
-                          orientation="h", title="Total Funding", color_discrete_sequence=["#3B4C59"])
-            fig1.update_layout(height=190)
-            col1.plotly_chart(styled_plot(fig1), use_container_width=True)
-
-            fig2 = px.bar(top_counts, x="GrantCount", y="FundingInstrumentLevel1",
-                          orientation="h", title="Grant Count", color_discrete_sequence=["#9A5A41"])
-            fig2.update_layout(height=190)
-            col2.plotly_chart(styled_plot(fig2), use_container_width=True)
-
-            fig3 = px.bar(avg_grant, x="AmountGrantedAllSets", y="FundingInstrumentLevel1",
-                          orientation="h", title="Avg Grant Size", color_discrete_sequence=["#7A5B9D"])
-            fig3.update_layout(height=190)
-            col3.plotly_chart(styled_plot(fig3), use_container_width=True)
+            show_top_charts(st.columns(3), "FundingInstrumentLevel1", top_funding, top_counts,
+                            grant_size_quantiles(df, "FundingInstrumentLevel1", year_range).nlargest(top_n, "p50"))
 
             grouped = df.groupby(["CallDecisionYear", "FundingInstrumentLevel1"])["AmountGrantedAllSets"].sum().reset_index()
 
-            fig4 = px.area(grouped, x="CallDecisionYear", y="AmountGrantedAllSets",
-                           color="FundingInstrumentLevel1", title="Funding Over Time by Instrument",
-                           color_discrete_sequence=px.colors.sequential.Purples_r)
-            fig4.update_layout(height=190)
-
             total_by_year = df.groupby("CallDecisionYear")["AmountGrantedAllSets"].sum().reset_index(name="TotalFunding")
             share_df = pd.merge(grouped, total_by_year, on="CallDecisionYear")
             share_df["Share"] = (share_df["AmountGrantedAllSets"] / share_df["TotalFunding"]) * 100
 
-            fig5 = px.line(share_df, x="CallDecisionYear", y="Share", color="FundingInstrumentLevel1",
-                           title="% Share of Funding by Instrument", markers=True,
-                           color_discrete_sequence=px.colors.qualitative.Set2)
-            fig5.update_layout(height=190)
-
             col4, col5 = st.columns(2)
-            col4.plotly_chart(styled_plot(fig4), use_container_width=True)
-            col5.plotly_chart(styled_plot(fig5), use_container_width=True)
+            show_chart(col4, "instrument/over-time", grouped, 190,
+                       lambda d: px.area(d, x="CallDecisionYear", y="AmountGrantedAllSets",
+                                         color="FundingInstrumentLevel1", title="Funding Over Time by Instrument",
+                                         color_discrete_sequence=px.colors.sequential.Purples_r))
+            show_chart(col5, "instrument/share", share_df, 190,
+                       lambda d: px.line(d, x="CallDecisionYear", y="Share", color="FundingInstrumentLevel1",
+                                         title="% Share of Funding by Instrument", markers=True,
+                                         color_discrete_sequence=px.colors.qualitative.Set2))
 
         else:
             st.warning("Column 'FundingInstrumentLevel1' not found in the dataset.")
@@ -249,23 +257,15 @@ def show_funding_insights():
             col1, col2, col3 = st.columns(3)
 
             avg_discipline = filtered_df.groupby("MainDiscipline")["DurationMonths"].mean().reset_index().sort_values("DurationMonths", ascending=False).head(top_n)
-            fig1 = px.bar(avg_discipline, x="DurationMonths", y="MainDiscipline",
-                          orientation="h", title="Avg Duration by Discipline",
-                          color_discrete_sequence=["#3B4C59"])
-            fig1.update_layout(height=180)
-            col1.plotly_chart(styled_plot(fig1), use_container_width=True)
+            show_chart(col1, "duration/discipline", avg_discipline, 180,
+                       lambda d: px.bar(d, x="DurationMonths", y="MainDiscipline", orientation="h", title="Avg Duration by Discipline", color_discrete_sequence=["#3B4C59"]))
 
-            fig2 = px.histogram(filtered_df, x="DurationMonths", nbins=25,
-                                title="Duration Distribution", color_discrete_sequence=["#9A5A41"])
-            fig2.update_layout(height=180)
-            col2.plotly_chart(styled_plot(fig2), use_container_width=True)
+            show_chart(col2, "duration/histogram", filtered_df[["DurationMonths"]], 180,
+                       lambda d: px.histogram(d, x="DurationMonths", nbins=25, title="Duration Distribution", color_discrete_sequence=["#9A5A41"]))
 
             avg_inst = filtered_df.groupby("ResearchInstitution")["DurationMonths"].mean().reset_index().sort_values("DurationMonths", ascending=False).head(top_n)
-            fig3 = px.bar(avg_inst, x="DurationMonths", y="ResearchInstitution",
-                          orientation="h", title="Avg Duration by Institution",
-                          color_discrete_sequence=["#7A5B9D"])
-            fig3.update_layout(height=180)
-            col3.plotly_chart(styled_plot(fig3), use_container_width=True)
+            show_chart(col3, "duration/institution", avg_inst, 180,
+                       lambda d: px.bar(d, x="DurationMonths", y="ResearchInstitution", orientation="h", title="Avg Duration by Institution", color_discrete_sequence=["#7A5B9D"]))
 
             col_left, col_right = st.columns([8, 2])
 
@@ -285,11 +285,8 @@ def show_funding_insights():
             trend_grouped = trend_df.groupby("CallDecisionYear")["DurationMonths"].mean().reset_index()
 
             if not trend_grouped.empty:
-                fig4 = px.line(trend_grouped, x="CallDecisionYear", y="DurationMonths",
-                               title=f"Avg Duration Over Time – {selected_discipline}",
-                               color_discrete_sequence=["#3B4C59"])
-                fig4.update_layout(height=160)
-                col_left.plotly_chart(styled_plot(fig4), use_container_width=True)
+                show_chart(col_left, f"duration-trend/{selected_discipline}", trend_grouped, 160,
+                           lambda d: px.line(d, x="CallDecisionYear", y="DurationMonths", title=f"Avg Duration Over Time – {selected_discipline}", color_discrete_sequence=["#3B4C59"]))
             else:
                 col_left.info("No duration data available for this discipline.")
         else:
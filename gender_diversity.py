@@ -2,28 +2,57 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-
-@st.cache_data
+from disk_cache import disk_cache
+from data_io import GRANT_TYPES, PERSON_TYPES, LINK_TYPES, read_tables
+from memory_cache import memory_cache
+from shared_store import shared_table
+from grant_search import GRANT_IDS_PATH, with_grant_docs, filter_grants, active_query
+from discipline_tree import load_discipline_tree, load_rollup, live_rollup, child_totals, drilldown_path
+from preprocess_disciplines import GENDER_ROLLUP_PATH
+from funding_insights import grant_size_quantiles
+
+GENDER_GRANT_COLUMNS = ['GrantNumber', 'start_year', 'CallDecisionYear', 'AmountGrantedAllSets', 'ResearchInstitution', 'MainDiscipline']
+GENDER_INPUTS = ["data/person_final.csv", "data/GrantToPerson.csv", "data/grant_final.csv", GRANT_IDS_PATH]
+
+@shared_table("gender", inputs=GENDER_INPUTS)
+@memory_cache()
+@disk_cache(inputs=GENDER_INPUTS)
 def load_gender_data():
-    person_df = pd.read_csv("data/person_final.csv")
-    g2p_df = pd.read_csv("data/GrantToPerson.csv")
-    grant_df = pd.read_csv("data/grant_final.csv")
+    tables = read_tables({
+        "person": ("data/person_final.csv", None, PERSON_TYPES),
+        "links": ("data/GrantToPerson.csv", None, LINK_TYPES),
+        "grants": ("data/grant_final.csv", GENDER_GRANT_COLUMNS, GRANT_TYPES),
+    })
+    person_df, g2p_df, grant_df = tables["person"], tables["links"], tables["grants"]
 
     merged1 = pd.merge(g2p_df, person_df, on="PersonNumber", how="left")
     merged2 = pd.merge(
         merged1,
-        grant_df[['GrantNumber', 'start_year', 'CallDecisionYear', 'AmountGrantedAllSets', 'ResearchInstitution', 'MainDiscipline']],
+        grant_df[GENDER_GRANT_COLUMNS],
         on="GrantNumber", how="left"
     )
 
     merged2 = merged2[merged2['Gender'].notna()]
     merged2['Gender'] = merged2['Gender'].str.strip().str.lower()
-    return merged2
+    return with_grant_docs(merged2)
+
+def filter_gender(df, year_range, disciplines=None):
+    df = df[(df['start_year'] >= year_range[0]) & (df['start_year'] <= year_range[1])]
+    if disciplines is not None:
+        df = df[df['MainDiscipline'].isin(disciplines)]
+    return df
+
+def gender_summary(df):
+    summary = df.groupby("Gender")["AmountGrantedAllSets"].agg(
+        Participations="size", TotalFunding="sum", AvgFunding="mean"
+    ).reset_index()
+    summary["Share"] = (summary["Participations"] / df.shape[0] * 100).round(2) if df.shape[0] else 0
+    return summary
 
 def show_gender_diversity():
     st.markdown("## 👥 Gender Diversity")
 
-    df = load_gender_data()
+    df = filter_grants(load_gender_data())
 
     # Universal Top-N selector
     # Filters in sidebar
@@ -32,25 +61,28 @@ def show_gender_diversity():
         top_n = st.selectbox("Select Top N results to display:", [5, 10, 20, 50], index=0, key="top_n")
         min_year, max_year = int(df['start_year'].min()), int(df['start_year'].max())
         year_range = st.slider("Start Year Range", min_year, max_year, (min_year, max_year))
-        df = df[(df['start_year'] >= year_range[0]) & (df['start_year'] <= year_range[1])]
+        df = filter_gender(df, year_range)
 
         disciplines = sorted(df['MainDiscipline'].dropna().unique())
         selected_disciplines = st.multiselect("Disciplines", ["(All)"] + disciplines, default=["(All)"])
         if "(All)" in selected_disciplines:
             selected_disciplines = disciplines
-        df = df[df['MainDiscipline'].isin(selected_disciplines)]
+        df = filter_gender(df, year_range, selected_disciplines)
+        # The preprocessed sketches and rollups cover every discipline; a narrower pick is recomputed live
+        narrowed = selected_disciplines != disciplines
 
     female_df = df[df['Gender'] == 'female']
     male_df = df[df['Gender'] == 'male']
 
     # Tab-based navigation
-    tabs = st.tabs(["Overview", "Top Disciplines by Gender", "Gender Trends", "Funding Distribution"])
+    tabs = st.tabs(["Overview", "Top Disciplines by Gender", "Gender Trends", "Funding Distribution", "Discipline Hierarchy"])
 
     with tabs[0]:
         st.subheader("🔍 Gender Overview")
 
-        female_pct = round((female_df.shape[0] / df.shape[0]) * 100, 2) if df.shape[0] else 0
-        male_pct = round((male_df.shape[0] / df.shape[0]) * 100, 2) if df.shape[0] else 0
+        shares = gender_summary(df).set_index("Gender")["Share"]
+        female_pct = shares.get("female", 0)
+        male_pct = shares.get("male", 0)
 
         col1, col2 = st.columns(2)
         with col1:
@@ -205,4 +237,36 @@ def show_gender_diversity():
             fig_bar.update_layout(height=250, font=dict(size=10), margin=dict(l=10, r=10, t=30, b=10))
             st.plotly_chart(fig_bar, use_container_width=True)
 
+        st.caption("📦 Grant Size by Gender (p10 · p25 · median · p75 · p90)")
+        sizes = grant_size_quantiles(df, "Gender", year_range, year_column="start_year", live=narrowed)
+        colors = {"male": "lightblue", "female": "pink"}
+        fig_box = go.Figure([
+            go.Box(x=[row.Group], q1=[row.p25], median=[row.p50], q3=[row.p75], lowerfence=[row.p10],
+                   upperfence=[row.p90], name=row.Group, marker_color=colors.get(row.Group, "#7A5B9D"))
+            for row in sizes.itertuples()
+        ])
+        fig_box.update_layout(height=250, font=dict(size=10), margin=dict(l=10, r=10, t=30, b=10), showlegend=False)
+        st.plotly_chart(fig_box, use_container_width=True)
+
     st.sidebar.download_button("📥 Download Filtered CSV", df.to_csv(index=False), file_name="gender_data_filtered.csv")
+
+    with tabs[4]:
+        st.subheader("🌳 Gender by Discipline Hierarchy")
+        tree, _ = load_discipline_tree()
+        live = tree is not None and (narrowed or active_query())
+        totals = live_rollup(df, ["start_year", "Gender"]) if live else load_rollup(GENDER_ROLLUP_PATH)
+        if tree is None or totals is None:
+            st.info("Run `python preprocess_disciplines.py` to enable the discipline hierarchy.")
+        else:
+            node, label = drilldown_path("gender_hierarchy")
+            children = child_totals(totals, node, "start_year", year_range, by=["Gender"])
+            if children.empty:
+                st.info(f"No sub-disciplines under {label}.")
+            else:
+                children = children.rename(columns={"Rows": "Participations"})
+                children["Share"] = children["Participations"] / children.groupby("Code")["Participations"].transform("sum") * 100
+                fig = px.bar(children, x="Participations", y="Discipline", color="Gender", orientation="h",
+                             hover_data={"Share": ":.1f", "Funding": ":,.0f"}, title=f"Participations within {label}",
+                             color_discrete_map={"male": "lightblue", "female": "pink"})
+                fig.update_layout(height=80 + 24 * children["Code"].nunique(), font=dict(size=10), margin=dict(l=10, r=10, t=30, b=10))
+                st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,178 @@
+import os
+import re
+import threading
+import unicodedata
+
+import pandas as pd
+
+from disk_cache import file_digest
+
+GAZETTEER_PATH = "data/gazetteer.csv"
+GEOCODE_CACHE_PATH = "data/institute_geocode_cache.csv"
+CACHE_COLUMNS = ["Institute", "InstituteCountry", "Place", "Precision", "Latitude", "Longitude", "Gazetteer"]
+
+# Institution aliases beat city names, city names beat regions; a country centroid is the last resort
+KIND_RANK = {"institution": 0, "city": 1, "region": 2}
+
+# Legacy records read "UNI: <institution>  <city, often broken by spaces> <vehicle code>"; their
+# InstituteCountry is not always right, so the code is tried first. Codes are sometimes split too
+# ('C H', 'RU S'). A, SA and N are ambiguous and left out.
+LEGACY_RECORD = re.compile(r"^UNI:\s*(?P<body>.*?)(?:\s{2,}(?P<place>.*?))?\s+(?P<code>[A-Z]{1,3}(?: [A-Z]{1,2})?)\s*$")
+LEGACY_COUNTRY_CODES = {
+    "USA": "United States of America", "US": "United States of America", "GB": "Great Britain and Northern Ireland",
+    "CH": "Switzerland", "F": "France", "D": "Germany", "CDN": "Canada", "DN": "Canada", "I": "Italy",
+    "AUS": "Australia", "RUS": "Russia", "H": "Hungary", "TS": "Czech Republic", "PL": "Poland", "E": "Spain",
+    "NL": "Netherlands", "S": "Sweden", "R": "Romania", "J": "Japan", "IL": "Israel", "NZ": "New Zealand",
+    "SO": "Slovakia", "DK": "Denmark", "B": "Belgium", "BG": "Bulgaria", "BR": "Brazil", "VRC": "China",
+    "CN": "China", "RC": "Taiwan", "MEX": "Mexico", "GR": "Greece", "ROK": "Korean Republic (South Korea)",
+    "SF": "Finland", "RA": "Argentina", "UA": "Ukraine", "LT": "Lithuania", "SLO": "Slovenia", "TR": "Turkey",
+    "RL": "Lebanon", "LV": "Latvia", "ET": "Egypt", "EAK": "Kenya", "MA": "Morocco", "PNG": "PapuaNew Guinea",
+}
+
+_gazetteer = None
+_patterns = {}
+_resolved = None
+_lock = threading.RLock()  # guards the globals above and the cache file; taken again when geocoding
+
+
+def fold(text):
+    """Strip accents so 'Zürich', 'Zurich' and 'Genève', 'Geneve' match the same alias."""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+
+
+def load_gazetteer():
+    """Bundled places: one row per institution, city or country with its coordinates and aliases."""
+    global _gazetteer
+    with _lock:
+        if _gazetteer is None:
+            gazetteer = pd.read_csv(GAZETTEER_PATH, keep_default_na=False)
+            gazetteer["Latitude"] = gazetteer["Latitude"].astype(float)
+            gazetteer["Longitude"] = gazetteer["Longitude"].astype(float)
+            _gazetteer = gazetteer
+        return _gazetteer
+
+
+def _alias_patterns(country):
+    """Two alternations over the country's aliases, longest first: aliases written with capitals
+    ('ETH', 'Reading') match case-sensitively, the rest case-insensitively."""
+    with _lock:
+        if country not in _patterns:
+            gazetteer = load_gazetteer()
+            places = gazetteer[gazetteer["Kind"] != "country"]
+            if country in set(gazetteer["Country"]):
+                places = places[places["Country"] == country]
+            aliases = {}
+            for place in places.itertuples():
+                for alias in [place.Name] + [a for a in place.Aliases.split("|") if a]:
+                    aliases.setdefault(fold(alias), place.Index)
+            cased = sorted((a for a in aliases if a != a.lower()), key=len, reverse=True)
+            plain = sorted((a for a in aliases if a == a.lower()), key=len, reverse=True)
+            compile_ = lambda names, flags: re.compile(r"\b(" + "|".join(map(re.escape, names)) + r")\b", flags) if names else None
+            lower = {a.lower(): i for a, i in aliases.items() if a == a.lower()}
+            compact = {re.sub(r"\W", "", a.lower()): i for a, i in reversed(aliases.items())}
+            _patterns[country] = (compile_(cased, 0), compile_(plain, re.IGNORECASE), aliases, lower, compact)
+        return _patterns[country]
+
+
+def match_place(text, country):
+    """Best gazetteer row for a free-text institute name: institutions first, then the longest alias."""
+    cased, plain, aliases, lower, _ = _alias_patterns(country)
+    text = fold(text)
+    candidates = []
+    if cased is not None:
+        candidates += [aliases[m.group(1)] for m in cased.finditer(text)]
+    if plain is not None:
+        candidates += [lower[m.group(1).lower()] for m in plain.finditer(text)]
+    if not candidates:
+        return None
+    gazetteer = load_gazetteer()
+    return min(candidates, key=lambda i: (KIND_RANK[gazetteer.at[i, "Kind"]], -len(gazetteer.at[i, "Name"])))
+
+
+def match_compact(text, country):
+    """Gazetteer row for a city typed with stray spaces ('C ambridge', 'Ber keley'): the whole
+    text without spaces equals an alias, or starts with one of at least five letters."""
+    compact = _alias_patterns(country)[4]
+    text = re.sub(r"\W", "", fold(text).lower())
+    if not text:
+        return None
+    if text in compact:
+        return compact[text]
+    prefixes = [alias for alias in compact if len(alias) >= 5 and text.startswith(alias)]
+    return compact[max(prefixes, key=len)] if prefixes else None
+
+
+def geocode_institute(name, country, research_institution=""):
+    """(Place, Precision, Latitude, Longitude) from the gazetteer; the institute name is tried before
+    its research institution, then the country centroid. Legacy "UNI:" records are matched in the
+    country of their vehicle code before their own, body first and then their city. Unknown
+    countries stay unplaced."""
+    gazetteer = load_gazetteer()
+    if isinstance(research_institution, str) and isinstance(country, str) and country:
+        # 'Institution abroad - Great Britain and Northern Ireland' names the country, not Northern Ireland
+        research_institution = research_institution.replace(country, "")
+    attempts = [(match_place, name), (match_place, research_institution)]
+    countries = [country]
+    legacy = LEGACY_RECORD.match(name) if isinstance(name, str) else None
+    if legacy:
+        code = legacy["code"].replace(" ", "")
+        code = code if code in LEGACY_COUNTRY_CODES else legacy["code"].split()[-1]
+        countries = list(dict.fromkeys([LEGACY_COUNTRY_CODES.get(code, country), country]))
+        attempts = [(match_place, legacy["body"]), (match_compact, legacy["place"])] + attempts
+    matches = [match(text, place_country) if isinstance(text, str) and text else None
+               for place_country in countries for match, text in attempts]
+    matches = [index for index in matches if index is not None]
+    if matches:
+        # A region only places what no later attempt narrows down to an institution or city
+        index = next((i for i in matches if gazetteer.at[i, "Kind"] != "region"), matches[0])
+        place = gazetteer.loc[index]
+        return place["Name"], place["Kind"], place["Latitude"], place["Longitude"]
+    country = countries[0]
+    centroid = gazetteer[(gazetteer["Kind"] == "country") & (gazetteer["Country"] == country)]
+    if len(centroid):
+        return country, "country", centroid["Latitude"].iat[0], centroid["Longitude"].iat[0]
+    return None, None, None, None
+
+
+def _load_cache():
+    global _resolved
+    if _resolved is None:
+        if os.path.exists(GEOCODE_CACHE_PATH):
+            _resolved = pd.read_csv(GEOCODE_CACHE_PATH, keep_default_na=False,
+                                   na_values={column: [""] for column in ["Place", "Precision", "Latitude", "Longitude"]})
+        else:
+            _resolved = pd.DataFrame(columns=CACHE_COLUMNS)
+    return _resolved
+
+
+def _save_cache(resolved):
+    os.makedirs(os.path.dirname(GEOCODE_CACHE_PATH), exist_ok=True)
+    tmp_path = f"{GEOCODE_CACHE_PATH}.{os.getpid()}.tmp"
+    resolved.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, GEOCODE_CACHE_PATH)
+
+
+def geocode_institutes(institutes, persist=True):
+    """Coordinates for each distinct (Institute, InstituteCountry). Names seen for the first time, or
+    resolved against an older gazetteer, are matched once and persisted."""
+    global _resolved
+    version = file_digest(GAZETTEER_PATH)[:16]
+    names = institutes[["Institute", "InstituteCountry", "ResearchInstitution"]].fillna("")
+    names = names[names["Institute"] != ""].drop_duplicates(subset=["Institute", "InstituteCountry"])
+
+    with _lock:
+        cache = _load_cache()
+        cache = cache[cache["Gazetteer"] == version]
+        known = pd.MultiIndex.from_frame(cache[["Institute", "InstituteCountry"]])
+        missing = names[~pd.MultiIndex.from_frame(names[["Institute", "InstituteCountry"]]).isin(known)]
+        if len(missing):
+            places = [geocode_institute(*row) for row in missing.itertuples(index=False)]
+            new_rows = pd.DataFrame(places, columns=["Place", "Precision", "Latitude", "Longitude"])
+            new_rows.insert(0, "Institute", missing["Institute"].to_numpy())
+            new_rows.insert(1, "InstituteCountry", missing["InstituteCountry"].to_numpy())
+            new_rows["Gazetteer"] = version
+            cache = pd.concat([cache, new_rows], ignore_index=True) if len(cache) else new_rows
+            if persist:
+                _save_cache(cache)
+        _resolved = cache
+    return names.drop(columns="ResearchInstitution").merge(cache.drop(columns="Gazetteer"), on=["Institute", "InstituteCountry"], how="left")
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from preprocess_grant_index import GRANT_INDEX_PATH, GRANT_IDS_PATH
+from preprocess_outputs import normalize_grant_numbers
+from memory_cache import memory_cache
+from text_index import TextIndex
+
+QUERY_KEY = "grant_query"
+
+@st.cache_resource
+def load_grant_index():
+    if not (os.path.exists(GRANT_INDEX_PATH) and os.path.exists(GRANT_IDS_PATH)):
+        return None, None
+    grants = pd.read_csv(GRANT_IDS_PATH, dtype=str)
+    return TextIndex.load(GRANT_INDEX_PATH), grants
+
+def grant_doc_ids(grant_numbers):
+    """Index document id per row (-1 for grants the index doesn't know); loaders store it as GrantDoc."""
+    _, grants = load_grant_index()
+    if grants is None:
+        return np.full(len(grant_numbers), -1, dtype=np.int32)
+    return pd.Index(grants["GrantNumber"]).get_indexer(normalize_grant_numbers(grant_numbers)).astype(np.int32)
+
+def with_grant_docs(df):
+    df["GrantDoc"] = grant_doc_ids(df["GrantNumber"])
+    return df
+
+@memory_cache()
+def matching_docs(query):
+    """Boolean mask over index documents: grants containing every term of the query."""
+    index, _ = load_grant_index()
+    return index.matches(query)
+
+def active_query():
+    query = st.session_state.get(QUERY_KEY, "").strip()
+    index, _ = load_grant_index()
+    return query if query and index is not None else ""
+
+def filter_grants(df, query=None):
+    """Restrict rows to grants matching the sidebar search; returns df untouched when no search is active."""
+    query = active_query() if query is None else query
+    if not query or "GrantNumber" not in df.columns:
+        return df
+    codes = df["GrantDoc"].to_numpy() if "GrantDoc" in df.columns else grant_doc_ids(df["GrantNumber"])
+    matched = np.append(matching_docs(query), False)  # code -1 lands on the trailing False
+    return df[matched[codes]]
+
+def grant_search_box():
+    """Sidebar search shared by every section; the query lives in session state under QUERY_KEY."""
+    index, grants = load_grant_index()
+    if index is None:
+        return
+    query = st.text_input("🔎 Search grants", key=QUERY_KEY,
+                          help="Restrict every section to grants whose title, abstract or keywords contain all these words.")
+    if query.strip():
+        matched = matching_docs(query.strip())
+        st.caption(f"{int(matched.sum()):,} matching grants")
+        ids, _ = index.search(query, top_k=5, mask=matched)
+        for title in grants["Title"].iloc[ids].fillna(""):
+            st.caption(f"• {title[:80]}")
@@ -0,0 +1,67 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import networkx as nx
+from pyvis.network import Network
+from disk_cache import disk_cache
+from memory_cache import memory_cache
+
+CANVAS_SCALE = 60
+
+
+@memory_cache()
+def load_institute_groups():
+    inst = pd.read_csv("data/Institute.csv", usecols=["Institute", "ResearchInstitution"])
+    inst = inst.dropna(subset=["Institute"]).drop_duplicates(subset="Institute")
+    return inst.set_index("Institute")["ResearchInstitution"].fillna("Unknown")
+
+
+def collapse_graph(edges, group_of, expanded=()):
+    """Collapse nodes into their group unless the group is expanded; parallel edges are summed."""
+    edges = edges[["source", "target", "weight"]].copy()
+    nodes = pd.unique(edges[["source", "target"]].values.ravel())
+    groups = pd.Series(nodes, index=nodes).map(group_of).fillna(pd.Series(nodes, index=nodes))
+    keep = groups.isin(list(expanded))
+    label = groups.where(~keep, groups.index.to_series())
+
+    edges["source"] = edges["source"].map(label)
+    edges["target"] = edges["target"].map(label)
+    edges = edges[edges["source"] != edges["target"]]
+    swap = edges["source"] > edges["target"]
+    edges.loc[swap, ["source", "target"]] = edges.loc[swap, ["target", "source"]].values
+    edges = edges.groupby(["source", "target"], as_index=False)["weight"].sum()
+
+    members = label.value_counts()
+    node_df = pd.DataFrame({"node": members.index, "members": members.values})
+    node_df["collapsed"] = ~node_df["node"].isin(label[keep])
+    return node_df, edges
+
+
+@memory_cache(show_spinner="Computing layout…")
+@disk_cache()
+def compute_layout(edge_records, iterations=50, seed=42):
+    """Spring layout on the server; edge_records is a hashable tuple so each filter set is cached."""
+    G = nx.Graph()
+    G.add_weighted_edges_from(edge_records)
+    if G.number_of_nodes() == 0:
+        return {}
+    pos = nx.spring_layout(G, weight="weight", iterations=iterations, seed=seed)
+    coords = np.array(list(pos.values())) * CANVAS_SCALE * np.sqrt(G.number_of_nodes())
+    return {node: (float(x), float(y)) for node, (x, y) in zip(pos.keys(), coords)}
+
+
+def static_network(node_df, edges, positions, highlight=""):
+    """pyvis network with fixed coordinates and physics disabled, so the browser only draws."""
+    net = Network(height="600px", width="100%", bgcolor="#FFFFFF", font_color="black")
+    for node, members, collapsed in node_df[["node", "members", "collapsed"]].itertuples(index=False):
+        if node not in positions:
+            continue
+        x, y = positions[node]
+        title = f"{node} – {members} institutes" if collapsed else node
+        color = "#FF5733" if highlight and highlight.lower() in node.lower() else ("#3B4C59" if collapsed else "#97C2FC")
+        net.add_node(node, label=node if collapsed and members > 1 else "", title=title, x=x, y=y,
+                     size=int(5 + 3 * np.log1p(members)), color=color, physics=False)
+    for source, target, weight in edges.itertuples(index=False):
+        net.add_edge(source, target, value=float(weight))
+    net.toggle_physics(False)
+    return net
@@ -7,36 +7,145 @@ from nltk.corpus import stopwords
 import plotly.express as px
 from matplotlib_venn import venn3
 import nltk
+import os
+import numpy as np
+from disk_cache import disk_cache
+from memory_cache import memory_cache
+from grant_search import GRANT_IDS_PATH, GRANT_INDEX_PATH, with_grant_docs, filter_grants, active_query
+from scipy.sparse import csr_matrix, diags
+from preprocess_keyword_trends import (
+    KEYWORDS_PARQUET_PATH, KEYWORDS_CSV_PATH, VOCAB_PATH, COUNTS_PATH, METHOD_COLUMNS, explode_keywords
+)
 
 nltk.download("stopwords")
 
+OVERLAP_REGIONS = ["Only TF-IDF", "Only RAKE", "Only YAKE", "TFIDF ∩ RAKE", "TFIDF ∩ YAKE", "RAKE ∩ YAKE", "All Three"]
+
 LANGUAGE_MAP = {
     "en": "English", "fr": "French", "de": "German", "it": "Italian",
     "es": "Spanish", "rm": "Romansh", "unknown": "Unknown"
 }
 
-@st.cache_data
+@memory_cache()
+@disk_cache(inputs=[KEYWORDS_PARQUET_PATH, KEYWORDS_CSV_PATH, GRANT_IDS_PATH])
 def load_keywords_data():
-    df = pd.read_csv("data/final_keywords_enriched.csv")
+    if os.path.exists(KEYWORDS_PARQUET_PATH):
+        df = pd.read_parquet(KEYWORDS_PARQUET_PATH)
+    else:
+        df = pd.read_csv(KEYWORDS_CSV_PATH)
     df["StartYear"] = pd.to_datetime(df["StartDate"], errors="coerce").dt.year
     df["LanguageFull"] = df["Language"].map(LANGUAGE_MAP).fillna(df["Language"])
-    return df
+    return with_grant_docs(df)
 
-def generate_wordcloud(text_series, colormap):
-    text = " ".join(str(t) for t in text_series if isinstance(t, str) and t.strip())
-    if not text:
-        st.warning("No valid text available for WordCloud.")
+@memory_cache()
+def load_keyword_trends():
+    if not (os.path.exists(VOCAB_PATH) and os.path.exists(COUNTS_PATH)):
+        return None, None
+    return pd.read_parquet(VOCAB_PATH)["Keyword"].to_numpy(), pd.read_parquet(COUNTS_PATH)
+
+@memory_cache()
+@disk_cache(inputs=[VOCAB_PATH, COUNTS_PATH])
+def year_keyword_matrix(method, languages, disciplines, year_range):
+    """Sparse year × keyword count matrix for one extraction method and slice."""
+    vocab, counts = load_keyword_trends()
+    rows = counts[(counts["Method"] == method) & counts["Year"].between(year_range[0], year_range[1])]
+    if languages is not None:
+        rows = rows[rows["Language"].isin(languages)]
+    if disciplines:
+        rows = rows[rows["MainDiscipline"].isin(disciplines)]
+    years = np.arange(year_range[0], year_range[1] + 1)
+    matrix = csr_matrix(
+        (rows["Count"].to_numpy(), (rows["Year"].to_numpy() - year_range[0], rows["KeywordId"].to_numpy())),
+        shape=(len(years), len(vocab))
+    )
+    return years, matrix
+
+def emerging_scores(years, matrix, recent_years=3, min_count=5):
+    """Growth rate and burst z-score of each keyword's yearly share, recent window vs. earlier years."""
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    active = totals > 0
+    years, matrix, totals = years[active], matrix[active], totals[active]
+    if len(years) <= recent_years:
+        return pd.DataFrame(columns=["KeywordId", "RecentCount", "Growth", "Burst"]), years, None
+
+    shares = diags(1.0 / totals) @ matrix
+    recent, base = shares[-recent_years:], shares[:-recent_years]
+    recent_mean = np.asarray(recent.mean(axis=0)).ravel()
+    base_mean = np.asarray(base.mean(axis=0)).ravel()
+    base_var = np.asarray(base.power(2).mean(axis=0)).ravel() - base_mean ** 2
+    recent_count = np.asarray(matrix[-recent_years:].sum(axis=0)).ravel()
+
+    # one mention in the baseline, so new keywords get a large but finite growth rate
+    smoothing = 1.0 / totals[:-recent_years].sum()
+    scores = pd.DataFrame({
+        "KeywordId": np.arange(matrix.shape[1]),
+        "RecentCount": recent_count,
+        "Growth": (recent_mean - base_mean) / (base_mean + smoothing),
+        "Burst": (recent_mean - base_mean) / np.sqrt(np.maximum(base_var, 0) + smoothing ** 2),
+    })
+    return scores[scores["RecentCount"] >= min_count], years, shares
+
+def emerging_tab(selected_lang, year_range):
+    vocab, counts = load_keyword_trends()
+    if counts is None:
+        st.info("No keyword trends found. Run `python preprocess_keyword_trends.py` to build them.")
+        return
+
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 4])
+    method = col1.selectbox("Method", list(METHOD_COLUMNS), key="emerging_method")
+    score = col2.radio("Rank By", ["Growth", "Burst"], horizontal=True, key="emerging_score")
+    recent_years = col3.slider("Recent Years", 2, 5, 3, key="emerging_recent")
+    top_disciplines = counts.groupby("MainDiscipline", observed=True)["Count"].sum().nlargest(10).index.tolist()
+    disciplines = col4.multiselect("Disciplines", top_disciplines, key="emerging_disciplines")
+
+    languages = None
+    if selected_lang != "All Languages":
+        languages = tuple(c for c in counts["Language"].cat.categories if LANGUAGE_MAP.get(c, c) == selected_lang)
+
+    years, matrix = year_keyword_matrix(method, languages, tuple(disciplines), tuple(year_range))
+    scores, active_years, shares = emerging_scores(years, matrix, recent_years)
+    if scores.empty:
+        st.warning("Not enough years with keywords for the selected filters.")
         return
-    wordcloud = WordCloud(
+
+    top = scores.nlargest(15, score)
+    top["Keyword"] = vocab[top["KeywordId"]]
+
+    col_left, col_right = st.columns(2)
+    with col_left:
+        fig = px.bar(top, x=score, y="Keyword", orientation="h", title=f"Emerging {method} Keywords",
+                     hover_data=["RecentCount"], color_discrete_sequence=["#3B4C59"])
+        fig.update_layout(height=380, yaxis={"categoryorder": "total ascending"}, margin=dict(t=30, b=10, l=10, r=10))
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col_right:
+        head = top.head(5)
+        trend = pd.DataFrame(shares[:, head["KeywordId"].to_numpy()].toarray() * 100, columns=head["Keyword"])
+        trend["Year"] = active_years
+        trend = trend.melt(id_vars="Year", var_name="Keyword", value_name="Share (%)")
+        fig = px.line(trend, x="Year", y="Share (%)", color="Keyword", markers=True, title="Share of Keyword Mentions")
+        fig.update_layout(height=380, margin=dict(t=30, b=10, l=10, r=10))
+        st.plotly_chart(fig, use_container_width=True)
+
+@memory_cache()
+@disk_cache()
+def wordcloud_image(text, colormap):
+    return WordCloud(
         background_color="black",
         colormap=colormap,
         width=1000,
         height=300,
         max_words=100,
         stopwords=set(stopwords.words("english"))
-    ).generate(text)
+    ).generate(text).to_array()
+
+def generate_wordcloud(text_series, colormap):
+    text = " ".join(str(t) for t in text_series if isinstance(t, str) and t.strip())
+    if not text:
+        st.warning("No valid text available for WordCloud.")
+        return
     fig, ax = plt.subplots(figsize=(10, 3.2))
-    ax.imshow(wordcloud, interpolation="bilinear")
+    ax.imshow(wordcloud_image(text, colormap), interpolation="bilinear")
     ax.axis("off")
     st.pyplot(fig)
 
@@ -96,12 +205,65 @@ def keyword_tab(df, column_name, color, colormap, selected_lang):
         else:
             st.warning("No keywords available for selected filters.")
 
-def extract_keywords(series):
-    keywords = []
-    for s in series.dropna():
-        parts = [kw.strip().lower() for kw in s.replace(",", ";").split(";") if kw.strip()]
-        keywords.extend(parts)
-    return set(keywords)
+def filter_keywords(df_all, selected_lang, year_range):
+    if selected_lang != "All Languages":
+        filtered_df = df_all[df_all["LanguageFull"] == selected_lang]
+    else:
+        filtered_df = df_all.copy()
+    return filtered_df[filtered_df["StartYear"].between(year_range[0], year_range[1])]
+
+def comparison_rows(filtered_df):
+    compare_df = filtered_df[filtered_df[list(METHOD_COLUMNS.values())].notna().any(axis=1)]
+    return compare_df.drop_duplicates(subset="GrantNumber")
+
+@memory_cache()
+@disk_cache(inputs=[KEYWORDS_PARQUET_PATH, KEYWORDS_CSV_PATH])
+def load_keyword_codes():
+    """(row position, keyword id) pairs per method over one integer vocabulary shared by all methods."""
+    df_all = load_keywords_data()
+    exploded = {method: explode_keywords(df_all[column]) for method, column in METHOD_COLUMNS.items()}
+    keyword_ids, vocab = pd.factorize(pd.concat(exploded.values()))
+    codes, start = {}, 0
+    for method, keywords in exploded.items():
+        rows = df_all.index.get_indexer(keywords.index)
+        codes[method] = (rows, keyword_ids[start:start + len(keywords)])
+        start += len(keywords)
+    return codes, len(vocab)
+
+def presence_vectors(row_mask, codes, vocab_size):
+    """Boolean keyword-presence vector per method for the rows selected by row_mask."""
+    presence = {}
+    for method, (rows, keyword_ids) in codes.items():
+        vector = np.zeros(vocab_size, dtype=bool)
+        vector[keyword_ids[row_mask[rows]]] = True
+        presence[method] = vector
+    return presence
+
+def overlap_regions(presence):
+    t, r, y = presence["TF-IDF"], presence["RAKE"], presence["YAKE"]
+    return dict(zip(OVERLAP_REGIONS, [
+        np.count_nonzero(t & ~r & ~y), np.count_nonzero(r & ~t & ~y), np.count_nonzero(y & ~t & ~r),
+        np.count_nonzero(t & r & ~y), np.count_nonzero(t & y & ~r), np.count_nonzero(r & y & ~t),
+        np.count_nonzero(t & r & y)
+    ]))
+
+@memory_cache()
+@disk_cache(inputs=[KEYWORDS_PARQUET_PATH, KEYWORDS_CSV_PATH, GRANT_IDS_PATH, GRANT_INDEX_PATH])
+def keyword_overlap(selected_lang, year_range, grant_query=""):
+    """Venn region sizes overall and per top discipline, cached by filter signature."""
+    df_all = load_keywords_data()
+    codes, vocab_size = load_keyword_codes()
+    compare_df = comparison_rows(filter_grants(filter_keywords(df_all, selected_lang, year_range), grant_query))
+
+    row_mask = np.zeros(len(df_all), dtype=bool)
+    row_mask[df_all.index.get_indexer(compare_df.index)] = True
+    overall = overlap_regions(presence_vectors(row_mask, codes, vocab_size))
+
+    disciplines = df_all["MainDiscipline"].to_numpy()
+    per_discipline = {}
+    for discipline in compare_df["MainDiscipline"].value_counts().head(10).index:
+        per_discipline[discipline] = overlap_regions(presence_vectors(row_mask & (disciplines == discipline), codes, vocab_size))
+    return overall, pd.DataFrame.from_dict(per_discipline, orient="index", columns=OVERLAP_REGIONS)
 
 def show_keyword_insights():
     df_all = load_keywords_data()
@@ -115,14 +277,9 @@ def show_keyword_insights():
         min_y, max_y = int(df_all["StartYear"].min()), int(df_all["StartYear"].max())
         year_range = st.slider("Start Year", min_y, max_y, (1980, 2024))
 
-    if selected_lang != "All Languages":
-        filtered_df = df_all[df_all["LanguageFull"] == selected_lang]
-    else:
-        filtered_df = df_all.copy()
-
-    filtered_df = filtered_df[filtered_df["StartYear"].between(year_range[0], year_range[1])]
+    filtered_df = filter_grants(filter_keywords(df_all, selected_lang, year_range))
 
-    tabs = st.tabs(["TF-IDF", "RAKE", "YAKE", "Comparison"])
+    tabs = st.tabs(["TF-IDF", "RAKE", "YAKE", "Comparison", "Emerging Keywords"])
 
     with tabs[0]:
         keyword_tab(filtered_df, "TFIDF_Keywords", "#3B4C59", "plasma", selected_lang)
@@ -139,21 +296,21 @@ def show_keyword_insights():
         if missing:
             st.warning(f"Missing columns: {', '.join(missing)}")
         else:
-            compare_df = filtered_df[filtered_df[["TFIDF_Keywords", "RAKE_Keywords", "YAKE_Keywords"]].notna().any(axis=1)]
-            compare_df = compare_df.drop_duplicates(subset="GrantNumber")
+            compare_df = comparison_rows(filtered_df)
 
             st.markdown("<div style='margin-bottom:-0.6rem; font-size:14px;'>Top Keyword Rows (Click full screen to view more)</div>", unsafe_allow_html=True)
             st.dataframe(compare_df[required].head(3), use_container_width=True, height=140)
 
-            tfidf_set = extract_keywords(compare_df["TFIDF_Keywords"])
-            rake_set = extract_keywords(compare_df["RAKE_Keywords"])
-            yake_set = extract_keywords(compare_df["YAKE_Keywords"])
+            overlap_counts, discipline_overlap = keyword_overlap(selected_lang, tuple(year_range), active_query())
 
             col_left, col_right = st.columns(2)
 
             with col_left:
                 fig1, ax = plt.subplots(figsize=(5, 0.9))
-                venn = venn3([tfidf_set, rake_set, yake_set], set_labels=("TF-IDF", "RAKE", "YAKE"), ax=ax)
+                subsets = tuple(overlap_counts[region] for region in [
+                    "Only TF-IDF", "Only RAKE", "TFIDF ∩ RAKE", "Only YAKE", "TFIDF ∩ YAKE", "RAKE ∩ YAKE", "All Three"
+                ])
+                venn = venn3(subsets=subsets, set_labels=("TF-IDF", "RAKE", "YAKE"), ax=ax)
                 for p in venn.patches:
                     if p:
                         p.set_alpha(0.6)
@@ -170,16 +327,6 @@ def show_keyword_insights():
                 st.pyplot(fig1)
 
             with col_right:
-                overlap_counts = {
-                    "Only TF-IDF": len(tfidf_set - rake_set - yake_set),
-                    "Only RAKE": len(rake_set - tfidf_set - yake_set),
-                    "Only YAKE": len(yake_set - tfidf_set - rake_set),
-                    "TFIDF ∩ RAKE": len(tfidf_set & rake_set - yake_set),
-                    "TFIDF ∩ YAKE": len(tfidf_set & yake_set - rake_set),
-                    "RAKE ∩ YAKE": len(rake_set & yake_set - tfidf_set),
-                    "All Three": len(tfidf_set & rake_set & yake_set)
-                }
-
                 df_overlap = pd.DataFrame.from_dict(overlap_counts, orient="index", columns=["Count"])
                 df_overlap = df_overlap.reset_index().rename(columns={"index": "Category"})
 
@@ -194,5 +341,11 @@ def show_keyword_insights():
                 )
                 st.plotly_chart(fig2, use_container_width=True)
 
+            st.markdown("<div style='margin-bottom:-0.6rem; font-size:14px;'>Overlap by Discipline (Top 10)</div>", unsafe_allow_html=True)
+            st.dataframe(discipline_overlap, use_container_width=True, height=250)
+
+    with tabs[4]:
+        emerging_tab(selected_lang, year_range)
+
 if __name__ == "__main__":
     show_keyword_insights()
@@ -0,0 +1,182 @@
+import argparse
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from memory_cache import cache_stats
+
+APP_PATH = "app.py"
+NAVIGATE = "navigate"
+
+
+def widget(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def go_to(at, section):
+    """Switch sections; None when the session is already there and nothing reruns."""
+    nav = widget(at.sidebar.radio, "Go to section:")
+    if nav.value != section:
+        return nav.set_value(section).run()
+
+
+def move_funding_years(at, rng):
+    slider = widget(at.sidebar.slider, "Call Decision Year")
+    low, high = slider.min, slider.max
+    start = rng.randint(low, high)
+    return slider.set_value((start, rng.randint(start, high))).run()
+
+
+def switch_researcher(at, rng):
+    select = widget(at.sidebar.selectbox, "Select Researcher")
+    return select.set_value(rng.choice(select.options[1:] or select.options)).run()
+
+
+def change_keyword_language(at, rng):
+    select = widget(at.sidebar.selectbox, "Language")
+    return select.set_value(rng.choice(select.options)).run()
+
+
+def adjust_network_top_n(at, rng):
+    slider = widget(at.sidebar.slider, "Top N Links")
+    return slider.set_value(rng.randrange(slider.min, slider.max + 1, slider.step or 1)).run()
+
+
+# click path -> (section, interaction, relative weight)
+CLICK_PATHS = {
+    "funding-years": ("Funding Insights", move_funding_years, 4),
+    "researcher": ("Researcher Explorer", switch_researcher, 3),
+    "keyword-language": ("Keyword Analysis", change_keyword_language, 2),
+    "network-top-n": ("Collaboration Network", adjust_network_top_n, 1),
+}
+
+
+def timed_rerun(samples, name, action):
+    """Time one interaction's rerun; a script exception, missing widget or timeout counts as an error."""
+    started = time.perf_counter()
+    try:
+        at = action()
+        if at is None:
+            return
+        error = str(at.exception[0].value) if at.exception else None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    samples.append((name, time.perf_counter() - started, error))
+
+
+def run_session(session_id, duration, paths, timeout, seed):
+    """Drive one headless session until the deadline; returns [(path, seconds, error)] per rerun."""
+    rng = random.Random(seed * 1000 + session_id)
+    names = list(paths)
+    weights = [CLICK_PATHS[name][2] for name in names]
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run()  # initial page load is not measured
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        section, interact, _ = CLICK_PATHS[name]
+        timed_rerun(samples, NAVIGATE, lambda: go_to(at, section))
+        timed_rerun(samples, name, lambda: interact(at, rng))
+    return samples
+
+
+def run_worker(worker_id, sessions, duration, paths, timeout, seed):
+    """One process standing in for one server worker: `sessions` concurrent users sharing its caches and GIL."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(run_session, worker_id * sessions + i, duration, paths, timeout, seed)
+                   for i in range(sessions)]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - started
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    stats = cache_stats()
+    return {"worker": worker_id, "samples": samples, "elapsed": elapsed, "peak_rss_mb": peak_rss_mb,
+            "cache_mb": stats["Bytes"].sum() / 1024 ** 2, "evictions": int(stats["Evictions"].sum())}
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return {"n": 0, "p50": float("nan"), "p95": float("nan"), "p99": float("nan")}
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {"n": len(latencies), "p50": p50, "p95": p95, "p99": p99}
+
+
+def check_slos(summary, throughput, errors, peak_rss_mb, args):
+    violations = []
+    if args.p95_ms and summary["p95"] > args.p95_ms:
+        violations.append(f"p95 {summary['p95']:.0f} ms > {args.p95_ms:.0f} ms")
+    if args.p99_ms and summary["p99"] > args.p99_ms:
+        violations.append(f"p99 {summary['p99']:.0f} ms > {args.p99_ms:.0f} ms")
+    if args.min_throughput and throughput < args.min_throughput:
+        violations.append(f"throughput {throughput:.2f}/s < {args.min_throughput:.2f}/s")
+    if args.max_rss_mb and peak_rss_mb > args.max_rss_mb:
+        violations.append(f"peak RSS {peak_rss_mb:.0f} MB > {args.max_rss_mb:.0f} MB")
+    if errors > args.max_errors:
+        violations.append(f"{errors} failed reruns > {args.max_errors}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive concurrent headless dashboard sessions through realistic click paths and check latency SLOs."
+    )
+    parser.add_argument("--workers", type=int, default=1, help="processes, each standing in for one server worker")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent sessions per worker")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load per session")
+    parser.add_argument("--paths", nargs="+", choices=list(CLICK_PATHS), default=list(CLICK_PATHS))
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--p95-ms", type=float, default=2000)
+    parser.add_argument("--p99-ms", type=float, default=5000)
+    parser.add_argument("--min-throughput", type=float, default=0, help="reruns per second across all workers")
+    parser.add_argument("--max-rss-mb", type=float, default=0, help="peak resident memory per worker")
+    parser.add_argument("--max-errors", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_worker, w, args.sessions, args.duration, args.paths, args.timeout, args.seed)
+                   for w in range(args.workers)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    print(f"{'worker':<8}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rerun/s':>10}{'RSS MB':>10}{'cache MB':>10}{'evicted':>9}")
+    for result in results:
+        summary = latency_summary([s for _, s, _ in result["samples"]])
+        print(f"{result['worker']:<8}{summary['n']:>8}{summary['p50']:>10.0f}{summary['p95']:>10.0f}"
+              f"{summary['p99']:>10.0f}{summary['n'] / result['elapsed']:>10.2f}{result['peak_rss_mb']:>10.0f}"
+              f"{result['cache_mb']:>10.0f}{result['evictions']:>9}")
+
+    samples = [sample for result in results for sample in result["samples"]]
+    print(f"\n{'click path':<20}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in [NAVIGATE] + args.paths:
+        summary = latency_summary([s for path, s, _ in samples if path == name])
+        print(f"{name:<20}{summary['n']:>8}{summary['p50']:>10.0f}{summary['p95']:>10.0f}{summary['p99']:>10.0f}")
+
+    errors = [(path, error) for path, _, error in samples if error]
+    for path, error in errors[:5]:
+        print(f"❌ {path}: {error}")
+
+    overall = latency_summary([s for _, s, _ in samples])
+    throughput = overall["n"] / elapsed
+    peak_rss_mb = max(result["peak_rss_mb"] for result in results)
+    print(f"\n⏱️ {overall['n']} reruns in {elapsed:.1f}s ({throughput:.2f}/s), "
+          f"p50 {overall['p50']:.0f} ms, p95 {overall['p95']:.0f} ms, p99 {overall['p99']:.0f} ms, "
+          f"peak RSS {peak_rss_mb:.0f} MB/worker, {len(errors)} errors")
+
+    violations = check_slos(overall, throughput, len(errors), peak_rss_mb, args)
+    for violation in violations:
+        print(f"🚨 SLO violated: {violation}")
+    if not violations:
+        print("✅ All SLOs met")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
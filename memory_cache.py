@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+MEMORY_BUDGET = int(os.environ.get("SNSF_MEMORY_BUDGET_BYTES", 2 * 1024 ** 3))
+
+_lock = threading.Lock()
+_entries = {}      # key -> Entry
+_computing = {}    # key -> Lock held while one session computes a missing entry
+_stats = {}        # function name -> counters
+_clock = 0.0       # GreedyDual-Size inflation value L
+_total_bytes = 0
+
+
+class Entry:
+    __slots__ = ("func", "value", "size", "cost", "priority")
+
+    def __init__(self, func, value, size, cost):
+        self.func, self.value, self.size, self.cost = func, value, size, cost
+        self.priority = 0.0
+
+
+def deep_size(value, _seen=None):
+    """Bytes held by a cached value, including the strings inside object columns."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "indptr"):  # scipy sparse matrix
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_size(v, seen) for v in value)
+    return sys.getsizeof(value)
+
+
+def _detach(value):
+    """What a caller gets back: frames as copy-on-write shallow copies, arrays read-only,
+    so nobody can modify the cached object for the next session."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, tuple):
+        return tuple(_detach(v) for v in value)
+    if isinstance(value, list):
+        return [_detach(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _detach(v) for k, v in value.items()}
+    return value
+
+
+def _arg_key(value):
+    """A fixed-size digest per argument, so long texts or edge lists don't live on in the keys."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return hashlib.sha256(pd.util.hash_pandas_object(value).values.tobytes()).hexdigest()
+    if isinstance(value, np.ndarray):  # repr elides the middle of large arrays
+        return hashlib.sha256(repr((value.dtype, value.shape)).encode() + value.tobytes()).hexdigest()
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def _counters(name):
+    return _stats.setdefault(name, {"Hits": 0, "Misses": 0, "Evictions": 0, "ComputeSeconds": 0.0})
+
+
+def _touch(entry):
+    # GreedyDual-Size: priority = L + cost / size, so cheap or bulky entries go first
+    entry.priority = _clock + entry.cost / max(entry.size, 1)
+
+
+def _evict(budget):
+    global _clock, _total_bytes
+    while _total_bytes > budget and _entries:
+        key = min(_entries, key=lambda k: _entries[k].priority)
+        entry = _entries.pop(key)
+        _clock = entry.priority
+        _total_bytes -= entry.size
+        _counters(entry.func)["Evictions"] += 1
+
+
+def _store(key, entry):
+    global _total_bytes
+    if entry.size > MEMORY_BUDGET:
+        _counters(entry.func)["Evictions"] += 1  # would evict everything else and still not fit
+        return
+    _touch(entry)
+    _entries[key] = entry
+    _total_bytes += entry.size
+    _evict(MEMORY_BUDGET)
+
+
+def memory_cache(show_spinner=False):
+    """In-process result cache sharing one byte budget across every decorated function.
+
+    Each entry's size is measured deeply, key included, and its cost is the time the call took.
+    When the budget is exceeded, entries are evicted by GreedyDual-Size: the
+    lowest cost per byte goes first, with recency folded in through the
+    inflation clock.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, tuple(_arg_key(a) for a in args), tuple((k, _arg_key(v)) for k, v in sorted(kwargs.items())))
+            with _lock:
+                entry = _entries.get(key)
+                if entry is not None:
+                    _counters(name)["Hits"] += 1
+                    _touch(entry)
+                    return _detach(entry.value)
+                computing = _computing.setdefault(key, threading.Lock())
+
+            with computing:  # concurrent sessions asking for the same entry wait for one computation
+                with _lock:
+                    entry = _entries.get(key)
+                    if entry is not None:
+                        _counters(name)["Hits"] += 1
+                        _touch(entry)
+                        return _detach(entry.value)
+                started = time.perf_counter()
+                try:
+                    if show_spinner:
+                        with st.spinner(show_spinner):
+                            value = func(*args, **kwargs)
+                    else:
+                        value = func(*args, **kwargs)
+                    cost = time.perf_counter() - started
+                    entry = Entry(name, value, deep_size(value) + deep_size(key), cost)
+                    with _lock:
+                        counters = _counters(name)
+                        counters["Misses"] += 1
+                        counters["ComputeSeconds"] += cost
+                        _store(key, entry)
+                finally:
+                    with _lock:
+                        _computing.pop(key, None)
+            return _detach(value)
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Hits, misses, evictions, live entries and bytes per cached function."""
+    with _lock:
+        sizes = {}
+        for entry in _entries.values():
+            entries, size = sizes.get(entry.func, (0, 0))
+            sizes[entry.func] = (entries + 1, size + entry.size)
+        rows = [{"Function": name, **counters, "Entries": sizes.get(name, (0, 0))[0], "Bytes": sizes.get(name, (0, 0))[1]}
+                for name, counters in _stats.items()]
+    return pd.DataFrame(rows, columns=["Function", "Hits", "Misses", "Evictions", "ComputeSeconds", "Entries", "Bytes"])
+
+
+def cached_bytes():
+    return _total_bytes
+
+
+def clear_cache():
+    global _clock, _total_bytes
+    with _lock:
+        _entries.clear()
+        _stats.clear()
+        _clock, _total_bytes = 0.0, 0
@@ -0,0 +1,33 @@
+import pandas as pd
+import os
+
+COLLAB_PATH = "data/collaboration_data.csv"
+MATRIX_PATH = "data/country_collaboration_matrix.csv"
+
+
+def build_country_matrix(collab_df):
+    """Sparse (Year, CountryA, CountryB) grant counts with CountryA <= CountryB.
+
+    The diagonal counts grants with at least one participant from the country;
+    off-diagonal cells count grants shared by both countries.
+    """
+    members = collab_df.rename(columns={"InstituteCountry": "Country", "start_year": "Year"})
+    members = members[["GrantNumber", "Country", "Year"]].dropna()
+    members = members[members["Country"].str.lower() != "unknown"]
+    members = members.drop_duplicates(subset=["GrantNumber", "Country"])
+    members["Year"] = members["Year"].astype(int)
+
+    pairs = members.merge(members[["GrantNumber", "Country"]], on="GrantNumber", suffixes=("A", "B"))
+    pairs = pairs[pairs["CountryA"] <= pairs["CountryB"]]
+    return pairs.groupby(["Year", "CountryA", "CountryB"]).size().reset_index(name="Grants")
+
+
+if __name__ == "__main__":
+    collab_df = pd.read_csv(COLLAB_PATH, usecols=["GrantNumber", "InstituteCountry", "start_year"])
+    matrix = build_country_matrix(collab_df)
+
+    os.makedirs("data", exist_ok=True)
+    matrix.to_csv(MATRIX_PATH, index=False)
+    international = matrix[matrix["CountryA"] != matrix["CountryB"]]
+    print(f"🌍 {matrix['CountryA'].nunique()} countries, {len(international)} international (year, pair) cells")
+    print(f"✅ Saved {len(matrix)} rows to {MATRIX_PATH}")
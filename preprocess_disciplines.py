@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import os
+
+from data_io import ID_DTYPES
+from preprocess_outputs import normalize_grant_numbers
+
+DISCIPLINES_PATH = "data/Discipline.csv"
+GRANT_DISCIPLINES_PATH = "data/GrantToDiscipline.csv"
+GRANTS_PATH = "data/grant_final.csv"
+TREE_PATH = "data/discipline_tree.csv"
+ASSIGNMENTS_PATH = "data/grant_discipline_codes.parquet"
+FUNDING_ROLLUP_PATH = "data/discipline_funding_rollup.csv"
+GENDER_ROLLUP_PATH = "data/discipline_gender_rollup.csv"
+
+
+def build_tree(disciplines):
+    """Disciplines ordered root-first with integer Code and ParentCode (-1 for Level1 roots)."""
+    tree = disciplines[["DisciplineNumber", "Discipline", "DisciplineLevel", "ParentDisciplineNumber"]]
+    tree = tree.sort_values(["DisciplineLevel", "DisciplineNumber"]).reset_index(drop=True)
+    tree.insert(0, "Code", np.arange(len(tree), dtype=np.int16))
+    codes = pd.Series(tree["Code"].values, index=tree["DisciplineNumber"])
+    tree["ParentCode"] = tree["ParentDisciplineNumber"].map(codes).fillna(-1).astype(np.int16)
+    return tree.drop(columns="ParentDisciplineNumber").rename(columns={"DisciplineLevel": "Level"})
+
+
+def grant_assignments(grant_disciplines, tree):
+    """Grant → discipline codes; a grant listed under k disciplines contributes 1/k to each."""
+    numbers = pd.to_numeric(grant_disciplines["DisciplineNumber"].astype(str).str.lstrip("D"), errors="coerce")
+    codes = pd.Series(tree["Code"].values, index=tree["DisciplineNumber"])
+    assignments = pd.DataFrame({
+        "GrantNumber": normalize_grant_numbers(grant_disciplines["GrantNumber"]),
+        "Code": numbers.map(codes),
+    }).dropna().drop_duplicates()
+    assignments["Code"] = assignments["Code"].astype(np.int16)
+    assignments["Weight"] = (1 / assignments.groupby("GrantNumber")["Code"].transform("size")).astype(np.float32)
+    return assignments.reset_index(drop=True)
+
+
+def leaf_totals(rows, assignments, keys, amount="AmountGrantedAllSets"):
+    """Weighted rows and funding per (keys, Code) for grant-level rows such as the funding or gender frame."""
+    rows = rows[["GrantNumber", amount] + keys].copy()
+    rows["GrantNumber"] = normalize_grant_numbers(rows["GrantNumber"])
+    weighted = rows.merge(assignments, on="GrantNumber")
+    weighted["Rows"] = weighted["Weight"]
+    weighted["Funding"] = weighted[amount].fillna(0) * weighted["Weight"]
+    return weighted.groupby(keys + ["Code"], observed=True)[["Rows", "Funding"]].sum().reset_index()
+
+
+def rollup(totals, tree, keys):
+    """Add every node's totals into its parent, deepest level first, so each node holds its subtree."""
+    parents = tree.set_index("Code")["ParentCode"]
+    levels = tree.set_index("Code")["Level"]
+    for level in sorted(tree["Level"].unique(), reverse=True)[:-1]:
+        children = totals[totals["Code"].map(levels) == level].copy()
+        children["Code"] = children["Code"].map(parents)
+        totals = pd.concat([totals, children[children["Code"] >= 0]])
+        totals = totals.groupby(keys + ["Code"], observed=True)[["Rows", "Funding"]].sum().reset_index()
+    return totals
+
+
+if __name__ == "__main__":
+    tree = build_tree(pd.read_csv(DISCIPLINES_PATH))
+    assignments = grant_assignments(pd.read_csv(GRANT_DISCIPLINES_PATH, dtype=ID_DTYPES), tree)
+
+    grants = pd.read_csv(GRANTS_PATH, usecols=["GrantNumber", "AmountGrantedAllSets", "CallDecisionYear", "start_year"], dtype=ID_DTYPES)
+    funding = rollup(leaf_totals(grants, assignments, ["CallDecisionYear"]), tree, ["CallDecisionYear"])
+
+    people = pd.read_csv("data/person_final.csv", usecols=["PersonNumber", "Gender"], dtype=ID_DTYPES)
+    participations = pd.read_csv("data/GrantToPerson.csv", usecols=["GrantNumber", "PersonNumber"], dtype=ID_DTYPES)
+    participations = participations.merge(people, on="PersonNumber").merge(grants, on="GrantNumber")
+    participations["Gender"] = participations["Gender"].str.strip().str.lower()
+    gender = rollup(leaf_totals(participations, assignments, ["start_year", "Gender"]), tree, ["start_year", "Gender"])
+
+    os.makedirs("data", exist_ok=True)
+    tree.to_csv(TREE_PATH, index=False)
+    assignments.to_parquet(ASSIGNMENTS_PATH, index=False)
+    funding.to_csv(FUNDING_ROLLUP_PATH, index=False)
+    gender.to_csv(GENDER_ROLLUP_PATH, index=False)
+    print(f"🌳 {len(tree)} disciplines, {assignments['GrantNumber'].nunique():,} grants assigned")
+    print(f"✅ Saved {len(funding):,} funding and {len(gender):,} gender rollup rows")
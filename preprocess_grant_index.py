@@ -0,0 +1,58 @@
+import pandas as pd
+import os
+
+from preprocess_outputs import normalize_grant_numbers
+from preprocess_keyword_trends import KEYWORDS_PARQUET_PATH, KEYWORDS_CSV_PATH, METHOD_COLUMNS
+from text_index import TextIndex
+
+GRANTS_PATH = "data/grant_final.csv"
+GRANT_INDEX_PATH = "data/grant_search_index.npz"
+GRANT_IDS_PATH = "data/grant_search_ids.csv"
+
+TEXT_COLUMNS = ["Title", "Abstract", "LaySummary", "Keywords"]
+
+
+def grant_texts():
+    """Grant titles (plus abstracts/keywords where the export has them), one row per grant."""
+    header = pd.read_csv(GRANTS_PATH, nrows=0).columns
+    text_cols = [c for c in TEXT_COLUMNS if c in header]
+    grants = pd.read_csv(GRANTS_PATH, usecols=["GrantNumber"] + text_cols, dtype=str)
+    return pd.DataFrame({
+        "GrantNumber": normalize_grant_numbers(grants["GrantNumber"]),
+        "Title": grants["Title"] if "Title" in text_cols else "",
+        "Text": grants[text_cols].fillna("").agg(" ".join, axis=1),
+    })
+
+
+def keyword_texts():
+    """Extracted keywords per grant from the keyword pipeline, if it has been run."""
+    columns = ["GrantNumber"] + list(METHOD_COLUMNS.values())
+    if os.path.exists(KEYWORDS_PARQUET_PATH):
+        df = pd.read_parquet(KEYWORDS_PARQUET_PATH, columns=columns)
+    elif os.path.exists(KEYWORDS_CSV_PATH):
+        df = pd.read_csv(KEYWORDS_CSV_PATH, usecols=columns, dtype=str)
+    else:
+        return pd.DataFrame(columns=["GrantNumber", "Text"])
+    text = df[list(METHOD_COLUMNS.values())].fillna("").agg(" ".join, axis=1)
+    return pd.DataFrame({"GrantNumber": normalize_grant_numbers(df["GrantNumber"]), "Text": text})
+
+
+def build_grant_corpus():
+    """(GrantNumber, Title, Text) sorted by grant; a grant's position is its document id in the index."""
+    grants = grant_texts()
+    texts = pd.concat([grants, keyword_texts()], ignore_index=True)
+    corpus = texts.groupby("GrantNumber", sort=True)["Text"].agg(" ".join).reset_index()
+    titles = grants.drop_duplicates("GrantNumber").set_index("GrantNumber")["Title"]
+    corpus.insert(1, "Title", corpus["GrantNumber"].map(titles))
+    return corpus
+
+
+if __name__ == "__main__":
+    corpus = build_grant_corpus()
+    index = TextIndex.build(corpus["Text"])
+
+    os.makedirs("data", exist_ok=True)
+    corpus[["GrantNumber", "Title"]].to_csv(GRANT_IDS_PATH, index=False)
+    index.save(GRANT_INDEX_PATH)
+    print(f"🔎 Indexed {index.n_docs:,} grants, {len(index.terms):,} terms, {len(index.doc_ids):,} postings")
+    print(f"✅ Saved {GRANT_INDEX_PATH} ({os.path.getsize(GRANT_INDEX_PATH) / 1e6:.1f} MB) and {GRANT_IDS_PATH}")
@@ -0,0 +1,50 @@
+import pandas as pd
+import os
+
+from data_io import ID_DTYPES
+from quantile_sketch import build_sketches
+
+GRANTS_PATH = "data/grant_final.csv"
+SKETCHES_PATH = "data/grant_size_sketches.parquet"
+
+FUNDING_DIMENSIONS = ["MainDiscipline", "ResearchInstitution", "FundingInstrumentLevel1"]
+ALL = "All"
+
+
+def dimension_sketches(df, dimension, year_column, value="AmountGrantedAllSets"):
+    """Grant-size sketches per (Year, Group) of one dimension; dimension=ALL gives one group."""
+    rows = df.assign(Group=df[dimension] if dimension != ALL else ALL, Year=df[year_column])
+    sketches = build_sketches(rows, value, ["Year", "Group"])
+    sketches.insert(0, "Dimension", dimension)
+    return sketches
+
+
+def build_grant_sketches(grants, participations):
+    """Funding dimensions are keyed by call decision year, gender by start year like their pages."""
+    frames = [dimension_sketches(grants, dimension, "CallDecisionYear")
+              for dimension in [ALL] + FUNDING_DIMENSIONS if dimension == ALL or dimension in grants.columns]
+    frames.append(dimension_sketches(participations, "Gender", "start_year"))
+    sketches = pd.concat(frames, ignore_index=True)
+    sketches["Year"] = sketches["Year"].astype("int16")
+    for column in ["Dimension", "Group"]:
+        sketches[column] = sketches[column].astype("category")
+    return sketches
+
+
+if __name__ == "__main__":
+    header = pd.read_csv(GRANTS_PATH, nrows=0).columns
+    columns = ["GrantNumber", "AmountGrantedAllSets", "CallDecisionYear", "start_year"] + [c for c in FUNDING_DIMENSIONS if c in header]
+    grants = pd.read_csv(GRANTS_PATH, usecols=columns, dtype=ID_DTYPES)
+    grants["AmountGrantedAllSets"] = pd.to_numeric(grants["AmountGrantedAllSets"], errors="coerce")
+
+    people = pd.read_csv("data/person_final.csv", usecols=["PersonNumber", "Gender"], dtype=ID_DTYPES)
+    participations = pd.read_csv("data/GrantToPerson.csv", usecols=["GrantNumber", "PersonNumber"], dtype=ID_DTYPES)
+    participations = participations.merge(people, on="PersonNumber").merge(grants, on="GrantNumber")
+    participations["Gender"] = participations["Gender"].str.strip().str.lower()
+
+    sketches = build_grant_sketches(grants.dropna(subset=["CallDecisionYear"]), participations.dropna(subset=["start_year", "Gender"]))
+    os.makedirs("data", exist_ok=True)
+    sketches.to_parquet(SKETCHES_PATH, index=False)
+    for dimension, rows in sketches.groupby("Dimension", observed=True):
+        print(f"📐 {dimension}: {rows['Group'].nunique()} groups, {len(rows):,} buckets")
+    print(f"✅ Saved {len(sketches):,} sketch rows to {SKETCHES_PATH}")
@@ -0,0 +1,117 @@
+import pandas as pd
+import networkx as nx
+import os
+
+COLLAB_PATH = "data/collaboration_data.csv"
+METRICS_PATH = "data/institution_graph_metrics.csv"
+# The Collaboration Network's edge list names the initiating institute in Institute_x; it is not
+# derivable from collaboration_data.csv, so it is only read. Unordered pair counts go to their own file.
+EDGES_PATH = "data/institution_collaboration_edges.csv"
+PAIR_COUNTS_PATH = "data/institution_pair_counts.csv"
+
+WINDOW_YEARS = 5
+ALL_YEARS = "All Years"
+BETWEENNESS_SAMPLES = 256
+
+
+def institution_pairs(collab_df):
+    """One row per grant and pair of distinct known institutes on it, the lower name first."""
+    members = collab_df[["GrantNumber", "InstituteName", "start_year"]].dropna(subset=["InstituteName"])
+    members = members[members["InstituteName"].str.lower() != "unknown"]
+    members = members.drop_duplicates(subset=["GrantNumber", "InstituteName"])
+
+    pairs = members.merge(members[["GrantNumber", "InstituteName"]], on="GrantNumber", suffixes=("_a", "_b"))
+    return pairs[pairs["InstituteName_a"] < pairs["InstituteName_b"]]
+
+
+def build_institution_edges(collab_df):
+    """Weighted institution pairs per year: two institutes are linked once per shared grant."""
+    edges = institution_pairs(collab_df).groupby(["InstituteName_a", "InstituteName_b", "start_year"]).size().reset_index(name="weight")
+    return edges.rename(columns={"InstituteName_a": "source", "InstituteName_b": "target"})
+
+
+def build_pair_counts(collab_df):
+    """Grants shared by each unordered pair over all years, Institute_x < Institute_y.
+
+    delta_ingest patches PAIR_COUNTS_PATH with the same function, so both agree on pair order and counting.
+    """
+    edges = institution_pairs(collab_df).groupby(["InstituteName_a", "InstituteName_b"]).size().reset_index(name="collaboration_count")
+    return edges.rename(columns={"InstituteName_a": "Institute_x", "InstituteName_b": "Institute_y"})
+
+
+def year_windows(years):
+    years = years.dropna().astype(int)
+    if years.empty:
+        return []
+    first = years.min() // WINDOW_YEARS * WINDOW_YEARS
+    return [(start, start + WINDOW_YEARS - 1) for start in range(first, years.max() + 1, WINDOW_YEARS)]
+
+
+def detect_communities(G):
+    try:
+        communities = nx.community.louvain_communities(G, weight="weight", seed=42)
+    except AttributeError:
+        # networkx < 2.8 has no Louvain; label propagation is the closest built-in
+        communities = nx.community.label_propagation_communities(G)
+    return sorted(communities, key=len, reverse=True)
+
+
+def graph_metrics(edges):
+    """Degree, strength, PageRank, sampled betweenness and community for every node."""
+    edges = edges.groupby(["source", "target"])["weight"].sum().reset_index()
+    edges["distance"] = 1.0 / edges["weight"]
+    G = nx.from_pandas_edgelist(edges, "source", "target", edge_attr=["weight", "distance"])
+
+    k = min(BETWEENNESS_SAMPLES, G.number_of_nodes())
+    betweenness = nx.betweenness_centrality(G, k=k, weight="distance", seed=42)
+    pagerank = nx.pagerank(G, weight="weight")
+
+    community_of = {}
+    community_size = {}
+    for cid, members in enumerate(detect_communities(G)):
+        for node in members:
+            community_of[node] = cid
+            community_size[node] = len(members)
+
+    nodes = list(G.nodes)
+    return pd.DataFrame({
+        "Institution": nodes,
+        "Degree": [G.degree(n) for n in nodes],
+        "Strength": [G.degree(n, weight="weight") for n in nodes],
+        "PageRank": [pagerank[n] for n in nodes],
+        "Betweenness": [betweenness[n] for n in nodes],
+        "Community": [community_of[n] for n in nodes],
+        "CommunitySize": [community_size[n] for n in nodes],
+    })
+
+
+def compute_window_metrics(edges):
+    frames = []
+    windows = [(ALL_YEARS, edges)]
+    for start, end in year_windows(edges["start_year"]):
+        windows.append((f"{start}–{end}", edges[edges["start_year"].between(start, end)]))
+
+    for label, window_edges in windows:
+        if window_edges.empty:
+            continue
+        metrics = graph_metrics(window_edges)
+        metrics.insert(0, "Window", label)
+        frames.append(metrics)
+        print(f"📈 {label}: {len(metrics)} institutions, {metrics['Community'].nunique()} communities")
+
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    collab_df = pd.read_csv(COLLAB_PATH, usecols=["GrantNumber", "InstituteName", "start_year"])
+    edges = build_institution_edges(collab_df)
+    print(f"🔗 Built {len(edges)} weighted institution links from {COLLAB_PATH}")
+
+    os.makedirs("data", exist_ok=True)
+    pair_counts = build_pair_counts(collab_df)
+    pair_counts.to_csv(PAIR_COUNTS_PATH, index=False)
+    print(f"✅ Saved {len(pair_counts)} rows to {PAIR_COUNTS_PATH}")
+
+    metrics = compute_window_metrics(edges)
+    metrics.to_csv(METRICS_PATH, index=False)
+    print(f"✅ Saved {len(metrics)} rows to {METRICS_PATH}")
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from geocode import GEOCODE_CACHE_PATH, geocode_institutes
+
+INSTITUTES_PATH = "data/Institute.csv"
+GRANTS_PATH = "data/grant_final.csv"
+GRID_PATH = "data/institute_map_grid.csv"
+
+# Grid cell size in degrees per map detail level, coarsest first
+MAP_LEVELS = {"Country": 4.0, "Region": 1.0, "City": 0.25, "Campus": 0.05}
+
+# Precisions that only put an institute at a region's or country's centre
+APPROXIMATE = {"region", "country"}
+
+
+def institute_totals(institutes, grants, persist=True):
+    """Geocoded institutes with the number of grants and funding held under each name."""
+    placed = geocode_institutes(institutes, persist=persist)
+    grants = grants.dropna(subset=["Institute"]).fillna({"InstituteCountry": ""})
+    totals = grants.groupby(["Institute", "InstituteCountry"]).agg(
+        Grants=("GrantNumber", "nunique"), Funding=("AmountGrantedAllSets", "sum")
+    ).reset_index()
+    placed = placed.merge(totals, on=["Institute", "InstituteCountry"], how="left")
+    return placed.fillna({"Grants": 0, "Funding": 0.0})
+
+
+def bin_institutes(placed, levels=MAP_LEVELS):
+    """One row per occupied grid cell, level and placement, placed at the mean of its institutes'
+    coordinates and labelled with the place holding the most funding. Institutes only placed at a
+    region or country centre are kept in cells of their own, marked 'Approximate'."""
+    placed = placed.dropna(subset=["Latitude", "Longitude"])
+    placed = placed.assign(Placement=np.where(placed["Precision"].isin(APPROXIMATE), "Approximate", "Located"))
+    cells = []
+    for level, size in levels.items():
+        binned = placed.assign(
+            Level=level,
+            Row=np.floor(placed["Latitude"] / size).astype(int),
+            Col=np.floor(placed["Longitude"] / size).astype(int),
+        )
+        keys = ["Row", "Col", "Placement"]
+        place_funding = binned.groupby(keys + ["Place"])["Funding"].sum().reset_index()
+        labels = place_funding.sort_values("Funding", ascending=False).drop_duplicates(subset=keys)
+        grid = binned.groupby(["Level"] + keys).agg(
+            Latitude=("Latitude", "mean"), Longitude=("Longitude", "mean"), Institutes=("Institute", "size"),
+            Grants=("Grants", "sum"), Funding=("Funding", "sum"),
+        ).reset_index()
+        cells.append(grid.merge(labels[keys + ["Place"]], on=keys))
+    grid = pd.concat(cells, ignore_index=True).drop(columns=["Row", "Col"])
+    grid["Grants"] = grid["Grants"].astype(int)
+    return grid[["Level", "Place", "Placement", "Latitude", "Longitude", "Institutes", "Grants", "Funding"]]
+
+
+def build_institute_grid(institutes, grants, persist=True):
+    return bin_institutes(institute_totals(institutes, grants, persist=persist))
+
+
+if __name__ == "__main__":
+    institutes = pd.read_csv(INSTITUTES_PATH, usecols=["Institute", "InstituteCountry", "ResearchInstitution"])
+    grants = pd.read_csv(GRANTS_PATH, usecols=["GrantNumber", "Institute", "InstituteCountry", "AmountGrantedAllSets"])
+    placed = institute_totals(institutes, grants)
+    precision = placed["Precision"].fillna("unplaced").value_counts()
+    print("📍 " + ", ".join(f"{count:,} {kind}" for kind, count in precision.items()) + f" (cached in {GEOCODE_CACHE_PATH})")
+
+    grid = bin_institutes(placed)
+    os.makedirs("data", exist_ok=True)
+    grid.to_csv(GRID_PATH, index=False)
+    for level, cells in grid.groupby("Level", sort=False).size().items():
+        print(f"🗺️ {level:<8} {cells:>6,} cells")
+    print(f"✅ Saved {len(grid)} rows to {GRID_PATH}")
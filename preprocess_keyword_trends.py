@@ -0,0 +1,67 @@
+import os
+import pandas as pd
+
+KEYWORDS_PARQUET_PATH = "data/final_keywords_enriched.parquet"
+KEYWORDS_CSV_PATH = "data/final_keywords_enriched.csv"
+VOCAB_PATH = "data/keyword_vocab.parquet"
+COUNTS_PATH = "data/keyword_year_counts.parquet"
+
+METHOD_COLUMNS = {"TF-IDF": "TFIDF_Keywords", "RAKE": "RAKE_Keywords", "YAKE": "YAKE_Keywords"}
+
+
+def load_keyword_rows():
+    columns = ["GrantNumber", "Language", "MainDiscipline", "StartDate"] + list(METHOD_COLUMNS.values())
+    if os.path.exists(KEYWORDS_PARQUET_PATH):
+        return pd.read_parquet(KEYWORDS_PARQUET_PATH, columns=columns)
+    return pd.read_csv(KEYWORDS_CSV_PATH, usecols=columns)
+
+
+def explode_keywords(series):
+    """One row per keyword, split the same way the keyword page splits them."""
+    keywords = series.dropna().str.replace(",", ";").str.split(";").explode().str.strip().str.lower()
+    return keywords[keywords.str.len() > 0]
+
+
+def keyword_mentions(df):
+    """One (Method, Language, MainDiscipline, Year, Keyword) row per keyword mention."""
+    df = df.copy()
+    df["Year"] = pd.to_datetime(df["StartDate"], errors="coerce").dt.year
+    df = df.dropna(subset=["Year"])
+    df["Language"] = df["Language"].fillna("unknown")
+    df["MainDiscipline"] = df["MainDiscipline"].fillna("Unknown")
+
+    frames = []
+    for method, column in METHOD_COLUMNS.items():
+        keywords = explode_keywords(df[column])
+        exploded = df.loc[keywords.index, ["Language", "MainDiscipline", "Year"]]
+        exploded["Keyword"] = keywords.values
+        exploded["Method"] = method
+        frames.append(exploded)
+    return pd.concat(frames, ignore_index=True)
+
+
+def typed_counts(counts):
+    counts["Year"] = counts["Year"].astype("int16")
+    counts["KeywordId"] = counts["KeywordId"].astype("int32")
+    counts["Count"] = counts["Count"].astype("int32")
+    for col in ["Method", "Language", "MainDiscipline"]:
+        counts[col] = counts[col].astype("category")
+    return counts
+
+
+def build_keyword_counts(df):
+    """Long (Method, Language, MainDiscipline, Year, KeywordId, Count) table plus the shared vocabulary."""
+    exploded = keyword_mentions(df)
+    codes, vocab = pd.factorize(exploded["Keyword"], sort=True)
+    exploded["KeywordId"] = codes
+    counts = exploded.groupby(["Method", "Language", "MainDiscipline", "Year", "KeywordId"]).size().reset_index(name="Count")
+    return pd.DataFrame({"KeywordId": range(len(vocab)), "Keyword": vocab}), typed_counts(counts)
+
+
+if __name__ == "__main__":
+    vocab, counts = build_keyword_counts(load_keyword_rows())
+    os.makedirs("data", exist_ok=True)
+    vocab.to_parquet(VOCAB_PATH, index=False)
+    counts.to_parquet(COUNTS_PATH, index=False)
+    print(f"🔤 {len(vocab)} distinct keywords")
+    print(f"✅ Saved {len(counts)} rows to {COUNTS_PATH}")
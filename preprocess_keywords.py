@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import nltk
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yake
+from langdetect import DetectorFactory, LangDetectException, detect
+from nltk.corpus import stopwords
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+GRANTS_PATH = "data/grant_final.csv"
+OUTPUT_PATH = "data/final_keywords_enriched.parquet"
+CHECKPOINT_DIR = "data/keyword_chunks"
+
+TEXT_COLUMNS = ["Title", "Abstract"]
+META_COLUMNS = ["GrantNumber", "StartDate", "MainDiscipline"]
+STOPWORD_LANGUAGES = {"en": "english", "fr": "french", "de": "german", "it": "italian", "es": "spanish"}
+TOP_K = 5
+
+OUTPUT_COLUMNS = ["GrantNumber", "Language", "Sentence", "TFIDF_Keywords",
+                  "RAKE_Keywords", "YAKE_Keywords", "StartDate", "MainDiscipline"]
+OUTPUT_SCHEMA = pa.schema([(col, pa.string()) for col in OUTPUT_COLUMNS])
+
+DetectorFactory.seed = 0
+
+_tfidf = {}
+_stopwords = {}
+
+
+def split_sentences(text):
+    return [s.strip() for s in re.split(r"[.!?;]+\s*", text) if len(s.strip()) > 3]
+
+
+def detect_language(text):
+    try:
+        lang = detect(text)
+    except LangDetectException:
+        return "unknown"
+    return lang if lang in STOPWORD_LANGUAGES else "unknown"
+
+
+def stopwords_for(lang):
+    return set(stopwords.words(STOPWORD_LANGUAGES.get(lang, "english")))
+
+
+def fit_tfidf(grants):
+    """One vectoriser per language, fitted on whole grant texts so IDF reflects the full corpus.
+
+    A language whose texts are nothing but stopwords has no vocabulary and gets no vectoriser.
+    """
+    vectorizers = {}
+    for lang, group in grants.groupby("Language"):
+        vectorizer = TfidfVectorizer(stop_words=list(stopwords_for(lang)), ngram_range=(1, 2),
+                                     max_df=0.5, min_df=2, sublinear_tf=True)
+        try:
+            vectorizer.fit(group["Text"])
+        except ValueError:
+            # too few documents left after min_df/max_df pruning
+            try:
+                vectorizer = TfidfVectorizer(stop_words=list(stopwords_for(lang))).fit(group["Text"])
+            except ValueError:
+                print(f"⚠️ No TF-IDF vocabulary for '{lang}' ({len(group)} grants), skipping TF-IDF keywords")
+                continue
+        vectorizers[lang] = vectorizer
+    return vectorizers
+
+
+def tfidf_keywords(sentences, lang):
+    vectorizer = _tfidf.get(lang)
+    if vectorizer is None:
+        return [None] * len(sentences)
+    X = vectorizer.transform(sentences)
+    terms = vectorizer.get_feature_names_out()
+    keywords = []
+    for row in range(X.shape[0]):
+        start, end = X.indptr[row], X.indptr[row + 1]
+        top = X.indices[start:end][X.data[start:end].argsort()[::-1][:TOP_K]]
+        keywords.append(", ".join(terms[top]) or None)
+    return keywords
+
+
+def rake_keywords(sentence, stop):
+    """RAKE: candidate phrases are runs of non-stopwords, scored by summed word degree / frequency."""
+    words = re.findall(r"[^\W\d_]+", sentence.lower())
+    phrases, current = [], []
+    for word in words:
+        if word in stop or len(word) < 2:
+            if current:
+                phrases.append(tuple(current))
+            current = []
+        else:
+            current.append(word)
+    if current:
+        phrases.append(tuple(current))
+
+    freq, degree = defaultdict(int), defaultdict(int)
+    for phrase in phrases:
+        for word in phrase:
+            freq[word] += 1
+            degree[word] += len(phrase)
+    scores = {phrase: sum(degree[w] / freq[w] for w in phrase) for phrase in set(phrases)}
+    ranked = sorted(scores, key=scores.get, reverse=True)[:TOP_K]
+    return ", ".join(" ".join(p) for p in ranked) or None
+
+
+def yake_keywords(sentence, extractor):
+    return ", ".join(kw for kw, _ in extractor.extract_keywords(sentence)) or None
+
+
+def _init_worker(vectorizers):
+    _tfidf.update(vectorizers)
+
+
+def extract_chunk(chunk, path):
+    """Sentence-level keywords for one chunk of grants, written to its own checkpoint file."""
+    rows = []
+    for lang, group in chunk.groupby("Language"):
+        stop = _stopwords.setdefault(lang, stopwords_for(lang))
+        extractor = yake.KeywordExtractor(lan=lang if lang != "unknown" else "en", n=2, top=TOP_K, stopwords=stop)
+        for grant in group.itertuples(index=False):
+            sentences = split_sentences(grant.Text)
+            if not sentences:
+                continue
+            for sentence, tfidf in zip(sentences, tfidf_keywords(sentences, lang)):
+                rows.append({
+                    "GrantNumber": grant.GrantNumber,
+                    "Language": lang,
+                    "Sentence": sentence,
+                    "TFIDF_Keywords": tfidf,
+                    "RAKE_Keywords": rake_keywords(sentence, stop),
+                    "YAKE_Keywords": yake_keywords(sentence, extractor),
+                    "StartDate": grant.StartDate,
+                    "MainDiscipline": grant.MainDiscipline,
+                })
+
+    out = pa.Table.from_pandas(pd.DataFrame(rows, columns=OUTPUT_COLUMNS), schema=OUTPUT_SCHEMA, preserve_index=False)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(out, tmp_path)
+    os.replace(tmp_path, path)
+    return out.num_rows
+
+
+def load_grant_texts(path):
+    header = pd.read_csv(path, nrows=0).columns
+    text_cols = [c for c in TEXT_COLUMNS if c in header]
+    grants = pd.read_csv(path, usecols=META_COLUMNS + text_cols, dtype={"GrantNumber": str, "StartDate": str, "MainDiscipline": str})
+    grants["Text"] = grants[text_cols].fillna("").astype(str).agg(". ".join, axis=1).str.strip(". ")
+    grants = grants[grants["Text"].str.len() > 0]
+    return grants.sort_values("GrantNumber").reset_index(drop=True)
+
+
+def run_pipeline(input_path=GRANTS_PATH, output_path=OUTPUT_PATH, workers=None, chunk_size=500):
+    nltk.download("stopwords", quiet=True)
+    grants = load_grant_texts(input_path)
+
+    # Checkpoints live under a digest of the input so a changed corpus never resumes stale chunks
+    digest = hashlib.sha1(pd.util.hash_pandas_object(grants[["GrantNumber", "Text"]], index=False).values).hexdigest()[:12]
+    checkpoint_dir = os.path.join(CHECKPOINT_DIR, f"{digest}-{chunk_size}")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    language_path = os.path.join(checkpoint_dir, "languages.parquet")
+    if os.path.exists(language_path):
+        grants["Language"] = pd.read_parquet(language_path)["Language"].values
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            grants["Language"] = list(pool.map(detect_language, grants["Text"], chunksize=chunk_size))
+        grants[["GrantNumber", "Language"]].to_parquet(language_path, index=False)
+    print(f"🌐 Languages for {len(grants)} grants: {grants['Language'].value_counts().to_dict()}")
+
+    vectorizers = fit_tfidf(grants)
+
+    chunks = [grants.iloc[start:start + chunk_size] for start in range(0, len(grants), chunk_size)]
+    paths = [os.path.join(checkpoint_dir, f"chunk_{i:05d}.parquet") for i in range(len(chunks))]
+    pending = [(chunk, path) for chunk, path in zip(chunks, paths) if not os.path.exists(path)]
+    print(f"♻️ Resuming: {len(chunks) - len(pending)} of {len(chunks)} chunks already done")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(vectorizers,)) as pool:
+        futures = {pool.submit(extract_chunk, chunk, path): path for chunk, path in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            rows = future.result()
+            print(f"🧩 {done}/{len(pending)} {os.path.basename(futures[future])}: {rows} sentences")
+
+    table = pa.concat_tables([pq.read_table(path) for path in paths])
+    pq.write_table(table, output_path)
+    print(f"✅ Saved {table.num_rows} rows to {output_path} in {time.perf_counter() - started:,.0f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract TF-IDF, RAKE and YAKE keywords from grant texts.")
+    parser.add_argument("--input", default=GRANTS_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="grants per checkpointed chunk")
+    args = parser.parse_args()
+    run_pipeline(args.input, args.output, args.workers, args.chunk_size)
@@ -0,0 +1,83 @@
+import pandas as pd
+import os
+
+from text_index import TextIndex
+
+SUMMARY_PATH = "data/grant_output_summary.csv"
+SEARCH_DOCS_PATH = "data/output_search_docs.csv"
+SEARCH_INDEX_PATH = "data/output_search_index.npz"
+
+# output type -> (table, column holding the output's year or date)
+OUTPUT_TABLES = {
+    "Award": ("data/OutputAward.csv", "Year"),
+    "Dataset": ("data/OutputDataset.csv", "PublicationDate"),
+    "Knowledge Transfer": ("data/OutputKnowledgeTransferEvent.csv", "Date"),
+    "Use-Inspired": ("data/OutputUseInspired.csv", "Year"),
+}
+
+
+def normalize_grant_numbers(series):
+    """Output tables store plain grant numbers (171329), grant tables prefix them (G171329)."""
+    numbers = series.astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    return numbers.where(numbers.str.startswith("G"), "G" + numbers)
+
+
+def output_rows(output_type, df, year_column):
+    df = df.dropna(subset=["GrantNumber"])
+    years = df[year_column].astype(str).str[:4]  # "2016.0" and "2012-11-01" alike
+    return pd.DataFrame({
+        "GrantNumber": normalize_grant_numbers(df["GrantNumber"]),
+        "OutputType": output_type,
+        "Year": pd.to_numeric(years, errors="coerce").astype("Int64"),
+    })
+
+
+def load_outputs(output_type, path, year_column):
+    df = pd.read_csv(path, usecols=["GrantNumber", year_column], dtype={"GrantNumber": str, year_column: str})
+    return output_rows(output_type, df, year_column)
+
+
+def count_outputs(outputs):
+    """One row per (grant, output type, year) with the number of reported outputs."""
+    summary = outputs.groupby(["GrantNumber", "OutputType", "Year"], dropna=False).size()
+    return summary.reset_index(name="Count")
+
+
+def build_output_summary(tables=OUTPUT_TABLES):
+    outputs = pd.concat([load_outputs(name, path, column) for name, (path, column) in tables.items()
+                         if os.path.exists(path)], ignore_index=True)
+    return count_outputs(outputs)
+
+
+def build_search_corpus():
+    """Searchable outputs: dataset titles with abstracts, and knowledge-transfer event names."""
+    datasets = pd.read_csv(OUTPUT_TABLES["Dataset"][0],
+                           usecols=["GrantNumber", "OutputId", "Title", "Abstract", "PublicationDate"], dtype=str)
+    events = pd.read_csv(OUTPUT_TABLES["Knowledge Transfer"][0],
+                         usecols=["GrantNumber", "OutputId", "Event", "Date"], dtype=str)
+    docs = pd.concat([
+        pd.DataFrame({"OutputType": "Dataset", "OutputId": datasets["OutputId"], "GrantNumber": datasets["GrantNumber"],
+                      "Title": datasets["Title"], "Year": datasets["PublicationDate"].str[:4],
+                      "Text": datasets["Title"].fillna("") + " " + datasets["Abstract"].fillna("")}),
+        pd.DataFrame({"OutputType": "Knowledge Transfer", "OutputId": events["OutputId"], "GrantNumber": events["GrantNumber"],
+                      "Title": events["Event"], "Year": events["Date"].str[:4], "Text": events["Event"].fillna("")}),
+    ], ignore_index=True)
+    docs["GrantNumber"] = normalize_grant_numbers(docs["GrantNumber"])
+    docs["Year"] = pd.to_numeric(docs["Year"], errors="coerce").astype("Int64")
+    return docs
+
+
+if __name__ == "__main__":
+    summary = build_output_summary()
+
+    os.makedirs("data", exist_ok=True)
+    summary.to_csv(SUMMARY_PATH, index=False)
+    for output_type, count in summary.groupby("OutputType")["Count"].sum().items():
+        print(f"📦 {output_type}: {count:,} outputs")
+    print(f"✅ Saved {len(summary)} rows for {summary['GrantNumber'].nunique()} grants to {SUMMARY_PATH}")
+
+    docs = build_search_corpus()
+    index = TextIndex.build(docs["Text"])
+    docs.drop(columns="Text").to_csv(SEARCH_DOCS_PATH, index=False)
+    index.save(SEARCH_INDEX_PATH)
+    print(f"🔎 Indexed {index.n_docs:,} outputs, {len(index.terms):,} terms, {len(index.doc_ids):,} postings to {SEARCH_INDEX_PATH}")
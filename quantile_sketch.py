@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# Log-bucketed sketches (as in DDSketch): every quantile is within 1% of the true value,
+# and merging two sketches is just adding their bucket counts.
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = np.log(GAMMA)
+
+
+def bucket_index(values):
+    """Bucket of each value; amounts below 1 share the bucket of 1."""
+    return np.ceil(np.log(np.maximum(values, 1.0)) / LOG_GAMMA).astype(np.int16)
+
+
+def bucket_value(index):
+    """Representative value of a bucket, within RELATIVE_ACCURACY of anything inside it."""
+    return 2 * GAMMA ** index.astype(np.float64) / (GAMMA + 1)
+
+
+def build_sketches(df, value, keys):
+    """One sketch per group of ``keys``, as (keys..., Bucket, Count) rows."""
+    rows = df[keys + [value]].dropna(subset=[value])
+    rows = rows.assign(Bucket=bucket_index(rows[value].to_numpy(dtype=np.float64)))
+    return rows.groupby(keys + ["Bucket"], observed=True).size().reset_index(name="Count")
+
+
+def merge_sketches(sketches, keys):
+    """Merge sketch rows that differ only outside ``keys`` (e.g. several years into one)."""
+    return sketches.groupby(keys + ["Bucket"], observed=True)["Count"].sum().reset_index()
+
+
+def sketch_quantiles(sketches, keys, qs=(0.1, 0.25, 0.5, 0.75, 0.9)):
+    """Quantiles per group of merged sketches; columns p10, p25, … plus the group size N."""
+    merged = merge_sketches(sketches, keys).sort_values(keys + ["Bucket"])
+    grouped = merged.groupby(keys, observed=True)["Count"]
+    cumulative = grouped.cumsum().to_numpy()
+    total = grouped.transform("sum").to_numpy()
+
+    result = merged[keys].drop_duplicates().set_index(keys)
+    result["N"] = merged.groupby(keys, observed=True)["Count"].sum()
+    for q in qs:
+        # first bucket whose cumulative count passes the q-th rank
+        reached = merged[cumulative > q * (total - 1)]
+        first = reached.groupby(keys, observed=True)["Bucket"].first()
+        result[f"p{round(q * 100)}"] = pd.Series(bucket_value(first.to_numpy()), index=first.index)
+    return result.reset_index()
@@ -0,0 +1,248 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import pandas as pd
+import plotly
+import plotly.express as px
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from disk_cache import file_digest
+from funding_insights import FUNDING_INPUTS, load_funding_data, filter_call_years, yearly_funding, top_by
+from gender_diversity import GENDER_INPUTS, load_gender_data, filter_gender, gender_summary
+from shared_store import attach_table, export_table, remove_stale, table_path
+from utils import styled_plot
+
+REPORTS_DIR = "reports"
+MANIFEST = "manifest.json"
+# Versioned: an upgraded plotly writes a new bundle, and its version is part of every report digest
+PLOTLY_BUNDLE = f"plotly-{plotly.__version__}.min.js"
+GENDER_COLORS = {"male": "lightblue", "female": "pink"}
+
+# What a report is cut by, and the dimension its top-10 charts break it down by
+DIMENSIONS = {
+    "institution": ("ResearchInstitution", "MainDiscipline"),
+    "discipline": ("MainDiscipline", "ResearchInstitution"),
+}
+
+# A change to any of these re-renders every report, not just the ones whose rows changed
+RENDER_SOURCES = [__file__, "funding_insights.py", "gender_diversity.py", "utils.py"]
+
+PAGE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<script src="{bundle}"></script>
+<style>
+body {{ background: #E4E1DC; color: #2B2B2B; font-family: sans-serif; margin: 2rem auto; max-width: 1100px; }}
+h1, h2 {{ color: #3B4C59; }} table {{ border-collapse: collapse; }} td, th {{ padding: 0.2rem 0.8rem; text-align: right; }}
+.metrics {{ display: flex; gap: 2rem; }} .metrics div {{ font-size: 1.4rem; }} .metrics small {{ display: block; font-size: 0.8rem; }}
+@media print {{ .plotly-graph-div {{ break-inside: avoid; }} }}
+</style></head><body>
+<h1>{heading}</h1>
+<p>{subtitle}</p>
+{body}
+</body></html>
+"""
+
+_snapshot = {}
+
+
+def snapshot_tables():
+    """Export the funding and gender frames once as Arrow files the workers memory-map read-only
+    (the same files the dashboard shares under SNSF_SHARED_DATA=1)."""
+    paths = {}
+    for name, inputs, load in [("funding", FUNDING_INPUTS, load_funding_data), ("gender", GENDER_INPUTS, load_gender_data)]:
+        path = table_path(name, inputs)
+        if not os.path.exists(path):
+            export_table(load(), path)
+            remove_stale(name, path)
+        paths[name] = path
+    return paths
+
+
+def attach_snapshot(paths):
+    """Worker initializer: map the snapshot and merge the default template once, rather than on every figure."""
+    for name, path in paths.items():
+        _snapshot[name] = attach_table(name, path)
+    pio.templates["snsf_report"] = pio.templates[pio.templates.default]
+    pio.templates.default = "snsf_report"
+
+
+def report_filename(name):
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")[:60]
+    return f"{slug}-{hashlib.sha1(name.encode()).hexdigest()[:6]}.html"
+
+
+def group_digests(df, column):
+    """Order-independent content digest of each group's rows: the sum of its row hashes and its size."""
+    hashes = pd.util.hash_pandas_object(df.drop(columns=["GrantDoc"], errors="ignore"), index=False)
+    sums = hashes.groupby(df[column].to_numpy(), sort=False).agg(["sum", "size"])
+    return {name: f"{total}:{size}" for name, total, size in zip(sums.index, sums["sum"], sums["size"])}
+
+
+def report_digests(funding, gender, column, year_range):
+    version = "-".join([PLOTLY_BUNDLE] + [file_digest(path)[:12] for path in RENDER_SOURCES])
+    funding_parts, gender_parts = group_digests(funding, column), group_digests(gender, column)
+    return {name: hashlib.sha256(f"{version}|{year_range}|{part}|{gender_parts.get(name, '')}".encode()).hexdigest()
+            for name, part in funding_parts.items()}
+
+
+def figure_html(fig, height=360):
+    return styled_plot(fig, height=height).to_html(full_html=False, include_plotlyjs=False)
+
+
+def table_html(df, formats):
+    return df.to_html(index=False, border=0, formatters={column: fmt.format for column, fmt in formats.items()})
+
+
+def funding_section(df, breakdown):
+    yearly = yearly_funding(df)
+    top_funding, top_counts, _ = top_by(df, breakdown, 10)
+    parts = [
+        "<h2>Funding</h2>",
+        '<div class="metrics">'
+        f"<div>{len(df):,}<small>grants</small></div>"
+        f"<div>CHF {df['AmountGrantedAllSets'].sum():,.0f}<small>total funding</small></div>"
+        f"<div>CHF {df['AmountGrantedAllSets'].median():,.0f}<small>median grant</small></div>"
+        "</div>",
+        figure_html(px.bar(yearly, x="CallDecisionYear", y="AmountGrantedAllSets", title="Funding per Call Decision Year",
+                           color_discrete_sequence=["#3B4C59"])),
+        figure_html(px.bar(top_funding, x="AmountGrantedAllSets", y=breakdown, orientation="h",
+                           title=f"Top {breakdown} by Funding", color_discrete_sequence=["#3B4C59"])),
+        figure_html(px.bar(top_counts, x="GrantCount", y=breakdown, orientation="h",
+                           title=f"Top {breakdown} by Grant Count", color_discrete_sequence=["#9A5A41"])),
+    ]
+    return "\n".join(parts)
+
+
+def gender_section(df):
+    if df.empty:
+        return "<h2>Gender</h2><p>No participants with a recorded gender.</p>"
+    summary = gender_summary(df)
+    by_year = df.groupby(["start_year", "Gender"]).size().reset_index(name="Participations")
+    by_year["Share"] = by_year["Participations"] / by_year.groupby("start_year")["Participations"].transform("sum") * 100
+    parts = [
+        "<h2>Gender</h2>",
+        table_html(summary, {"Participations": "{:,}", "TotalFunding": "{:,.0f}", "AvgFunding": "{:,.0f}", "Share": "{:.1f}%"}),
+        figure_html(px.line(by_year, x="start_year", y="Share", color="Gender", color_discrete_map=GENDER_COLORS,
+                            title="Participation Share by Start Year (%)")),
+    ]
+    return "\n".join(parts)
+
+
+def render_report(dimension, name, path, year_range):
+    """Write one report from the attached snapshot; runs in a worker process."""
+    started = time.perf_counter()
+    column, breakdown = DIMENSIONS[dimension]
+    funding = _snapshot["funding"]
+    funding = filter_call_years(funding[funding[column] == name], year_range)
+    gender = _snapshot["gender"]
+    gender = filter_gender(gender[gender[column] == name], year_range)
+    page = PAGE.format(
+        bundle=PLOTLY_BUNDLE,
+        title=html.escape(name),
+        heading=html.escape(name),
+        subtitle=f"SNSF funding and gender report · {year_range[0]}–{year_range[1]} (funding by call decision year, "
+                 f"gender by start year) · generated {date.today()}",
+        body=funding_section(funding, breakdown) + "\n" + gender_section(gender),
+    )
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(page)
+    os.replace(tmp, path)
+    return name, time.perf_counter() - started
+
+
+def stale_reports(digests, manifest, out_dir, force=False):
+    """Names whose digest differs from the manifest's or whose file is gone."""
+    return [name for name, digest in digests.items()
+            if force or manifest.get(name, {}).get("digest") != digest
+            or not os.path.exists(os.path.join(out_dir, manifest[name]["file"]))]
+
+
+def write_index(out_dir, dimension, manifest):
+    rows = "\n".join(f'<li><a href="{entry["file"]}">{html.escape(name)}</a></li>'
+                     for name, entry in sorted(manifest.items()))
+    page = PAGE.format(bundle=PLOTLY_BUNDLE, title="SNSF reports", heading=f"SNSF reports by {dimension}",
+                       subtitle=f"{len(manifest)} reports · updated {date.today()}", body=f"<ul>\n{rows}\n</ul>")
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render a static HTML funding and gender report per institution or discipline, skipping unchanged ones."
+    )
+    parser.add_argument("--by", choices=list(DIMENSIONS), default="institution")
+    parser.add_argument("--out", help=f"output directory (default {REPORTS_DIR}/<by>)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--from", dest="start", type=int, help="first call decision year")
+    parser.add_argument("--to", dest="end", type=int, help="last call decision year")
+    parser.add_argument("--only", nargs="+", help="render just these names")
+    parser.add_argument("--force", action="store_true", help="re-render even when a report's inputs are unchanged")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    column = DIMENSIONS[args.by][0]
+    out_dir = args.out or os.path.join(REPORTS_DIR, args.by)
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = snapshot_tables()
+    attach_snapshot(paths)
+    funding, gender = _snapshot["funding"], _snapshot["gender"]
+    year_range = (args.start or int(funding["CallDecisionYear"].min()), args.end or int(funding["CallDecisionYear"].max()))
+    digests = report_digests(filter_call_years(funding, year_range), filter_gender(gender, year_range), column, year_range)
+    if args.only:
+        unknown = set(args.only) - set(digests)
+        if unknown:
+            print(f"❌ No {args.by} named {', '.join(sorted(unknown))}")
+            return 1
+        digests = {name: digests[name] for name in args.only}
+
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    todo = stale_reports(digests, manifest, out_dir, args.force)
+    print(f"📑 {len(digests):,} reports by {args.by}: {len(todo):,} to render, {len(digests) - len(todo):,} unchanged")
+
+    bundle = os.path.join(out_dir, PLOTLY_BUNDLE)
+    if not os.path.exists(bundle):
+        with open(bundle, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), initializer=attach_snapshot, initargs=(paths,)) as pool:
+        futures = {pool.submit(render_report, args.by, name, os.path.join(out_dir, report_filename(name)), year_range): name
+                   for name in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                _, seconds = future.result()
+            except Exception as e:
+                failed.append(name)
+                print(f"❌ {name}: {e}")
+                continue
+            manifest[name] = {"file": report_filename(name), "digest": digests[name]}
+            if done % 25 == 0 or done == len(todo):
+                print(f"🖨️ {done:,}/{len(todo):,} rendered ({name}: {seconds:.2f}s)")
+
+    tmp = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+    write_index(out_dir, args.by, manifest)
+    print(f"✅ {len(todo) - len(failed):,} reports written to {out_dir} in {time.perf_counter() - started:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
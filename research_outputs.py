@@ -0,0 +1,132 @@
+import os
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from disk_cache import disk_cache
+from memory_cache import memory_cache
+from preprocess_outputs import OUTPUT_TABLES, SEARCH_DOCS_PATH, SEARCH_INDEX_PATH, load_outputs
+from text_index import TextIndex
+from utils import styled_plot, cached_chart
+from grant_search import GRANT_IDS_PATH, with_grant_docs, filter_grants, active_query
+
+EVENTS_PATH = OUTPUT_TABLES["Knowledge Transfer"][0]
+USE_INSPIRED_PATH = OUTPUT_TABLES["Use-Inspired"][0]
+
+@memory_cache()
+@disk_cache(inputs=[path for path, _ in OUTPUT_TABLES.values()] + [GRANT_IDS_PATH])
+def load_output_years():
+    """(GrantNumber, OutputType, Year) for every reported output."""
+    return with_grant_docs(pd.concat([load_outputs(name, path, column) for name, (path, column) in OUTPUT_TABLES.items()],
+                                     ignore_index=True))
+
+@memory_cache()
+@disk_cache(inputs=[EVENTS_PATH, GRANT_IDS_PATH])
+def load_events():
+    df = pd.read_csv(EVENTS_PATH, usecols=["GrantNumber", "Date", "TargetGroup", "Type"],
+                     dtype={"GrantNumber": str, "TargetGroup": "category", "Type": "category"})
+    df["Year"] = pd.to_numeric(df["Date"].str[:4], errors="coerce")
+    return with_grant_docs(df.drop(columns="Date"))
+
+@memory_cache()
+@disk_cache(inputs=[USE_INSPIRED_PATH, GRANT_IDS_PATH])
+def load_use_inspired():
+    df = pd.read_csv(USE_INSPIRED_PATH, usecols=["GrantNumber", "Type", "Year"],
+                     dtype={"GrantNumber": str, "Type": "category"})
+    return with_grant_docs(df)
+
+@memory_cache()
+def output_aggregates(year_range, grant_query=""):
+    """Per-year and per-category counts for the overview charts, computed once per filter signature."""
+    def in_range(df):
+        df = filter_grants(df, grant_query)
+        return df[(df["Year"] >= year_range[0]) & (df["Year"] <= year_range[1])]
+
+    outputs = in_range(load_output_years())
+    events = in_range(load_events())
+    use_inspired = in_range(load_use_inspired())
+    return {
+        "by_year": outputs.groupby(["Year", "OutputType"]).size().reset_index(name="Count"),
+        "by_type": outputs["OutputType"].value_counts().rename_axis("OutputType").reset_index(name="Count"),
+        "grants": outputs["GrantNumber"].nunique(),
+        "event_targets": events["TargetGroup"].value_counts().rename_axis("TargetGroup").reset_index(name="Events"),
+        "event_types": events.groupby(["Year", "Type"], observed=True).size().reset_index(name="Events"),
+        "use_inspired": use_inspired.groupby(["Year", "Type"], observed=True).size().reset_index(name="Outputs"),
+    }
+
+@st.cache_resource
+def load_search_index():
+    if not (os.path.exists(SEARCH_INDEX_PATH) and os.path.exists(SEARCH_DOCS_PATH)):
+        return None, None
+    docs = pd.read_csv(SEARCH_DOCS_PATH, dtype={"GrantNumber": str, "OutputType": "category", "Year": "Int64"})
+    return TextIndex.load(SEARCH_INDEX_PATH), docs
+
+def search_outputs(query, output_types, top_k=50):
+    index, docs = load_search_index()
+    if index is None:
+        return None
+    ids, scores = index.search(query, top_k, mask=docs["OutputType"].isin(output_types).to_numpy())
+    hits = docs.iloc[ids].copy()
+    hits.insert(0, "Score", scores.round(2))
+    return hits
+
+def show_research_outputs():
+    st.markdown("<h5 style='color:#3B4C59; margin-bottom:0.3rem;'>Research Outputs</h5>", unsafe_allow_html=True)
+    outputs = load_output_years()
+
+    with st.sidebar:
+        min_year, max_year = int(outputs["Year"].min()), int(outputs["Year"].max())
+        year_range = st.slider("Output Year", min_year, max_year, (max(min_year, 2000), max_year))
+
+    aggregates = output_aggregates(year_range, active_query())
+    tabs = st.tabs(["Overview", "Knowledge Transfer", "Use-Inspired", "Search"])
+
+    # === OVERVIEW ===
+    with tabs[0]:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Outputs", f"{aggregates['by_type']['Count'].sum():,}")
+        col2.metric("Grants with Outputs", f"{aggregates['grants']:,}")
+        col3.metric("Output Types", len(aggregates["by_type"]))
+
+        col4, col5 = st.columns([2, 1])
+        col4.plotly_chart(cached_chart("outputs/by-year", aggregates["by_year"], lambda d: styled_plot(
+            px.bar(d, x="Year", y="Count", color="OutputType", title="Outputs per Year",
+                   color_discrete_sequence=["#3B4C59", "#9A5A41", "#7A5B9D", "#A3B18A"]), height=320)),
+            use_container_width=True)
+        col5.plotly_chart(cached_chart("outputs/by-type", aggregates["by_type"], lambda d: styled_plot(
+            px.pie(d, names="OutputType", values="Count", hole=0.4, title="Share by Type"), height=320)),
+            use_container_width=True)
+
+    # === KNOWLEDGE TRANSFER ===
+    with tabs[1]:
+        col1, col2 = st.columns(2)
+        col1.plotly_chart(cached_chart("outputs/event-targets", aggregates["event_targets"].head(12), lambda d: styled_plot(
+            px.bar(d, x="Events", y="TargetGroup", orientation="h", title="Events by Target Group",
+                   color_discrete_sequence=["#3B4C59"]), height=380)),
+            use_container_width=True)
+        col2.plotly_chart(cached_chart("outputs/event-types", aggregates["event_types"], lambda d: styled_plot(
+            px.area(d, x="Year", y="Events", color="Type", title="Event Types over Time"), height=380)),
+            use_container_width=True)
+
+    # === USE-INSPIRED ===
+    with tabs[2]:
+        st.plotly_chart(cached_chart("outputs/use-inspired", aggregates["use_inspired"], lambda d: styled_plot(
+            px.bar(d, x="Year", y="Outputs", color="Type", title="Software and Start-ups per Year",
+                   color_discrete_sequence=["#9A5A41", "#7A5B9D"]), height=320)),
+            use_container_width=True)
+
+    # === SEARCH ===
+    with tabs[3]:
+        col1, col2 = st.columns([3, 2])
+        query = col1.text_input("Search dataset titles, abstracts and event names")
+        output_types = col2.multiselect("Output types", ["Dataset", "Knowledge Transfer"],
+                                        default=["Dataset", "Knowledge Transfer"])
+        if query:
+            hits = search_outputs(query, output_types)
+            if hits is None:
+                st.warning("Search index not found. Run `python preprocess_outputs.py` to build it.")
+            elif hits.empty:
+                st.info("No outputs match this search.")
+            else:
+                st.caption(f"Top {len(hits)} matches")
+                st.dataframe(hits[["Score", "OutputType", "Title", "Year", "GrantNumber"]],
+                             use_container_width=True, hide_index=True)
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -5,6 +6,14 @@ import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
+from scipy.sparse import csr_matrix
+from disk_cache import disk_cache
+from data_io import GRANT_TYPES, PERSON_TYPES, LINK_TYPES, read_tables
+from memory_cache import memory_cache
+from shared_store import shared_table
+from grant_search import GRANT_IDS_PATH, with_grant_docs, filter_grants
+from preprocess_outputs import SUMMARY_PATH as OUTPUT_SUMMARY_PATH, normalize_grant_numbers
+from preprocess_institute_map import GRID_PATH, MAP_LEVELS
 
 # Optional styled_plot import
 try:
@@ -15,6 +24,8 @@ except ImportError:
         return fig
     USE_STYLE = False
 
+RESEARCHER_GRANT_COLUMNS = ['GrantNumber', 'AmountGrantedAllSets', 'start_year', 'MainDiscipline', 'InstituteCountry', 'Institute', 'Title']
+
 @pd.api.extensions.register_dataframe_accessor("snsf")
 class ResearcherHelper:
     def __init__(self, pandas_obj):
@@ -25,16 +36,24 @@ class ResearcherHelper:
         df = df[df['start_year'] > 1900]
         return df.groupby('start_year')['AmountGrantedAllSets'].sum().reset_index()
 
-@st.cache_data
+RESEARCHER_INPUTS = ["data/person_final.csv", "data/grant_final.csv", "data/GrantToPerson.csv", GRANT_IDS_PATH]
+MAX_COMPARED = 40
+
+@shared_table("researchers", inputs=RESEARCHER_INPUTS)
+@memory_cache()
+@disk_cache(inputs=RESEARCHER_INPUTS)
 def load_data():
-    person_df = pd.read_csv("data/person_final.csv")
-    grant_df = pd.read_csv("data/grant_final.csv")
-    g2p_df = pd.read_csv("data/GrantToPerson.csv")
+    tables = read_tables({
+        "person": ("data/person_final.csv", None, PERSON_TYPES),
+        "grants": ("data/grant_final.csv", RESEARCHER_GRANT_COLUMNS, GRANT_TYPES),
+        "links": ("data/GrantToPerson.csv", None, LINK_TYPES),
+    })
+    person_df, grant_df, g2p_df = tables["person"], tables["grants"], tables["links"]
 
     merged = pd.merge(g2p_df, person_df, on="PersonNumber", how="left")
     merged = pd.merge(
         merged,
-        grant_df[['GrantNumber', 'AmountGrantedAllSets', 'start_year', 'MainDiscipline', 'InstituteCountry', 'Institute', 'Title']],
+        grant_df[RESEARCHER_GRANT_COLUMNS],
         on="GrantNumber",
         how="left"
     )
@@ -42,17 +61,113 @@ def load_data():
     merged['start_year'] = pd.to_numeric(merged['start_year'], errors='coerce')
     merged['FullName'] = merged['FirstName'].fillna('') + ' ' + merged['Surname'].fillna('')
     merged['Title'] = merged['Title'].fillna('')
-
-    if 'OutputType' not in merged.columns:
-        merged['OutputType'] = np.random.choice([
-            'Academic Event', 'Public Communication', 'Award', 'Dataset', 'Knowledge Transfer'
-        ], len(merged))
-    return merged
+    return with_grant_docs(merged)
+
+@memory_cache()
+@disk_cache(inputs=[OUTPUT_SUMMARY_PATH])
+def load_output_summary():
+    if not os.path.exists(OUTPUT_SUMMARY_PATH):
+        return None
+    return pd.read_csv(OUTPUT_SUMMARY_PATH, dtype={"GrantNumber": str, "OutputType": "category"})
+
+# Map centre and zoom for each detail level: coarse cells read best on a wide view
+MAP_VIEWS = {
+    "Country": ({"lat": 25, "lon": 10}, 0.8),
+    "Region": ({"lat": 48, "lon": 10}, 3),
+    "City": ({"lat": 46.8, "lon": 8.2}, 6.2),
+    "Campus": ({"lat": 46.8, "lon": 8.2}, 7.5),
+}
+
+@memory_cache()
+@disk_cache(inputs=[GRID_PATH])
+def load_institute_grid():
+    if not os.path.exists(GRID_PATH):
+        return None
+    return pd.read_csv(GRID_PATH, dtype={"Level": "category", "Place": str})
+
+def grant_outputs(grant_numbers, summary):
+    """Reported outputs per type for a set of grants, from the preprocessed summary."""
+    if summary is None:
+        return pd.DataFrame(columns=['Output Type', 'Count'])
+    grants = normalize_grant_numbers(pd.Series(grant_numbers).dropna().drop_duplicates())
+    outputs = summary[summary['GrantNumber'].isin(grants)]
+    output_data = outputs.groupby('OutputType', observed=True)['Count'].sum().reset_index()
+    output_data.columns = ['Output Type', 'Count']
+    return output_data.sort_values('Count', ascending=False)
+
+def researcher_profile(researcher_df):
+    return {
+        "name": researcher_df['FullName'].iloc[0],
+        "institute": researcher_df['Institute'].iloc[0],
+        "discipline": researcher_df['MainDiscipline'].iloc[0],
+        "grants": int(researcher_df['GrantNumber'].nunique()),
+        "total_funding": float(researcher_df['AmountGrantedAllSets'].sum()),
+        "funding_by_year": researcher_df.snsf.filter_and_group().sort_values(by='start_year'),
+    }
+
+@memory_cache()
+@disk_cache(inputs=RESEARCHER_INPUTS)
+def researcher_year_matrix():
+    """Sparse person × (discipline, year) funding and grant-count matrices over every researcher.
+
+    Each person's grants are counted once whatever their roles on it; column d * len(years) + y
+    holds discipline d in year y, so one row gather yields trends and discipline mix together.
+    """
+    df = load_data()
+    rows = df.dropna(subset=['PersonNumber', 'start_year']).drop_duplicates(subset=['PersonNumber', 'GrantNumber'])
+    people = pd.Categorical(rows['PersonNumber'].astype(str))
+    disciplines = pd.Categorical(rows['MainDiscipline'].fillna('Unknown').astype(str))
+    year = rows['start_year'].to_numpy().astype(int)
+    years = np.arange(year.min(), year.max() + 1) if len(rows) else np.arange(0)
+    columns = disciplines.codes.astype(np.int64) * len(years) + (year - (years[0] if len(years) else 0))
+    shape = (len(people.categories), len(disciplines.categories) * len(years))
+    funding = csr_matrix((rows['AmountGrantedAllSets'].fillna(0).to_numpy(float), (people.codes, columns)), shape=shape)
+    grants = csr_matrix((np.ones(len(rows)), (people.codes, columns)), shape=shape)
+    return pd.Index(people.categories), years, np.asarray(disciplines.categories), funding, grants
+
+def compare_researchers(labels, year_range=None):
+    """Summary, per-year trends and discipline mix for {PersonNumber: label}, in one pass over their rows.
+
+    ``year_range`` is inclusive; None covers every year.
+    """
+    people, years, disciplines, funding, grants = researcher_year_matrix()
+    labels = {person: label for person, label in labels.items() if person in people}
+    rows = people.get_indexer(list(labels))
+    window = slice(None) if year_range is None else slice(*np.searchsorted(years, [year_range[0], year_range[1] + 1]))
+    shape = (len(rows), len(disciplines), len(years))
+    amounts = funding[rows].toarray().reshape(shape)[:, :, window]
+    counts = grants[rows].toarray().reshape(shape)[:, :, window]
+
+    yearly_funding, yearly_grants = amounts.sum(axis=1), counts.sum(axis=1)
+    mix = counts.sum(axis=2)
+    total_grants, active_years = yearly_grants.sum(axis=1), (yearly_grants > 0).sum(axis=1)
+    top = mix.argmax(axis=1) if len(disciplines) else np.zeros(len(rows), dtype=int)
+    names = list(labels.values())
+    summary = pd.DataFrame({
+        'Researcher': names,
+        'Grants': total_grants.astype(int),
+        'Total Funding': yearly_funding.sum(axis=1),
+        'Active Years': active_years,
+        'Grants per Active Year': np.divide(total_grants, active_years, out=np.zeros(len(rows)), where=active_years > 0),
+        'Main Discipline': np.where(total_grants > 0, disciplines[top], None) if len(disciplines) else None,
+        'Discipline Share': np.divide(mix.max(axis=1, initial=0), total_grants, out=np.zeros(len(rows)), where=total_grants > 0),
+    })
+    window_years = years[window]
+    trends = pd.DataFrame({
+        'Researcher': np.repeat(names, len(window_years)),
+        'Year': np.tile(window_years, len(names)),
+        'Funding': yearly_funding.ravel(),
+        'Cumulative Funding': yearly_funding.cumsum(axis=1).ravel(),
+        'Grants': yearly_grants.ravel(),
+    })
+    person, discipline = np.nonzero(mix)
+    mix = pd.DataFrame({'Researcher': np.asarray(names)[person], 'Discipline': disciplines[discipline], 'Grants': mix[person, discipline]})
+    return summary, trends, mix
 
 def show_researcher_explorer():
     st.title("Researcher Explorer")
 
-    df = load_data()
+    df = filter_grants(load_data())
 
     with st.sidebar:
         st.image("data/swinburne_logo.png", width=200)
@@ -63,11 +178,13 @@ def show_researcher_explorer():
         if selected_discipline != "All":
             df = df[df['MainDiscipline'] == selected_discipline]
 
+        year_range = None
         if df['start_year'].notnull().any():
             min_year = int(df['start_year'].min())
             max_year = int(df['start_year'].max())
             start_year, end_year = st.slider("Grant Year Range", min_year, max_year, (min_year, max_year))
             df = df[(df['start_year'] >= start_year) & (df['start_year'] <= end_year)]
+            year_range = (start_year, end_year)
 
         institutes = sorted(df['Institute'].dropna().unique())
         selected_institute = st.selectbox("Institute", ["All"] + institutes)
@@ -93,12 +210,13 @@ def show_researcher_explorer():
             ])
 
             with tab1:
+                profile = researcher_profile(researcher_df)
                 st.header(f"Profile: {selected}")
-                st.write(f"Institute: {researcher_df['Institute'].iloc[0]}")
+                st.write(f"Institute: {profile['institute']}")
 
                 col1, col2 = st.columns(2)
-                col1.metric("Grants", researcher_df['GrantNumber'].nunique())
-                col2.metric("Total Funding (CHF)", f"{researcher_df['AmountGrantedAllSets'].sum():,.2f}")
+                col1.metric("Grants", profile['grants'])
+                col2.metric("Total Funding (CHF)", f"{profile['total_funding']:,.2f}")
 
                 st.subheader("Grant Records")
                 st.dataframe(researcher_df[['GrantNumber', 'AmountGrantedAllSets', 'start_year']])
@@ -126,15 +244,17 @@ def show_researcher_explorer():
 
             with tab2:
                 st.header("Funding Trend")
-                yearly_funding = researcher_df.snsf.filter_and_group().sort_values(by='start_year')
+                yearly_funding = profile['funding_by_year']
                 fig = px.line(yearly_funding, x='start_year', y='AmountGrantedAllSets', markers=True)
                 st.plotly_chart(styled_plot(fig), use_container_width=True)
 
                 st.header("Grant Output Types")
-                output_data = researcher_df['OutputType'].value_counts().reset_index()
-                output_data.columns = ['Output Type', 'Count']
-                fig_pie = px.pie(output_data, names='Output Type', values='Count', hole=0.4)
-                st.plotly_chart(styled_plot(fig_pie), use_container_width=True)
+                output_data = grant_outputs(researcher_df['GrantNumber'], load_output_summary())
+                if output_data.empty:
+                    st.info("No research outputs reported for this researcher's grants.")
+                else:
+                    fig_pie = px.pie(output_data, names='Output Type', values='Count', hole=0.4)
+                    st.plotly_chart(styled_plot(fig_pie), use_container_width=True)
 
             with tab3:
                 st.header("Researcher Locations")
@@ -150,23 +270,32 @@ def show_researcher_explorer():
                 )
                 st.plotly_chart(styled_plot(fig_map), use_container_width=True)
 
-                st.header("Swiss Universities – Grants & Funding")
-                try:
-                    df_map = pd.read_csv("data/all_swiss_universities_stats.csv")
-                    fig_mapbox = px.scatter_mapbox(
-                        df_map,
+                st.header("Institutes – Grants & Funding")
+                grid = load_institute_grid()
+                if grid is None:
+                    st.info("Run preprocess_institute_map.py to geocode institutes for this map.")
+                else:
+                    level = st.select_slider("Map detail", options=list(MAP_LEVELS), value="City")
+                    cells = grid[grid['Level'] == level]
+                    center, zoom = MAP_VIEWS[level]
+                    fig_grid_map = px.scatter_map(
+                        cells,
                         lat="Latitude",
                         lon="Longitude",
-                        size="GrantCount",
-                        hover_name="ResearchInstitution",
-                        hover_data={"City": True, "GrantCount": True, "TotalFunding": True},
-                        zoom=6,
-                        mapbox_style="carto-positron",
-                        title="Swiss Universities by Research Grant Count"
+                        size="Institutes",
+                        color="Placement",
+                        color_discrete_map={"Located": "#3B4C59", "Approximate": "#C9A66B"},
+                        hover_name="Place",
+                        hover_data={"Institutes": True, "Grants": True, "Funding": ":,.0f",
+                                    "Latitude": False, "Longitude": False},
+                        center=center,
+                        zoom=zoom,
+                        map_style="carto-positron",
+                        title=f"Institutes by {level.lower()} cell ({int(cells['Institutes'].sum()):,} institutes)"
                     )
-                    st.plotly_chart(styled_plot(fig_mapbox), use_container_width=True)
-                except Exception as e:
-                    st.error(f"Error loading Swiss university map: {e}")
+                    st.plotly_chart(styled_plot(fig_grid_map), use_container_width=True)
+                    st.caption("'Approximate' points sit at a region's or country's centre: the gazetteer only matched "
+                               "the state, canton or country of those institutes, not their city.")
 
                 st.header("Total Funding by Discipline")
                 bar_df = df.groupby("MainDiscipline")["AmountGrantedAllSets"].sum().sort_values(ascending=False).reset_index()
@@ -213,21 +342,34 @@ def show_researcher_explorer():
 
             with tab4:
                 st.header("Compare Researchers")
-                r_list = sorted([
-                    name for name in df['FullName'].dropna().unique()
-                    if name and not name.startswith('?') and '?' not in name
-                ])
-                col1, col2 = st.columns(2)
-                r1 = col1.selectbox("Researcher A", r_list, key="r1")
-                r2 = col2.selectbox("Researcher B", r_list, key="r2")
-                d1 = df[df['FullName'] == r1]
-                d2 = df[df['FullName'] == r2]
-                trend1 = d1.groupby('start_year')['AmountGrantedAllSets'].sum().reset_index()
-                trend2 = d2.groupby('start_year')['AmountGrantedAllSets'].sum().reset_index()
-                fig = px.line()
-                fig.add_scatter(x=trend1['start_year'], y=trend1['AmountGrantedAllSets'], name=r1)
-                fig.add_scatter(x=trend2['start_year'], y=trend2['AmountGrantedAllSets'], name=r2)
-                st.plotly_chart(fig, use_container_width=True)
+                people = df[['PersonNumber', 'FullName']].dropna().drop_duplicates(subset='PersonNumber')
+                people = people[(people['FullName'].str.strip() != '') & ~people['FullName'].str.contains('?', regex=False)]
+                people = people.sort_values('FullName')
+                ambiguous = people['FullName'].duplicated(keep=False)
+                labels = dict(zip(people['PersonNumber'], people['FullName'].where(
+                    ~ambiguous, people['FullName'] + ' (' + people['PersonNumber'].astype(str) + ')')))
+                chosen = st.multiselect(
+                    "Researchers", list(labels), default=[p for p in researcher_df['PersonNumber'].dropna().unique() if p in labels],
+                    format_func=labels.get, max_selections=MAX_COMPARED, key="compare_people"
+                )
+                summary, trends, mix = compare_researchers({p: labels[p] for p in chosen}, year_range)
+                if summary.empty:
+                    st.info("Pick researchers to compare.")
+                else:
+                    st.dataframe(summary, hide_index=True, use_container_width=True, column_config={
+                        'Total Funding': st.column_config.NumberColumn(format="%.0f"),
+                        'Grants per Active Year': st.column_config.NumberColumn(format="%.2f"),
+                        'Discipline Share': st.column_config.ProgressColumn(min_value=0, max_value=1, format="%.2f"),
+                    })
+                    fig_cum = px.line(trends, x='Year', y='Cumulative Funding', color='Researcher', title="Cumulative Funding")
+                    st.plotly_chart(styled_plot(fig_cum), use_container_width=True)
+                    fig_grants = px.bar(trends[trends['Grants'] > 0], x='Year', y='Grants', color='Researcher',
+                                        barmode='group', title="Grants per Year")
+                    st.plotly_chart(styled_plot(fig_grants), use_container_width=True)
+                    fig_mix = px.bar(mix, x='Grants', y='Researcher', color='Discipline', orientation='h',
+                                     title="Discipline Mix (share of grants)")
+                    fig_mix.update_layout(barnorm='percent')
+                    st.plotly_chart(styled_plot(fig_mix), use_container_width=True)
 
             with tab5:
                 st.header("Keyword Cloud from Grant Titles")
@@ -0,0 +1,80 @@
+import functools
+import glob
+import os
+
+import pyarrow as pa
+
+from disk_cache import file_digest
+
+SHARED_MODE = os.environ.get("SNSF_SHARED_DATA") == "1"
+SHARED_DIR = os.environ.get("SNSF_SHARED_DIR", "data/shared")
+
+_attached = {}  # table name -> (path, frame) of the snapshot this worker maps
+
+
+def table_path(name, inputs):
+    digest = "-".join(file_digest(path)[:8] for path in inputs)
+    return os.path.join(SHARED_DIR, f"{name}-{digest}.arrow")
+
+
+def export_table(df, path):
+    """Write a frame as an uncompressed Arrow IPC file, which can be memory-mapped as-is."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def remove_stale(name, current):
+    # workers still mapping an older snapshot keep it valid; unlinking only drops the name
+    for stale in glob.glob(os.path.join(SHARED_DIR, f"{name}-*.arrow")):
+        if stale != current:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def attach_table(name, path):
+    """Map an exported table and convert it with the dtypes the loader returned, restored from the
+    pandas metadata: string columns stay Arrow-backed views onto the shared page cache.
+
+    One snapshot per table name is kept: attaching a new path drops the previous frame, so the old
+    mapping is released once callers let go of their copies. Callers get a shallow copy, so
+    assigning a column never reaches the frame other callers see.
+    """
+    attached = _attached.get(name)
+    if attached is None or attached[0] != path:
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        attached = _attached[name] = (path, table.to_pandas(split_blocks=True))
+    return attached[1].copy(deep=False)
+
+
+def shared_table(name, inputs):
+    """Serve a loader's frame from a memory-mapped Arrow file when SNSF_SHARED_DATA=1.
+
+    The first worker to miss exports the table; every other worker only attaches
+    to it, so all processes share one copy through the OS page cache. In shared mode
+    the loader runs beneath its memory_cache, so the exporting worker keeps no heap copy.
+    """
+    def decorator(func):
+        load = getattr(func, "uncached", func)
+
+        @functools.wraps(func)
+        def wrapper():
+            if not SHARED_MODE:
+                return func()
+            path = table_path(name, inputs)
+            if not os.path.exists(path):
+                df = load()
+                try:
+                    export_table(df, path)
+                except (pa.ArrowException, OSError) as e:
+                    print(f"⚠️ Could not share '{name}', serving a private copy: {e}")
+                    return df
+                remove_stale(name, path)
+            return attach_table(name, path)
+        return wrapper
+    return decorator
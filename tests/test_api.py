@@ -0,0 +1,41 @@
+import os
+
+import pandas as pd
+import pytest
+
+import api
+from memory_cache import memory_cache
+
+
+@pytest.fixture
+def route(tmp_path, monkeypatch):
+    """A /test endpoint summing a CSV through a memory-cached loader, like the real routes."""
+    path = tmp_path / "values.csv"
+    path.write_text("Value\n1\n2\n")
+
+    @memory_cache()
+    def load_values():
+        return pd.read_csv(path)
+
+    monkeypatch.setitem(api.ROUTES, "/test", lambda params: {"total": int(load_values()["Value"].sum())})
+    monkeypatch.setitem(api.ROUTE_INPUTS, "/test", [str(path)])
+    monkeypatch.setattr(api, "results", api.ResultCache())
+    return path
+
+
+def test_changed_inputs_give_a_fresh_body_and_etag(route):
+    etag, body, _ = api.render("/test", {})
+    assert body == b'{"total": 3}' and api.render("/test", {})[0] == etag
+
+    route.write_text("Value\n1\n2\n4\n")
+    os.utime(route, ns=(0, 0))  # a different mtime, so the digest is recomputed
+    new_etag, new_body, _ = api.render("/test", {})
+    assert new_body == b'{"total": 7}' and new_etag != etag
+
+
+def test_etag_covers_the_inputs_not_just_the_body(route):
+    etag = api.render("/test", {})[0]
+    route.write_text("Value\n3\n")
+    os.utime(route, ns=(0, 0))
+    new_etag, body, _ = api.render("/test", {})
+    assert body == b'{"total": 3}' and new_etag != etag
@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import country_codes
+
+
+def test_concurrent_sessions_resolve_into_one_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(country_codes, "COUNTRY_CACHE_PATH", str(tmp_path / "country_iso_cache.csv"))
+    monkeypatch.setattr(country_codes, "_resolved", None)
+    batches = [["Switzerland", "Germany"], ["France", "Switzerland"], ["Atlantis", "Italy"]] * 8
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(country_codes.resolve_countries, batches))
+
+    assert all(result["Switzerland"] == "CHE" for result in results)
+    cache = pd.read_csv(tmp_path / "country_iso_cache.csv", keep_default_na=False)
+    assert sorted(cache["Name"]) == ["Atlantis", "France", "Germany", "Italy", "Switzerland"]
+    assert dict(zip(cache["Name"], cache["ISO"]))["Atlantis"] == ""
@@ -0,0 +1,21 @@
+import pandas as pd
+
+import data_io
+from data_io import ID_DTYPES, LINK_TYPES, read_table, read_timings
+
+
+def test_ids_read_as_the_same_type_in_both_readers(tmp_path):
+    path = tmp_path / "GrantToPerson.csv"
+    path.write_text("GrantNumber,PersonNumber,Type\n171329,10,Applicant\n171330,11,Partner\n")
+    arrow = read_table(str(path), None, LINK_TYPES)
+    plain = pd.read_csv(path, dtype=ID_DTYPES)
+    assert arrow.merge(plain, on=["GrantNumber", "PersonNumber"]).shape[0] == 2
+    assert arrow["PersonNumber"].isin(plain["PersonNumber"]).all()
+
+
+def test_read_timings_are_bounded(tmp_path):
+    path = tmp_path / "small.csv"
+    path.write_text("GrantNumber\nG1\n")
+    for _ in range(data_io._timings.maxlen + 5):
+        read_table(str(path))
+    assert len(read_timings()) == data_io._timings.maxlen
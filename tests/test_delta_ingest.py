@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from delta_ingest import diff_rows, patch_totals
+from preprocess_graph_analytics import build_pair_counts
+
+
+def test_unchanged_release_with_other_dtypes_has_no_changes():
+    old = pd.DataFrame({"GrantNumber": [1, 2, 3], "A": [1.0, 2.0, 3.0], "B": ["x", "y", "z"]})
+    new = pd.DataFrame({"GrantNumber": [1, 2, 3], "A": [1, 2, 3], "B": ["x", "y", "z"]})
+    removed, added, counts = diff_rows(old, new, ["GrantNumber"])
+    assert counts == {"inserted": 0, "updated": 0, "deleted": 0}
+    assert removed.empty and added.empty
+
+
+def test_nan_in_one_release_only_flags_that_row():
+    old = pd.DataFrame({"GrantNumber": [1, 2, 3], "A": [1, 2, 3]})
+    new = pd.DataFrame({"GrantNumber": [1, 2, 3], "A": [1, np.nan, 3]})
+    removed, added, counts = diff_rows(old, new, ["GrantNumber"])
+    assert counts == {"inserted": 0, "updated": 1, "deleted": 0}
+    assert list(added["GrantNumber"]) == [2]
+
+
+def test_inserts_updates_deletes_and_repeated_keys():
+    old = pd.DataFrame({"GrantNumber": [1, 1, 2, 3], "PersonNumber": [7, 7, 8, 9], "Type": ["a", "b", "c", "d"]})
+    new = pd.DataFrame({"GrantNumber": [1, 1, 3, 4], "PersonNumber": [7, 7, 9, 5], "Type": ["a", "x", "d", "e"]})
+    removed, added, counts = diff_rows(old, new, ["GrantNumber", "PersonNumber"])
+    assert counts == {"inserted": 1, "updated": 1, "deleted": 1}
+    assert sorted(removed["Type"]) == ["b", "c"]
+    assert sorted(added["Type"]) == ["e", "x"]
+
+
+EDGE_KEYS = ["Institute_x", "Institute_y"]
+
+
+def collab(rows):
+    return pd.DataFrame(rows, columns=["GrantNumber", "InstituteName", "start_year"])
+
+
+def test_patched_pair_counts_match_a_rebuild():
+    old = collab([(1, "A", 2010), (1, "B", 2010), (2, "B", 2011), (2, "C", 2011), (3, "A", 2012), (3, "C", 2012)])
+    changed_old = old[old["GrantNumber"] == 2]
+    changed_new = collab([(2, "A", 2011), (2, "B", 2011), (2, "C", 2011)])
+    new = pd.concat([old[old["GrantNumber"] != 2], changed_new], ignore_index=True)
+
+    patched = patch_totals(build_pair_counts(old), build_pair_counts(changed_old),
+                           build_pair_counts(changed_new), EDGE_KEYS, ["collaboration_count"], "collaboration_count")
+    rebuilt = build_pair_counts(new)
+    pd.testing.assert_frame_equal(patched.sort_values(EDGE_KEYS).reset_index(drop=True),
+                                  rebuilt.sort_values(EDGE_KEYS).reset_index(drop=True), check_dtype=False)
+
+
+def test_patch_totals_refuses_negative_totals():
+    totals = pd.DataFrame({"Key": ["a", "b"], "Count": [1, 2]})
+    with pytest.raises(ValueError, match="below zero"):
+        patch_totals(totals, pd.DataFrame({"Key": ["c"], "Count": [1]}), totals.iloc[:0], ["Key"], ["Count"], "Count")
+
+
+def test_patch_totals_drops_emptied_groups():
+    totals = pd.DataFrame({"Key": ["a", "b"], "Count": [1, 2]})
+    patched = patch_totals(totals, pd.DataFrame({"Key": ["a"], "Count": [1]}), pd.DataFrame({"Key": ["c"], "Count": [4]}),
+                           ["Key"], ["Count"], "Count")
+    assert dict(zip(patched["Key"], patched["Count"])) == {"b": 2, "c": 4}
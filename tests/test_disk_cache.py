@@ -0,0 +1,57 @@
+import importlib
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+import disk_cache
+
+
+@pytest.fixture
+def module(tmp_path, monkeypatch):
+    """A page-like module whose cached loader calls a helper defined next to it."""
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = tmp_path / "cached_page.py"
+
+    def write(helper_value):
+        path.write_text(
+            "from disk_cache import disk_cache\n\n"
+            f"def helper():\n    return {helper_value}\n\n"
+            "@disk_cache()\ndef load():\n    return helper()\n"
+        )
+        sys.modules.pop("cached_page", None)
+        importlib.invalidate_caches()
+        return importlib.import_module("cached_page")
+
+    yield write
+    sys.modules.pop("cached_page", None)
+
+
+def test_editing_a_helper_in_the_module_invalidates_its_callers(module):
+    assert module(1).load() == 1
+    assert module(1).load() == 1
+    assert module(100).load() == 100  # a different size, so the digest is recomputed whatever the mtime resolution
+
+
+def test_concurrent_writes_of_one_entry_do_not_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path))
+    frame = pd.DataFrame({"a": range(50_000)})
+    errors = []
+
+    def write():
+        try:
+            for _ in range(5):
+                disk_cache._write(str(tmp_path / "entry"), frame)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "entry.parquet"), frame)
+    assert not list(tmp_path.glob("*.tmp"))
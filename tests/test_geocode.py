@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import geocode
+
+
+@pytest.fixture
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(geocode, "GEOCODE_CACHE_PATH", str(tmp_path / "institute_geocode_cache.csv"))
+    monkeypatch.setattr(geocode, "_resolved", None)
+    monkeypatch.setattr(geocode, "_patterns", {})
+    return tmp_path / "institute_geocode_cache.csv"
+
+
+def institutes(*rows):
+    return pd.DataFrame(rows, columns=["Institute", "InstituteCountry", "ResearchInstitution"])
+
+
+def test_concurrent_sessions_geocode_into_one_cache(fresh_cache):
+    batches = [institutes(("Institut für Geographie Universität Bern", "Switzerland", "")),
+               institutes(("Department of Physics ETH Zürich", "Switzerland", "")),
+               institutes(("Laboratoire de chimie EPFL", "Switzerland", ""))] * 6
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(geocode.geocode_institutes, batches))
+
+    assert all(len(result) == 1 and result["Latitude"].notna().all() for result in results)
+    cache = pd.read_csv(fresh_cache)
+    assert len(cache) == cache[["Institute", "InstituteCountry"]].drop_duplicates().shape[0] == 3
+
+
+@pytest.mark.parametrize("name, country, place", [
+    ("Department of Political Science University of Kansas", "United States of America", "University of Kansas"),
+    ("School of Biological Sciences University of Wollongong", "Australia", "University of Wollongong"),
+    ("Centre de recherches sur les arts et le langage CRAL EHESS", "France", "EHESS"),
+    ("Molecular Surgery Laboratory Department of Surgery Harvard Medical School", "United States of America",
+     "Harvard Medical School"),
+])
+def test_department_prefixes_place_the_parent_institution(fresh_cache, name, country, place):
+    assert geocode.geocode_institute(name, country)[:2] == (place, "institution")
+
+
+def test_legacy_record_uses_its_vehicle_code_and_broken_city(fresh_cache):
+    # Filed under Great Britain, but the trailing code says USA and the city reads 'C ambridge'
+    place, precision, *_ = geocode.geocode_institute(
+        "UNI: Sloan School of Management Dept of Fina nce  C ambridge USA", "Great Britain and Northern Ireland")
+    assert (place, precision) == ("Cambridge MA", "city")
+    assert geocode.geocode_institute("UNI: ETH-Zürich Analytische Chemie  Zürich C H", "Switzerland")[0] == "ETH Zurich"
+
+
+def test_region_only_places_what_nothing_narrows_down(fresh_cache):
+    assert geocode.geocode_institute("Department of Geography University of California", "United States of America")[:2] \
+        == ("California", "region")
+    assert geocode.geocode_institute("UNI: University of California Biochemistry D epartment  San Diego USA",
+                                     "United States of America")[:2] == ("San Diego", "city")
+    research = "Institution abroad - Great Britain and Northern Ireland"
+    assert geocode.geocode_institute("Laboratory of Structural Studies", "Great Britain and Northern Ireland",
+                                     research)[1] == "country"
+
+
+def test_approximate_institutes_get_cells_of_their_own():
+    from preprocess_institute_map import bin_institutes
+
+    placed = pd.DataFrame({
+        "Institute": ["A", "B", "C"],
+        "Place": ["Zurich", "Switzerland", "Lucerne"],
+        "Precision": ["city", "country", "city"],
+        "Latitude": [47.37, 46.8, 47.05],
+        "Longitude": [8.54, 8.23, 8.31],
+        "Grants": [3, 2, 1],
+        "Funding": [300.0, 200.0, 100.0],
+    })
+    grid = bin_institutes(placed, levels={"Country": 4.0})
+    assert sorted(zip(grid["Placement"], grid["Place"], grid["Institutes"])) == [
+        ("Approximate", "Switzerland", 1), ("Located", "Zurich", 2)]
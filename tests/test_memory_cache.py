@@ -0,0 +1,77 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import memory_cache
+from memory_cache import cache_stats, cached_bytes, clear_cache
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    clear_cache()
+    monkeypatch.setattr(memory_cache, "MEMORY_BUDGET", 100_000)
+    yield 100_000
+    clear_cache()
+
+
+def stats(name):
+    rows = cache_stats().set_index("Function")
+    return rows.loc[[index for index in rows.index if index.endswith(name)][0]]
+
+
+def test_cheap_bulky_entries_are_evicted_before_expensive_small_ones(budget):
+    @memory_cache.memory_cache()
+    def expensive(n):
+        time.sleep(0.05)
+        return np.zeros(1_000)
+
+    @memory_cache.memory_cache()
+    def bulky(n):
+        return np.zeros(5_000)
+
+    expensive(1)
+    bulky(1)
+    bulky(2)  # 8 + 40 + 40 kB fits; the next 40 kB does not
+    bulky(3)
+    assert cached_bytes() <= budget
+    assert stats("expensive")["Evictions"] == 0 and stats("bulky")["Evictions"] == 1
+
+    expensive(1)
+    assert stats("expensive")["Hits"] == 1 and stats("expensive")["Misses"] == 1
+
+
+def test_values_over_the_budget_are_returned_but_not_kept(budget):
+    @memory_cache.memory_cache()
+    def huge():
+        return np.zeros(20_000)
+
+    assert len(huge()) == 20_000 and cached_bytes() == 0
+    huge()
+    assert stats("huge")["Misses"] == 2 and stats("huge")["Evictions"] == 2
+
+
+def test_cached_values_are_detached_from_the_entry(budget):
+    @memory_cache.memory_cache()
+    def frame():
+        return pd.DataFrame({"a": [1, 2, 3]}), np.arange(3)
+
+    df, array = frame()
+    df.loc[0, "a"] = 99
+    with pytest.raises(ValueError):
+        array[0] = 99
+    assert frame()[0]["a"].tolist() == [1, 2, 3]
+
+
+def test_long_arguments_are_keyed_by_digest_and_counted(budget):
+    @memory_cache.memory_cache()
+    def words(text):
+        return len(text)
+
+    text = "glacier " * 20_000
+    assert words(text) == words(text) == len(text)
+    assert stats("words")["Hits"] == 1
+    (key, entry), = memory_cache._entries.items()
+    assert all(len(part) == 64 for part in key[1]) and entry.size == memory_cache.deep_size(key) + memory_cache.deep_size(len(text))
+    assert cached_bytes() == entry.size < 1_000
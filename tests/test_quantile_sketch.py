@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantile_sketch import RELATIVE_ACCURACY, build_sketches, merge_sketches, sketch_quantiles
+
+QS = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+@pytest.fixture
+def grants():
+    rng = np.random.default_rng(42)
+    n = 20_000
+    return pd.DataFrame({
+        "Group": rng.choice(["Physics", "Biology", "History"], n),
+        "Year": rng.integers(2000, 2021, n),
+        "Amount": rng.lognormal(mean=12, sigma=1.2, size=n),
+    })
+
+
+def test_quantiles_are_within_the_relative_accuracy(grants):
+    sketches = build_sketches(grants, "Amount", ["Group", "Year"])
+    quantiles = sketch_quantiles(sketches, ["Group"], QS).set_index("Group")
+    for group, rows in grants.groupby("Group"):
+        assert quantiles.at[group, "N"] == len(rows)
+        for q in QS:
+            exact = np.quantile(rows["Amount"], q, method="lower")
+            assert abs(quantiles.at[group, f"p{round(q * 100)}"] - exact) <= RELATIVE_ACCURACY * exact
+
+
+def test_merged_yearly_sketches_equal_one_sketch_over_the_years(grants):
+    yearly = build_sketches(grants, "Amount", ["Group", "Year"])
+    window = yearly[yearly["Year"].between(2005, 2010)]
+    direct = build_sketches(grants[grants["Year"].between(2005, 2010)], "Amount", ["Group"])
+    pd.testing.assert_frame_equal(merge_sketches(window, ["Group"]), direct, check_dtype=False)
+    pd.testing.assert_frame_equal(sketch_quantiles(window, ["Group"]), sketch_quantiles(direct, ["Group"]))
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import reports
+
+YEARS = (2010, 2012)
+
+
+def snapshot():
+    funding = pd.DataFrame({
+        "GrantNumber": ["G1", "G2", "G3", "G4", "G5"],
+        "CallDecisionYear": [2010, 2011, 2012, 2010, 2011],
+        "AmountGrantedAllSets": [100.0, 200.0, 300.0, 50.0, 80.0],
+        "ResearchInstitution": ["ETH Zurich", "ETH Zurich", "EPFL", "EPFL", "University of Bern"],
+        "MainDiscipline": ["Physics", "Biology", "Physics", "Chemistry", "History"],
+    })
+    gender = pd.DataFrame({
+        "GrantNumber": ["G1", "G2", "G3", "G5"],
+        "start_year": [2010, 2011, 2012, 2011],
+        "Gender": ["female", "male", "female", "male"],
+        "AmountGrantedAllSets": [100.0, 200.0, 300.0, 80.0],
+        "ResearchInstitution": ["ETH Zurich", "ETH Zurich", "EPFL", "University of Bern"],
+        "MainDiscipline": ["Physics", "Biology", "Physics", "History"],
+    })
+    return funding, gender
+
+
+def run(out_dir, funding, gender):
+    """One reports.main pass over a snapshot, without the worker pool: the names it rendered."""
+    digests = reports.report_digests(funding, gender, "ResearchInstitution", YEARS)
+    manifest_path = out_dir / reports.MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    todo = reports.stale_reports(digests, manifest, str(out_dir))
+    for name in todo:
+        reports.render_report("institution", name, str(out_dir / reports.report_filename(name)), YEARS)
+        manifest[name] = {"file": reports.report_filename(name), "digest": digests[name]}
+    manifest_path.write_text(json.dumps(manifest))
+    return sorted(todo)
+
+
+@pytest.fixture
+def attached(monkeypatch):
+    funding, gender = snapshot()
+    monkeypatch.setattr(reports, "_snapshot", {"funding": funding, "gender": gender})
+    return reports._snapshot
+
+
+def test_group_digests_ignore_row_order():
+    funding, _ = snapshot()
+    digests = reports.group_digests(funding, "ResearchInstitution")
+    assert digests == reports.group_digests(funding.iloc[::-1], "ResearchInstitution")
+    assert set(digests) == {"ETH Zurich", "EPFL", "University of Bern"}
+
+
+def test_report_digests_change_only_for_the_edited_institution():
+    funding, gender = snapshot()
+    before = reports.report_digests(funding, gender, "ResearchInstitution", YEARS)
+    gender.loc[gender["GrantNumber"] == "G3", "Gender"] = "male"
+    after = reports.report_digests(funding, gender, "ResearchInstitution", YEARS)
+    assert [name for name in before if before[name] != after[name]] == ["EPFL"]
+    assert reports.report_digests(funding, gender, "ResearchInstitution", (2010, 2011)) != after
+
+
+def test_second_run_renders_nothing_and_an_edit_renders_one(tmp_path, attached):
+    assert run(tmp_path, attached["funding"], attached["gender"]) == ["EPFL", "ETH Zurich", "University of Bern"]
+    assert run(tmp_path, attached["funding"], attached["gender"]) == []
+
+    funding = attached["funding"].copy()
+    funding.loc[funding["GrantNumber"] == "G5", "AmountGrantedAllSets"] = 90.0
+    attached["funding"] = funding
+    assert run(tmp_path, funding, attached["gender"]) == ["University of Bern"]
+
+    os.remove(tmp_path / reports.report_filename("EPFL"))
+    assert run(tmp_path, funding, attached["gender"]) == ["EPFL"]
+
+
+def test_render_report_writes_the_page_against_the_versioned_bundle(tmp_path, attached):
+    path = tmp_path / reports.report_filename("ETH Zurich")
+    name, _ = reports.render_report("institution", "ETH Zurich", str(path), YEARS)
+    page = path.read_text(encoding="utf-8")
+    assert name == "ETH Zurich" and f'<script src="{reports.PLOTLY_BUNDLE}"></script>' in page
+    assert "<h1>ETH Zurich</h1>" in page and "CHF 300" in page
+    assert reports.PLOTLY_BUNDLE.startswith("plotly-") and reports.PLOTLY_BUNDLE != "plotly-.min.js"
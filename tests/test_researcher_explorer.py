@@ -0,0 +1,53 @@
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import researcher_explorer
+
+GRANTS = pd.DataFrame({
+    "PersonNumber": ["P1", "P1", "P1", "P2", "P2", "P3"],
+    "GrantNumber": ["G1", "G1", "G2", "G3", "G4", "G5"],
+    "Type": ["Applicant", "Partner", "Applicant", "Applicant", "Applicant", "Applicant"],
+    "start_year": [2010, 2010, 2012, 2011, 2011, 2019],
+    "MainDiscipline": ["Physics", "Physics", "Biology", "Biology", None, "Physics"],
+    "AmountGrantedAllSets": [100.0, 100.0, 50.0, 30.0, 20.0, 10.0],
+})
+
+
+@pytest.fixture
+def matrix(monkeypatch):
+    monkeypatch.setattr(researcher_explorer, "load_data", lambda: GRANTS)
+    build = inspect.unwrap(researcher_explorer.researcher_year_matrix)
+    monkeypatch.setattr(researcher_explorer, "researcher_year_matrix", build)
+    return build()
+
+
+def test_year_matrix_counts_each_grant_once_per_person(matrix):
+    people, years, disciplines, funding, grants = matrix
+    assert list(people) == ["P1", "P2", "P3"] and list(years) == list(range(2010, 2020))
+    assert list(disciplines) == ["Biology", "Physics", "Unknown"]
+    p1 = grants[people.get_loc("P1")].toarray().reshape(len(disciplines), len(years))
+    assert p1[1, 0] == 1 and p1[0, 2] == 1 and p1.sum() == 2
+    assert funding[people.get_loc("P2")].sum() == 50.0
+
+
+def test_compare_matches_the_rows_and_leaves_idle_researchers_without_a_discipline(matrix):
+    summary, trends, mix = researcher_explorer.compare_researchers({"P1": "One", "P2": "Two", "P3": "Three"}, (2010, 2015))
+    summary = summary.set_index("Researcher")
+    assert summary.loc["One", "Grants"] == 2 and summary.loc["One", "Total Funding"] == 150.0
+    assert summary.loc["Two", "Active Years"] == 1 and summary.loc["Two", "Discipline Share"] == 0.5
+    assert summary.loc["Three", "Grants"] == 0
+    assert pd.isna(summary.loc["Three", "Main Discipline"])
+    assert summary.loc["One", "Main Discipline"] in {"Biology", "Physics"}
+    assert trends.loc[trends["Researcher"] == "One", "Cumulative Funding"].iloc[-1] == 150.0
+    assert "Three" not in set(mix["Researcher"]) and mix["Grants"].sum() == 4
+
+
+def test_compare_window_follows_the_year_range_not_the_researchers(matrix):
+    summary, trends, _ = researcher_explorer.compare_researchers({"P1": "One", "P3": "Three"}, (2012, 2019))
+    assert summary.set_index("Researcher")["Grants"].to_dict() == {"One": 1, "Three": 1}
+    assert sorted(trends["Year"].unique()) == list(range(2012, 2020))
+    summary, trends, _ = researcher_explorer.compare_researchers({"P1": "One"})
+    assert summary["Grants"].iloc[0] == 2 and sorted(trends["Year"].unique()) == list(range(2010, 2020))
@@ -0,0 +1,36 @@
+import pandas as pd
+
+import shared_store
+from memory_cache import cache_stats, cached_bytes, clear_cache, memory_cache
+from shared_store import shared_table
+
+
+def test_shared_loader_keeps_dtypes_and_skips_the_memory_cache(tmp_path, monkeypatch):
+    source = tmp_path / "source.csv"
+    source.write_text("GrantNumber,start_year,Amount\nG1,2010,1.5\nG2,2011,\n")
+    monkeypatch.setattr(shared_store, "SHARED_MODE", True)
+    monkeypatch.setattr(shared_store, "SHARED_DIR", str(tmp_path / "shared"))
+    clear_cache()
+
+    @memory_cache()
+    def load():
+        return pd.read_csv(source)
+
+    shared = shared_table("test", inputs=[str(source)])(load)
+    first = shared()
+    pd.testing.assert_frame_equal(first, pd.read_csv(source))
+    assert cache_stats().empty and cached_bytes() == 0
+
+    first["start_year"] = 0
+    pd.testing.assert_frame_equal(shared(), pd.read_csv(source))
+
+
+def test_a_new_snapshot_replaces_the_old_mapping(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_store, "_attached", {})
+    old, new = str(tmp_path / "t-old.arrow"), str(tmp_path / "t-new.arrow")
+    shared_store.export_table(pd.DataFrame({"a": [1]}), old)
+    shared_store.export_table(pd.DataFrame({"a": [2]}), new)
+
+    assert shared_store.attach_table("t", old)["a"].tolist() == [1]
+    assert shared_store.attach_table("t", new)["a"].tolist() == [2]
+    assert list(shared_store._attached) == ["t"] and shared_store._attached["t"][0] == new
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from text_index import TextIndex
+
+DOCS = [
+    "Glacier retreat in the Swiss Alps",
+    "Alpine glacier mass balance and climate",
+    "Medieval manuscripts of the Abbey of St. Gallen",
+    "Climate adaptation in Alpine agriculture",
+    "",
+    "Gène et protéine: la régulation du cycle cellulaire",
+] * 60 + ["Rare glacier term only at the end: moraine"]
+
+
+@pytest.fixture
+def round_trip(tmp_path):
+    index = TextIndex.build(DOCS)
+    index.save(str(tmp_path / "index.npz"))
+    return index, TextIndex.load(str(tmp_path / "index.npz"))
+
+
+def test_postings_survive_the_compact_format_exactly(round_trip):
+    built, loaded = round_trip
+    assert loaded.terms == built.terms and loaded.n_docs == built.n_docs == len(DOCS)
+    np.testing.assert_array_equal(loaded.term_ptr, built.term_ptr)
+    np.testing.assert_array_equal(loaded.doc_ids, built.doc_ids)
+    assert loaded.doc_ids.dtype == np.int32
+
+
+def test_weights_are_quantised_within_half_a_step(round_trip):
+    built, loaded = round_trip
+    step = built.weights.max() / 255
+    assert np.abs(loaded.weights - built.weights).max() <= step / 2 + 1e-6
+
+
+def test_searches_agree_after_loading(round_trip):
+    built, loaded = round_trip
+    for query in ["glacier climate", "manuscripts", "moraine", "régulation cellulaire"]:
+        assert set(built.search(query, top_k=None)[0]) == set(loaded.search(query, top_k=None)[0])
+        np.testing.assert_array_equal(built.matches(query), loaded.matches(query))
+    assert loaded.search("moraine")[0].tolist() == [len(DOCS) - 1]
+    hits, scores = loaded.search("glacier", top_k=3)
+    assert len(hits) == 3 and all("glacier" in DOCS[doc].lower() for doc in hits) and list(scores) == sorted(scores, reverse=True)
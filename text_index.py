@@ -0,0 +1,121 @@
+import os
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_]{2,}")  # letters only, any script, at least two of them
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class TextIndex:
+    """Inverted index with BM25 impact scores precomputed per posting.
+
+    Postings are stored CSR-style: the documents containing term ``t`` are
+    ``doc_ids[term_ptr[t]:term_ptr[t + 1]]`` with matching ``weights``, so a
+    query is a handful of slices summed into one score vector.
+    """
+
+    def __init__(self, terms, term_ptr, doc_ids, weights, n_docs):
+        self.terms = terms
+        self.term_ptr = term_ptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.n_docs = int(n_docs)
+        self.vocab = {term: i for i, term in enumerate(terms)}
+
+    @classmethod
+    def build(cls, texts, k1=K1, b=B):
+        """Index an iterable of documents; document ids are their positions."""
+        vocab, term_docs, term_tfs, doc_lengths = {}, [], [], []
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                term_id = vocab.setdefault(token, len(vocab))
+                if term_id == len(term_docs):
+                    term_docs.append([])
+                    term_tfs.append([])
+                term_docs[term_id].append(doc_id)
+                term_tfs[term_id].append(tf)
+
+        n_docs = len(doc_lengths)
+        doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+        avg_length = doc_lengths.mean() if n_docs and doc_lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * doc_lengths / avg_length)
+
+        # sort terms so the persisted vocabulary is deterministic
+        terms = sorted(vocab)
+        lengths = np.array([len(term_docs[vocab[t]]) for t in terms], dtype=np.int64)
+        term_ptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=term_ptr[1:])
+        doc_ids = np.empty(term_ptr[-1], dtype=np.int32)
+        weights = np.empty(term_ptr[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            docs = np.asarray(term_docs[vocab[term]], dtype=np.int32)
+            tfs = np.asarray(term_tfs[vocab[term]], dtype=np.float32)
+            idf = np.log1p((n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            doc_ids[term_ptr[i]:term_ptr[i + 1]] = docs
+            weights[term_ptr[i]:term_ptr[i + 1]] = idf * tfs * (k1 + 1) / (tfs + norm[docs])
+        return cls(terms, term_ptr, doc_ids, weights, n_docs)
+
+    def save(self, path):
+        """Persist compactly: doc ids as per-term gaps in the narrowest integer type, weights as 8-bit impacts."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        starts = self.term_ptr[:-1]
+        gaps = np.diff(self.doc_ids, prepend=0).astype(np.int64)
+        gaps[starts] = self.doc_ids[starts]
+        scale = float(self.weights.max()) / 255 if len(self.weights) else 1.0
+        impacts = np.clip(np.rint(self.weights / scale), 1, 255).astype(np.uint8)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp, terms=np.asarray(self.terms, dtype=str), term_ptr=self.term_ptr,
+                            gaps=gaps.astype(np.min_scalar_type(gaps.max() if len(gaps) else 0)),
+                            impacts=impacts, scale=scale, n_docs=self.n_docs)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            term_ptr, gaps = data["term_ptr"], data["gaps"].astype(np.int64)
+            running = np.cumsum(gaps)
+            starts = term_ptr[:-1]
+            doc_ids = running - np.repeat(running[starts] - gaps[starts], np.diff(term_ptr))
+            weights = data["impacts"].astype(np.float32) * np.float32(data["scale"])
+            return cls(data["terms"].tolist(), term_ptr, doc_ids.astype(np.int32), weights, data["n_docs"])
+
+    def search(self, query, top_k=50, mask=None):
+        """Ranked (doc_ids, scores) for a free-text query; ``mask`` restricts the candidate documents.
+
+        ``top_k=None`` returns every document matching at least one term.
+        """
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for token in set(tokenize(query)):
+            term_id = self.vocab.get(token)
+            if term_id is not None:
+                start, end = self.term_ptr[term_id], self.term_ptr[term_id + 1]
+                scores[self.doc_ids[start:end]] += self.weights[start:end]
+        if mask is not None:
+            scores[~mask] = 0
+        hits = np.flatnonzero(scores)
+        if top_k is not None and len(hits) > top_k:
+            hits = hits[np.argpartition(scores[hits], -top_k)[-top_k:]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return hits, scores[hits]
+
+    def matches(self, query):
+        """Boolean mask of the documents containing every term of the query."""
+        tokens = set(tokenize(query))
+        hits = np.zeros(self.n_docs, dtype=np.int32)
+        for token in tokens:
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                return np.zeros(self.n_docs, dtype=bool)
+            hits[self.doc_ids[self.term_ptr[term_id]:self.term_ptr[term_id + 1]]] += 1
+        return hits == len(tokens) if tokens else np.zeros(self.n_docs, dtype=bool)
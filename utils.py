@@ -1,10 +1,64 @@
 # utils.py
-def styled_plot(fig, height=400):
-    fig.update_layout(
-        height=height,
-        plot_bgcolor="#E4E1DC",
-        paper_bgcolor="#E4E1DC",
-        font=dict(color="#2B2B2B", size=12),
-        margin=dict(l=20, r=20, t=40, b=40)
-    )
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit  # noqa: F401 -- registers Streamlit's plotly template, which ours is layered on
+
+PLOT_LAYOUT = dict(
+    plot_bgcolor="#E4E1DC",
+    paper_bgcolor="#E4E1DC",
+    font=dict(color="#2B2B2B", size=12),
+    margin=dict(l=20, r=20, t=40, b=40),
+    xaxis=dict(color="#2B2B2B"),
+    yaxis=dict(color="#2B2B2B"),
+    legend=dict(font=dict(color="#2B2B2B")),
+)
+
+pio.templates["snsf"] = go.layout.Template(layout=PLOT_LAYOUT)
+if "snsf" not in pio.templates.default:
+    pio.templates.default = f"{pio.templates.default}+snsf"
+
+FIGURE_CACHE_ENTRIES = 256
+
+_figure_specs = OrderedDict()
+_figure_lock = threading.Lock()
+
+
+def styled_plot(fig, height=400, **layout):
+    # the template styles every figure; the explicit layout keeps the palette under Streamlit's chart theme
+    fig.update_layout(PLOT_LAYOUT, height=height, **layout)
     return fig
+
+
+def data_digest(data):
+    """Content hash of a chart's input frame, column names included."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        sha = hashlib.sha1(pd.util.hash_pandas_object(data).values.tobytes())
+        sha.update(repr(list(data.columns) if isinstance(data, pd.DataFrame) else data.name).encode())
+        return sha.hexdigest()
+    return hashlib.sha1(repr(data).encode()).hexdigest()
+
+
+def cached_chart(chart_id, data, build):
+    """Figure for ``build(data)``, restored from its serialised spec when ``data`` is unchanged.
+
+    ``chart_id`` must name everything ``build`` depends on besides ``data``
+    (titles, colours, heights). Hits skip plotly express and validation.
+    """
+    key = (chart_id, data_digest(data))
+    with _figure_lock:
+        spec = _figure_specs.get(key)
+        if spec is not None:
+            _figure_specs.move_to_end(key)
+    if spec is None:
+        spec = pio.to_json(build(data), validate=False)
+        with _figure_lock:
+            _figure_specs[key] = spec
+            while len(_figure_specs) > FIGURE_CACHE_ENTRIES:
+                _figure_specs.popitem(last=False)
+    return go.Figure(json.loads(spec), _validate=False)
@@ -0,0 +1,59 @@
+import argparse
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from data_io import print_read_timings
+from memory_cache import MEMORY_BUDGET, cache_stats, cached_bytes
+
+SECTIONS = {
+    "Funding Insights": ("funding_insights", "show_funding_insights"),
+    "Gender Diversity": ("gender_diversity", "show_gender_diversity"),
+    "Keyword Analysis": ("keyword_analysis", "show_keyword_insights"),
+    "Collaboration Network": ("collaboration_network", "show_collaboration_network"),
+    "Researcher Explorer": ("researcher_explorer", "show_researcher_explorer"),
+    "Research Outputs": ("research_outputs", "show_research_outputs"),
+}
+
+SCRIPT = "import streamlit as st\nst.set_page_config(layout='wide')\nfrom {module} import {func}\n{func}()\n"
+
+
+def warm_section(name, timeout):
+    """Run one section headlessly with its default widget state; returns (seconds, error messages)."""
+    module, func = SECTIONS[name]
+    at = AppTest.from_string(SCRIPT.format(module=module, func=func), default_timeout=timeout)
+    started = time.perf_counter()
+    at.run()
+    return time.perf_counter() - started, [str(e.value) for e in at.exception]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Warm the on-disk caches (results, shared Arrow tables, lookups) before routing traffic."
+    )
+    parser.add_argument("--sections", nargs="+", choices=list(SECTIONS), default=list(SECTIONS))
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per section")
+    args = parser.parse_args()
+
+    failed = False
+    total = time.perf_counter()
+    for name in args.sections:
+        seconds, errors = warm_section(name, args.timeout)
+        status = "✅" if not errors else "❌"
+        print(f"{status} {name:<24} {seconds:8.2f}s")
+        for error in errors:
+            print(f"    {error}")
+        failed = failed or bool(errors)
+    print(f"⏱️ Warm-up finished in {time.perf_counter() - total:.2f}s")
+
+    stats = cache_stats().sort_values("Bytes", ascending=False)
+    stats["MB"] = (stats.pop("Bytes") / 1024 ** 2).round(1)
+    print(stats.to_string(index=False))
+    print(f"🧠 {cached_bytes() / 1024 ** 2:.0f} MB of {MEMORY_BUDGET / 1024 ** 2:.0f} MB in-process cache budget used")
+    print_read_timings()  # empty when every loader was served from the disk cache
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())